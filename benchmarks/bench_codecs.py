@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+Kodek ölçümü: sıkıştırma oranı ve çerçeve başına kodlama/çözme süresi.
+
+Sentetik sinyaller (müzik benzeri, konuşma benzeri, sessizlik, beyaz gürültü)
+üzerinde her kodeği çalıştırır, kayıpsız kodeklerin birebir geri döndüğünü
+doğrular ve sonuçların 10 ms'lik çerçeve bütçesine sığıp sığmadığını raporlar.
+
+Kullanım:
+    python -m benchmarks.bench_codecs [--frame-ms 10] [--rate 48000] [--channels 2]
+"""
+
+import argparse
+import time
+import numpy as np
+from core import packet
+from core.codecs import CODECS
+
+def _signals(n, channels, rate, seed=1234):
+    """Ölçümde kullanılan sentetik test sinyallerini üretir (float, -1..1)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / rate
+    music = sum(0.15 / (i + 1) * np.sin(2 * np.pi * f * t + i)
+                for i, f in enumerate((110, 220, 330, 440, 660, 990)))
+    music = music + 0.01 * rng.standard_normal(n)
+    speech = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    speech = speech + 0.005 * rng.standard_normal(n)
+    signals = {
+        "music": music,
+        "speech": speech,
+        "silence": np.zeros(n),
+        "noise": 0.5 * rng.uniform(-1, 1, n),
+    }
+    out = {}
+    for name, x in signals.items():
+        # Kanallar arasında küçük bir faz farkı
+        chans = [np.roll(x, ch * 3) for ch in range(channels)]
+        out[name] = (np.stack(chans, axis=1) * 32767).astype(np.int16)
+    return out
+
+def run(frame_ms=10, rate=48000, channels=2, frames=200):
+    """Tüm kodekleri ölçer ve sonuç sözlüklerinin listesini döndürür."""
+    samples = packet.frame_samples(rate, frame_ms)
+    budget_us = frame_ms * 1000
+    results = []
+    for name, sig in _signals(samples * frames, channels, rate).items():
+        blocks = sig.reshape(frames, samples, channels)
+        for codec in CODECS.values():
+            out = np.zeros((samples, channels), dtype=np.int16)
+            t0 = time.perf_counter()
+            encoded = [codec.encode(b) for b in blocks]
+            enc_us = (time.perf_counter() - t0) / frames * 1e6
+            size = sum(len(e) for e in encoded)
+
+            t0 = time.perf_counter()
+            for e in encoded:
+                codec.decode(memoryview(e), out)
+            dec_us = (time.perf_counter() - t0) / frames * 1e6
+
+            max_err = 0
+            for b, e in zip(blocks, encoded):
+                codec.decode(memoryview(e), out)
+                max_err = max(max_err, int(np.abs(out.astype(np.int32) - b).max()))
+            if codec.lossless and max_err:
+                raise AssertionError(f"{codec.name} kayıpsız değil ({name}, hata {max_err})")
+
+            results.append({
+                "signal": name,
+                "codec": codec.name,
+                "ratio": blocks.nbytes / size,
+                "kbps": size * 8 / (frames * frame_ms / 1000) / 1000,
+                "encode_us": enc_us,
+                "decode_us": dec_us,
+                "max_error": max_err,
+                "fits_budget": enc_us + dec_us < budget_us,
+            })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kodek ölçümü")
+    parser.add_argument("--frame-ms", type=float, default=10)
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    results = run(args.frame_ms, args.rate, args.channels)
+    print(f"{'sinyal':>8} {'kodek':>9} {'oran':>6} {'kbit/s':>8} {'kodlama µs':>11} {'çözme µs':>9} {'hata':>5}")
+    for r in results:
+        flag = "" if r["fits_budget"] else "  ⚠ bütçe aşıldı"
+        print(f"{r['signal']:>8} {r['codec']:>9} {r['ratio']:6.2f} {r['kbps']:8.0f} "
+              f"{r['encode_us']:11.1f} {r['decode_us']:9.1f} {r['max_error']:5d}{flag}")
+    return results
+
+if __name__ == "__main__":
+    main()
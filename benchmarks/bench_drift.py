@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+Saat kayması telafisi ölçümü.
+
+1. Yeniden örnekleyicinin çerçeve başına işlemci maliyeti (farklı çerçeve
+   süreleri için, düzeltme yokken ve varken).
+2. Gönderici saati ±ppm hızlı/yavaş iken jitter tamponu ve çalma aygıtının
+   benzetimi: telafi kapalıyken atılan/eklenen çerçeveler ve boşalmalar,
+   açıkken tahmin edilen oran ve tampon derinliği.
+
+Kullanım:
+    python -m benchmarks.bench_drift [--seconds 300] [--ppm -500 -100 0 100 500]
+"""
+
+import argparse
+import time
+import numpy as np
+from core import packet
+from core.drift import DriftCompensator
+from core.jitter_buffer import JitterBuffer
+
+def cost(frame_ms, rate=48000, channels=2, frames=2000, ratio=1.0005):
+    """Çerçeve başına yeniden örnekleme süresini (µs) döndürür: (düzeltmesiz, düzeltmeli)."""
+    samples = packet.frame_samples(rate, frame_ms)
+    frame = np.random.default_rng(1).uniform(-0.5, 0.5, (samples, channels)).astype(np.float32)
+    results = []
+    for r in (1.0, ratio):
+        drift = DriftCompensator(rate, samples, channels)
+        drift.ratio = r
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            drift.process(frame)
+        results.append((time.perf_counter() - t0) / frames * 1e6)
+    return tuple(results)
+
+def simulate(ppm, seconds, compensate, rate=48000, frame_ms=10, channels=2, jitter_ms=2.0, seed=7):
+    """
+    Gönderici saati `ppm` kadar hızlıyken `seconds` saniyelik çalmayı benzetir
+    ve tampon sayaçlarını içeren bir sözlük döndürür.
+    """
+    rng = np.random.default_rng(seed)
+    samples = packet.frame_samples(rate, frame_ms)
+    frame_s = samples / rate
+    jb = JitterBuffer(rate=rate, frames=samples, channels=channels, min_depth=2)
+    drift = DriftCompensator(rate, samples, channels) if compensate else None
+    pcm = np.zeros((samples, channels), dtype=np.int16)
+
+    send_period = frame_s / (1 + ppm * 1e-6)
+    next_send = 0.0
+    seq = 0
+    t_play = 0.0
+    depths = []
+    while t_play < seconds:
+        while next_send <= t_play:
+            arrival = next_send + rng.uniform(0, jitter_ms / 1000)
+            jb.push(seq & 0xFFFF, pcm, arrival)
+            seq += 1
+            next_send += send_period
+        if drift and not jb.buffering:
+            drift.update(jb.depth, jb.shifted)
+        frame = jb.pop()
+        if frame is None:
+            t_play += frame_s
+            continue
+        if drift:
+            frame = drift.process(frame)
+        t_play += len(frame) / rate
+        depths.append(jb.depth)
+
+    tail = depths[-len(depths) // 10:]
+    return {
+        "ppm": ppm,
+        "compensate": compensate,
+        "dropped": jb.dropped,
+        "inserted": jb.inserted,
+        "underruns": jb.underruns,
+        "concealed": jb.concealed,
+        "estimated_ppm": drift.ppm if drift else 0.0,
+        "depth_mean": float(np.mean(tail)) if tail else 0.0,
+        "target": jb.target,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Saat kayması telafisi ölçümü")
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--ppm", type=float, nargs="+", default=[-500, -100, 0, 100, 500])
+    args = parser.parse_args(argv)
+
+    print("Yeniden örnekleme maliyeti (48 kHz, stereo):")
+    print(f"{'çerçeve':>8} {'düz µs':>8} {'kübik µs':>9} {'bütçe %':>8}")
+    for frame_ms in packet.FRAME_DURATIONS_MS:
+        plain, cubic = cost(frame_ms)
+        print(f"{frame_ms:>6} ms {plain:8.1f} {cubic:9.1f} {cubic / (frame_ms * 10):8.2f}")
+
+    print(f"\nBenzetim ({args.seconds:.0f} s, 10 ms çerçeve, 2 ms titreşim):")
+    print(f"{'ppm':>6} {'telafi':>7} {'atılan':>7} {'eklenen':>8} {'boşalma':>8} "
+          f"{'gizlenen':>9} {'tahmin ppm':>11} {'derinlik':>9}")
+    results = []
+    for ppm in args.ppm:
+        for compensate in (False, True):
+            r = simulate(ppm, args.seconds, compensate)
+            results.append(r)
+            print(f"{r['ppm']:6.0f} {'açık' if compensate else 'kapalı':>7} {r['dropped']:7d} "
+                  f"{r['inserted']:8d} {r['underruns']:8d} {r['concealed']:9d} "
+                  f"{r['estimated_ppm']:11.0f} {r['depth_mean']:9.2f}")
+    return results
+
+if __name__ == "__main__":
+    main()
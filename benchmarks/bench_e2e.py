@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+Uçtan uca gecikme / verim ölçüm takımı.
+
+Gönderici ile alıcıyı aynı süreçte, localhost UDP üzerinden sentetik sesle
+çalıştırır (ses kartı gerekmez):
+
+* Ağızdan kulağa gecikme: kaynak sessizlik içinde işaret darbeleri üretir ve
+  her darbenin yakalandığı anı kaydeder; boş çıkış çalınan blokların zamanını
+  tutar. Darbenin çıkışta göründüğü an ile yakalandığı an arasındaki fark
+  ölçülür (çıkış aygıtının kendi tampon gecikmesi hariç).
+* Paket/saniye, thread başına işlemci kullanımı (Linux'ta /proc üzerinden),
+  tampon boşalması, gizlenen ve geç gelen çerçeve sayıları.
+* Çerçeve başına çekirdek ölçümleri: gönderici dönüştürme + paketleme + gönderim, alıcı
+  okuma + tampona koyma + çekme, kayma telafisi; süre ve geçici bellek.
+
+Sonuçlar JSON olarak yazılabilir; karşılaştırma kipi iki çalıştırmayı
+karşılaştırıp gerilemeleri işaretler (gerileme varsa çıkış kodu 1).
+
+Kullanım:
+    python -m benchmarks.bench_e2e [--duration 5] [--json sonuc.json]
+    python -m benchmarks.bench_e2e --compare onceki.json sonraki.json [--threshold 10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import tracemalloc
+import numpy as np
+from core import codecs, packet
+from core.audio_backend import NullBackend, get_backend
+from core.audio_receiver import AudioReceiver
+from core.audio_sender import AudioSender
+from core.drift import DriftCompensator
+from core.nack import RetransmitHistory
+
+RATE = 48000
+CHANNELS = 2
+PULSE_MS = 200      # İşaret darbeleri arası süre
+WARMUP = 0.5        # Bu süreden önce yakalanan darbeler (tampon dolumu) sayılmaz
+BASE_PORT = 47000
+
+SCENARIOS = {
+    "pcm16-10ms": {},
+    "pcm16-2.5ms-x4": {"frame_ms": 2.5, "frames_per_packet": 4},
+    "mulaw-10ms": {"codec": "mulaw"},
+    "lossless-10ms": {"codec": "lossless"},
+    "pcm16-10ms-fec4": {"fec_group": 4},
+}
+
+# Karşılaştırmada hangi ölçütlerin düşük olması iyidir ve gürültü sayılmayacak
+# en küçük mutlak fark.
+LOWER_IS_BETTER = {
+    "latency_ms": 1.0,
+    "cpu_percent": 1.0,
+    "us": 2.0,
+    "alloc_bytes": 256,
+    "underruns": 2,
+    "concealed": 5,
+    "late": 5,
+    "markers_lost": 1,
+}
+
+def _thread_cpu(thread):
+    """Bir thread'in harcadığı işlemci süresi (saniye); ölçülemiyorsa None."""
+    try:
+        with open(f"/proc/self/task/{thread.native_id}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, AttributeError, TypeError, ValueError, IndexError):
+        return None
+
+def _cpu(threads):
+    values = [_thread_cpu(t) for t in threads if t]
+    return None if None in values else sum(values)
+
+def _latencies(markers, sink, rate):
+    """Her işaret darbesi için yakalama → çalma gecikmesini (saniye) döndürür."""
+    log = list(sink.log)
+    if not log or len(log) != len(sink.blocks):
+        return []
+    x = np.concatenate([b[:, 0] for b in sink.blocks])
+    times = np.array([t for t, _, _ in log])
+    firsts = np.array([first for _, first, _ in log])
+    hot = x > 0.5
+    onsets = np.flatnonzero(hot[1:] & ~hot[:-1]) + 1
+    if len(onsets) == 0:
+        return []
+    block = np.searchsorted(firsts, onsets, side="right") - 1
+    heard = times[block] + (onsets - firsts[block]) / rate
+
+    result = []
+    for captured in markers:
+        k = np.searchsorted(heard, captured)
+        if k < len(heard) and heard[k] - captured < PULSE_MS / 1000:
+            result.append(heard[k] - captured)
+    return result
+
+def run_scenario(name, sender_kw, duration, port):
+    """Bir gönderici/alıcı çiftini `duration` saniye çalıştırır ve ölçümleri döndürür."""
+    source = get_backend(f"pulse:{PULSE_MS}")
+    sink_backend = NullBackend(keep=True)
+    receiver = AudioReceiver(port=port, rate=RATE, backend=sink_backend)
+    sender = AudioSender("127.0.0.1", dest_port=port, rate=RATE, channels=CHANNELS,
+                         device="pulse", backend=source, **sender_kw)
+    if not receiver.start_listening():
+        raise RuntimeError(f"Alıcı başlatılamadı (port {port})")
+    if not sender.start_streaming():
+        receiver.stop_listening()
+        raise RuntimeError("Gönderici başlatılamadı")
+
+    t0 = time.monotonic()
+    time.sleep(0.1)
+    sender_threads = (sender.capture_thread, sender.thread, sender.control_thread)
+    receiver_threads = (receiver.net_thread, receiver.thread, receiver.control_thread)
+    cpu0 = _cpu(sender_threads), _cpu(receiver_threads)
+    proc0, wall0 = time.process_time(), time.monotonic()
+    packets0 = sender.packets_sent
+    time.sleep(duration)
+    cpu1 = _cpu(sender_threads), _cpu(receiver_threads)
+    proc1, wall1 = time.process_time(), time.monotonic()
+    packets1 = sender.packets_sent
+
+    sender.stop_streaming()
+    time.sleep(0.3)
+    receiver.stop_listening()
+
+    wall = wall1 - wall0
+    markers = [m for m in source.source.markers if m - t0 > WARMUP]
+    lat = np.array(_latencies(markers, sink_backend.sink, RATE)) * 1000
+    jb = receiver.jitter
+
+    def pct(a, b):
+        return None if a is None or b is None else (b - a) / wall * 100
+
+    return {
+        "name": name,
+        "config": sender_kw,
+        "duration_s": round(wall, 3),
+        "latency_ms": {
+            "mean": float(lat.mean()) if len(lat) else None,
+            "p50": float(np.percentile(lat, 50)) if len(lat) else None,
+            "p95": float(np.percentile(lat, 95)) if len(lat) else None,
+            "max": float(lat.max()) if len(lat) else None,
+        },
+        "markers_sent": len(markers),
+        "markers_lost": len(markers) - len(lat),
+        "packets_per_s": (packets1 - packets0) / wall,
+        "frames_per_s": jb.received / (time.monotonic() - t0) if jb else 0,
+        "cpu_percent": {
+            "sender": pct(cpu0[0], cpu1[0]),
+            "receiver": pct(cpu0[1], cpu1[1]),
+            "process": (proc1 - proc0) / wall * 100,
+        },
+        "underruns": jb.underruns if jb else None,
+        "concealed": jb.concealed if jb else None,
+        "late": jb.late if jb else None,
+        "dropped": jb.dropped if jb else None,
+    }
+
+def _measure(fn, iterations):
+    """Çağrı başına süre (µs) ve geçici bellek tepe değeri (bayt)."""
+    for _ in range(min(iterations, 50)):
+        fn()
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    us = (time.perf_counter() - t0) / iterations * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(iterations, 200)):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return {"us": us, "alloc_bytes": float(np.mean(peaks))}
+
+def run_kernels(iterations=2000, frame_ms=packet.DEFAULT_FRAME_MS):
+    """Gönderici ve alıcıdaki çerçeve başına işlemlerin mikro ölçümleri."""
+    samples = packet.frame_samples(RATE, frame_ms)
+    rng = np.random.default_rng(3)
+    t = np.arange(samples) / RATE
+    data = np.repeat((0.5 * np.sin(2 * np.pi * 440 * t))[:, None], CHANNELS, axis=1).astype(np.float32)
+    data += rng.uniform(-0.01, 0.01, data.shape).astype(np.float32)
+    results = {}
+
+    # Gönderici: _stream_mic_thread döngüsünün paket başına işi (dönüştürme,
+    # kodlama, başlık, geçmiş ve localhost'taki okunmayan bir sokete gönderim)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    for codec in codecs.CODECS.values():
+        sender = AudioSender("127.0.0.1", dest_port=sink.getsockname()[1], rate=RATE,
+                             channels=CHANNELS, codec=codec.name, backend="null")
+        sender.history = RetransmitHistory()
+        with sender._dest_lock:
+            sender._open_link(sender.destinations[0])
+        tx = sender._tx_ring(sender._capture_ring(), codec, 1)
+        if codec.id == packet.PCM16:
+            results["send_convert"] = _measure(lambda: tx.convert(data, tx.pcm), iterations)
+
+        def send_packet(sender=sender, tx=tx, codec=codec):
+            sender._send_block(tx, data, time.monotonic(), codec, 1, None, 0)
+        results[f"send_packet_{codec.name}"] = _measure(send_packet, iterations)
+        with sender._dest_lock:
+            sender._close_link(sender.destinations[0])
+    sink.close()
+
+    # Alıcı: bir paketin başlık çözümü + tampona konması ve bir çerçevenin çekilmesi
+    receiver = AudioReceiver(rate=RATE, backend="null")
+    receiver._add_source(0, time.monotonic()).set_format((RATE, CHANNELS, samples))
+    pcm = (data * 32767).astype(np.int16)
+    row = receiver._rx[0]
+    row[packet.HEADER.size:packet.HEADER.size + pcm.nbytes] = np.frombuffer(pcm.tobytes(), dtype=np.uint8)
+    receiver._rx_len[0] = packet.HEADER.size + pcm.nbytes
+    seq = [0]
+
+    def recv_frame():
+        packet.pack_header_into(receiver._rx_views[0], seq[0], packet.PCM16, CHANNELS, 1, RATE,
+                                samples)
+        seq[0] = (seq[0] + 1) & 0xFFFF
+        receiver._ingest(1, time.monotonic())
+        return receiver.jitter.pop()
+    results["recv_frame"] = _measure(recv_frame, iterations)
+
+    drift = DriftCompensator(RATE, samples, CHANNELS)
+    drift.ratio = 1.0005
+    frame = data.copy()
+    results["drift_process"] = _measure(lambda: drift.process(frame), iterations)
+
+    for r in results.values():
+        r["budget_percent"] = r["us"] / (frame_ms * 10)
+    return results
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}/{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+    return out
+
+def _metrics(result):
+    """Sonuç dosyasını {"senaryo/ölçüt": değer} biçimine düzleştirir."""
+    flat = {}
+    for sc in result.get("scenarios", []):
+        _flatten(sc["name"], {k: v for k, v in sc.items() if k not in ("name", "config")}, flat)
+    _flatten("kernels", result.get("kernels", {}), flat)
+    return flat
+
+def compare(base, new, threshold=10.0):
+    """
+    İki sonucu karşılaştırır; (ölçüt, önceki, sonraki, değişim %, gerileme mi)
+    satırlarını döndürür.
+    """
+    a, b = _metrics(base), _metrics(new)
+    rows = []
+    for key in sorted(set(a) & set(b)):
+        metric = next((m for m in LOWER_IS_BETTER if m in key.split("/")), None)
+        old, cur = a[key], b[key]
+        change = (cur - old) / abs(old) * 100 if old else (0.0 if cur == old else float("inf"))
+        regressed = (metric is not None and cur - old > LOWER_IS_BETTER[metric]
+                     and change > threshold)
+        rows.append((key, old, cur, change, regressed))
+    return rows
+
+def _print_results(result):
+    print(f"{'senaryo':>16} {'gecikme ms':>11} {'p95':>7} {'paket/s':>8} {'gönd. %':>8} "
+          f"{'alıcı %':>8} {'boşalma':>8} {'gizlenen':>9} {'kayıp işaret':>13}")
+    for r in result["scenarios"]:
+        lat, cpu = r["latency_ms"], r["cpu_percent"]
+        fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+        print(f"{r['name']:>16} {fmt(lat['mean'], '11.2f')} {fmt(lat['p95'], '7.2f')} "
+              f"{r['packets_per_s']:8.1f} {fmt(cpu['sender'], '8.2f')} {fmt(cpu['receiver'], '8.2f')} "
+              f"{r['underruns']:8d} {r['concealed']:9d} {r['markers_lost']:13d}")
+    if result.get("kernels"):
+        print(f"\n{'çekirdek':>22} {'µs/çerçeve':>11} {'bütçe %':>8} {'geçici bayt':>12}")
+        for name, k in result["kernels"].items():
+            print(f"{name:>22} {k['us']:11.1f} {k['budget_percent']:8.2f} {k['alloc_bytes']:12.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uçtan uca gecikme / verim ölçümü")
+    parser.add_argument("--duration", type=float, default=5, help="Senaryo başına süre (saniye)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=2000, help="Çekirdek ölçümü tekrar sayısı")
+    parser.add_argument("--skip-kernels", action="store_true")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    parser.add_argument("--compare", nargs=2, metavar=("ONCEKI", "SONRAKI"),
+                        help="İki JSON sonucunu karşılaştır")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Gerileme eşiği (%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        rows = compare(base, new, args.threshold)
+        regressions = [r for r in rows if r[4]]
+        print(f"{'ölçüt':>44} {'önceki':>10} {'sonraki':>10} {'değişim':>9}")
+        for key, old, cur, change, regressed in rows:
+            flag = "  ⚠ GERİLEME" if regressed else ""
+            print(f"{key:>44} {old:10.2f} {cur:10.2f} {change:8.1f}%{flag}")
+        print(f"\n{len(regressions)} gerileme (eşik %{args.threshold:g}).")
+        return 1 if regressions else 0
+
+    result = {
+        "version": 1,
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "scenarios": [],
+        "kernels": {},
+    }
+    if not args.skip_e2e:
+        for i, name in enumerate(args.scenarios):
+            print(f"▶️  {name} ({args.duration:g} s)...")
+            result["scenarios"].append(run_scenario(name, SCENARIOS[name], args.duration,
+                                                    BASE_PORT + 10 * i))
+    if not args.skip_kernels:
+        result["kernels"] = run_kernels(args.iterations)
+
+    print()
+    _print_results(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾  Sonuçlar yazıldı: {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
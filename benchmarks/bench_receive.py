@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Alıcı tarafındaki paket okuma yolunun ölçümü.
+
+Eski yol (recvfrom + dilimleme + astype + bölme + deque) ile yeni yolu
+(recv_into + önceden ayrılmış halka tampon) localhost UDP üzerinde
+karşılaştırır; çekirdek başına paket/saniye ve paket başına geçici bellek
+kullanımını raporlar.
+
+Kullanım:
+    python -m benchmarks.bench_receive [--packets 20000]
+"""
+
+import argparse
+import collections
+import socket
+import time
+import tracemalloc
+import numpy as np
+from core import packet
+from core.audio_receiver import AudioReceiver, RX_BATCH
+
+RATE = 48000
+CHANNELS = 2
+FRAME = packet.frame_samples(RATE, packet.DEFAULT_FRAME_MS)
+
+def _socket_pair():
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    rx.bind(("127.0.0.1", 0))
+    rx.setblocking(False)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tx.connect(rx.getsockname())
+    return rx, tx
+
+def _packets():
+    pcm = (np.sin(np.arange(FRAME * CHANNELS) / 10) * 20000).astype(np.int16).tobytes()
+    return [packet.pack_header(i, packet.PCM16, CHANNELS, 1, RATE, FRAME) + pcm for i in range(0x10000)]
+
+def _legacy_round(rx, jitter):
+    """Değişiklik öncesi okuma yolu."""
+    n = 0
+    while True:
+        try:
+            pkt, _ = rx.recvfrom(4096)
+        except BlockingIOError:
+            break
+        pcm = np.frombuffer(pkt[packet.HEADER.size:], dtype=np.int16)
+        jitter.append(pcm.reshape(-1, 2).astype(np.float32) / 32767)
+        n += 1
+    while jitter:
+        jitter.popleft()
+    return n
+
+def _ring_round(rx, receiver):
+    """recv_into + halka tampon okuma yolu."""
+    total = 0
+    while True:
+        n = receiver._drain(rx)
+        if not n:
+            break
+        receiver._ingest(n, time.monotonic())
+        total += n
+    while receiver.jitter.depth:
+        receiver.jitter.pop()
+    return total
+
+def _run(name, round_func, state, packets, count):
+    rx, tx = _socket_pair()
+    sent = cpu = 0.0
+    received = 0
+    peak = 0
+    tracemalloc.start()
+    try:
+        while sent < count:
+            for _ in range(RX_BATCH):
+                tx.send(packets[int(sent) & 0xFFFF])
+                sent += 1
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            t0 = time.thread_time()
+            n = round_func(rx, state)
+            cpu += time.thread_time() - t0
+            _, top = tracemalloc.get_traced_memory()
+            received += n
+            peak = max(peak, (top - base) / max(n, 1))
+    finally:
+        tracemalloc.stop()
+        rx.close()
+        tx.close()
+
+    # tracemalloc yükü olmadan saf hız ölçümü
+    rx, tx = _socket_pair()
+    clean_cpu = 0.0
+    clean_n = 0
+    for i in range(count // RX_BATCH):
+        for j in range(RX_BATCH):
+            tx.send(packets[(i * RX_BATCH + j) & 0xFFFF])
+        t0 = time.thread_time()
+        clean_n += round_func(rx, state)
+        clean_cpu += time.thread_time() - t0
+    rx.close()
+    tx.close()
+
+    return {
+        "name": name,
+        "packets": clean_n,
+        "packets_per_sec_per_core": clean_n / clean_cpu if clean_cpu else float("inf"),
+        "us_per_packet": clean_cpu / max(clean_n, 1) * 1e6,
+        "transient_bytes_per_packet": peak,
+        "lost_in_kernel": int(sent) - received,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alıcı okuma yolu ölçümü")
+    parser.add_argument("--packets", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    packets = _packets()
+    receiver = AudioReceiver(max_buffer=RX_BATCH * 2, backend="null")
+    receiver._add_source(0, time.monotonic()).set_format((RATE, CHANNELS, FRAME))
+    results = [
+        _run("legacy", _legacy_round, collections.deque(maxlen=RX_BATCH * 2), packets, args.packets),
+        _run("ring", _ring_round, receiver, packets, args.packets),
+    ]
+    for r in results:
+        print(f"{r['name']:>8}: {r['packets_per_sec_per_core']:>10.0f} paket/s/çekirdek  "
+              f"{r['us_per_packet']:6.2f} µs/paket  "
+              f"{r['transient_bytes_per_packet']:8.1f} B/paket geçici bellek")
+    speedup = results[1]["packets_per_sec_per_core"] / results[0]["packets_per_sec_per_core"]
+    print(f"Hızlanma: {speedup:.2f}x")
+    return results
+
+if __name__ == "__main__":
+    main()
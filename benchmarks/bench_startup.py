@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Uygulama açılış süresi ölçümü.
+
+Her ölçüm temiz bir alt süreçte yapılır (yüklenmiş modül yok, .pyc'ler hazır):
+
+* cli      `yakamoz` komut satırı modülünün yüklenmesi ve ayrıştırıcının kurulması
+* gui      arayüz modülünün (ui.main_window) yüklenmesi
+* window   App penceresinin oluşturulup ilk kez çizilmesi (ekran gerekir)
+
+Her senaryo için süreç içi süre ve yorumlayıcının açılışı dahil toplam süre
+(en iyi / ortanca, ms), bir de açılışta yüklenmemesi gereken ağır
+modüllerden (numpy, soundcard, PIL, pystray) yüklenenler raporlanır. Ortanca
+süre bütçeyi aşarsa veya yasak bir modül yüklenirse çıkış kodu 1 olur.
+customtkinter veya ekran yoksa arayüz senaryoları atlanır.
+
+Kullanım:
+    python -m benchmarks.bench_startup [--runs 5] [--json sonuc.json]
+    python -m benchmarks.bench_startup --budget-cli-ms 150 --budget-gui-ms 600 --budget-window-ms 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RESULT_PREFIX = "BENCH_RESULT "
+HEAVY_MODULES = ("numpy", "soundcard", "PIL", "pystray")
+
+# Senaryo adı -> (alt süreçte ölçülen kod, açılışta yüklenmemesi gereken modüller).
+# Pencere çizildikten sonra tepsi simgesi kendi thread'inde PIL ve pystray'i
+# yükleyebilir; pencere senaryosunda yalnızca ses modülleri yasaktır.
+SCENARIOS = {
+    "cli": ("import yakamoz\nyakamoz.build_parser()", HEAVY_MODULES),
+    "gui": ("import ui.main_window", HEAVY_MODULES),
+    "window": ("from ui.main_window import App\napp = App()\napp.update_idletasks()\napp.update()",
+               ("numpy", "soundcard")),
+}
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+try:
+{body}
+    error = None
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = (time.perf_counter() - t0) * 1000
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print({prefix!r} + json.dumps({{"ms": elapsed, "loaded": loaded, "error": error}}), flush=True)
+"""
+
+def _run_once(name):
+    """Senaryoyu temiz bir alt süreçte bir kez çalıştırır; sonucu döndürür."""
+    code, _ = SCENARIOS[name]
+    body = "\n".join("    " + line for line in code.splitlines())
+    source = CHILD.format(body=body, heavy=HEAVY_MODULES, prefix=RESULT_PREFIX)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", source], cwd=root, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    result = None
+    for line in proc.stdout:
+        if line.startswith(RESULT_PREFIX):
+            total = (time.perf_counter() - t0) * 1000
+            result = json.loads(line[len(RESULT_PREFIX):])
+            result["total_ms"] = total
+            break
+    proc.kill()
+    proc.wait()
+    if result is None:
+        result = {"ms": None, "total_ms": None, "loaded": [], "error": "sonuç alınamadı"}
+    return result
+
+def run_scenario(name, runs):
+    """Senaryoyu `runs` kez ölçer; süre özetlerini ve yüklenen ağır modülleri döndürür."""
+    results = [_run_once(name) for _ in range(runs)]
+    errors = [r["error"] for r in results if r["error"]]
+    if errors:
+        return {"name": name, "skipped": errors[0]}
+    ms = [r["ms"] for r in results]
+    total = [r["total_ms"] for r in results]
+    loaded = sorted(set(m for r in results for m in r["loaded"]))
+    forbidden = [m for m in loaded if m in SCENARIOS[name][1]]
+    return {
+        "name": name,
+        "ms": {"min": min(ms), "median": statistics.median(ms)},
+        "total_ms": {"min": min(total), "median": statistics.median(total)},
+        "loaded": loaded,
+        "forbidden": forbidden,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Açılış süresi ölçümü")
+    parser.add_argument("--runs", type=int, default=5, help="Senaryo başına tekrar sayısı")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--budget-cli-ms", type=float, default=150,
+                        help="Komut satırı modülünün yüklenme bütçesi (ortanca, ms)")
+    parser.add_argument("--budget-gui-ms", type=float, default=600,
+                        help="Arayüz modülünün yüklenme bütçesi (ortanca, ms)")
+    parser.add_argument("--budget-window-ms", type=float, default=2000,
+                        help="İlk pencerenin çizilme bütçesi (ortanca, ms)")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    args = parser.parse_args(argv)
+
+    budgets = {"cli": args.budget_cli_ms, "gui": args.budget_gui_ms, "window": args.budget_window_ms}
+    result = {"version": 1, "timestamp": time.time(), "python": sys.version.split()[0],
+              "budgets_ms": budgets, "scenarios": []}
+    failed = []
+    print(f"{'senaryo':>8} {'süre ms':>9} {'ortanca':>9} {'toplam ms':>10} {'bütçe':>7}  ağır modüller")
+    for name in args.scenarios:
+        sc = run_scenario(name, args.runs)
+        result["scenarios"].append(sc)
+        if "skipped" in sc:
+            print(f"{name:>8}  atlandı ({sc['skipped']})")
+            continue
+        over = sc["ms"]["median"] > budgets[name]
+        flag = "  ⚠ BÜTÇE AŞILDI" if over else ""
+        if sc["forbidden"]:
+            flag += f"  ⚠ YÜKLENMEMELİ: {', '.join(sc['forbidden'])}"
+        if over or sc["forbidden"]:
+            failed.append(name)
+        print(f"{name:>8} {sc['ms']['min']:9.1f} {sc['ms']['median']:9.1f} "
+              f"{sc['total_ms']['median']:10.1f} {budgets[name]:7g}  {', '.join(sc['loaded']) or '-'}{flag}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Sonuçlar yazıldı: {args.json}")
+    if failed:
+        print(f"\n{len(failed)} senaryo bütçeyi aştı: {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
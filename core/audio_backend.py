@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ses giriş/çıkış arka uçları.
+
+Gönderici, alıcı ve aygıt yöneticisi ses donanımına doğrudan değil, bu
+arayüz üzerinden erişir. Arayüz `soundcard` modülüyle aynı biçimdedir:
+kaynakların `recorder(samplerate, blocksize, channels)` bağlam yöneticisi
+`record(numframes)` ile (n, kanal) float32 dizi döndürür; çıkışların
+`player(...)` bağlam yöneticisi `play(data)` ile veri tüketir.
+
+Arka uçlar bir tanım dizesiyle seçilir:
+    "soundcard"        Gerçek ses kartı (varsayılan)
+    "sine[:frekans]"   Sinüs üreteci kaynağı (ör. "sine:440")
+    "noise"            Beyaz gürültü kaynağı
+    "pulse[:ms]"       Sessizlik içinde belirli aralıklarla işaret darbesi (gecikme ölçümü için)
+    "wav:dosya.wav"    WAV dosyasından okuyan kaynak / WAV dosyasına yazan çıkış
+    "null"             Tükettiği her bloğun zamanını kaydeden boş çıkış
+
+Donanım dışındaki arka uçlar `speed` ile hızlandırılabilir: 1 gerçek zaman,
+2 iki kat hız, 0 ise hiç beklemeden (gerçek zamandan hızlı).
+"""
+
+import collections
+import time
+import wave
+import numpy as np
+
+DEFAULT_BACKEND = "soundcard"
+NULL_LOG = 100000  # Boş çıkışın sakladığı en fazla blok kaydı
+PULSE_SAMPLES = 48  # İşaret darbesinin uzunluğu (örnek)
+
+_soundcard_backend = None
+
+class _Pacer:
+    """Üretilen/tüketilen örnek sayısını gerçek zamana (veya `speed` katına) bağlar."""
+    def __init__(self, rate, speed):
+        self.rate = rate
+        self.speed = speed
+        self.start = None
+        self.samples = 0
+
+    def advance(self, n, ahead=0):
+        """n örneği sayar ve saat (en fazla `ahead` örnek önde) yetişene kadar bekler."""
+        if self.start is None:
+            self.start = time.monotonic()
+        self.samples += n
+        if self.speed > 0:
+            delay = self.start + (self.samples - ahead) / (self.rate * self.speed) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+class Backend:
+    """
+    Arka uç arayüzü. Kaynak (geri döngü mikrofonu) veya çıkış (hoparlör)
+    sağlamayan arka uçlar ilgili yöntemlerde hata verir.
+    """
+    name = None
+
+    def microphones(self):
+        """Kullanılabilir geri döngü kaynaklarının listesi."""
+        return []
+
+    def get_microphone(self, name):
+        for mic in self.microphones():
+            if mic.name == name:
+                return mic
+        raise ValueError(f"'{self.name}' arka ucunda kaynak bulunamadı: {name}")
+
+    def speakers(self):
+        """Kullanılabilir çıkışların listesi."""
+        return []
+
+    def default_speaker(self):
+        speakers = self.speakers()
+        if not speakers:
+            raise ValueError(f"'{self.name}' arka ucunda çıkış yok")
+        return speakers[0]
+
+    def get_speaker(self, name):
+        for spk in self.speakers():
+            if spk.name == name:
+                return spk
+        raise ValueError(f"'{self.name}' arka ucunda çıkış bulunamadı: {name}")
+
+    def native_format(self, device):
+        """
+        Aygıtın doğal biçimi (örnekleme hızı, kanal sayısı); bilinmeyenler None.
+        Bilinmeyen değerlerde aygıt istenen biçimle açılabilir (dönüştürmeyi
+        işletim sistemi veya arka uç yapar).
+        """
+        return getattr(device, "samplerate", None), getattr(device, "channels", None)
+
+# --------------------------------------------------------------------------
+# soundcard
+# --------------------------------------------------------------------------
+
+class SoundcardBackend(Backend):
+    """`soundcard` kütüphanesi üzerinden gerçek ses kartları."""
+    name = "soundcard"
+
+    def __init__(self):
+        import soundcard  # İsteğe bağlı bağımlılık: yalnızca bu arka uç seçilince gerekir
+        self.sc = soundcard
+
+    def microphones(self):
+        return self.sc.all_microphones(include_loopback=True)
+
+    def get_microphone(self, name):
+        # `get_microphone` tam ad eşleşmesi bekler.
+        return self.sc.get_microphone(name, include_loopback=True)
+
+    def speakers(self):
+        return self.sc.all_speakers()
+
+    def default_speaker(self):
+        return self.sc.default_speaker()
+
+    def get_speaker(self, name):
+        return self.sc.get_speaker(name)
+
+# --------------------------------------------------------------------------
+# Üreteç (sinüs / gürültü / darbe)
+# --------------------------------------------------------------------------
+
+class _GeneratorRecorder:
+    def __init__(self, source, samplerate, blocksize, channels):
+        self.source = source
+        self.rate = samplerate
+        self.channels = channels
+        self.pacer = _Pacer(samplerate, source.speed)
+        self.phase = 0
+        self.rng = np.random.default_rng(source.seed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, numframes):
+        src = self.source
+        start = self.phase
+        onsets = []
+        if src.kind == "noise":
+            x = self.rng.uniform(-src.amplitude, src.amplitude, numframes)
+        elif src.kind == "pulse":
+            x = np.zeros(numframes)
+            period = max(PULSE_SAMPLES * 2, int(self.rate * src.interval_ms / 1000))
+            first = -(-start // period) * period
+            for onset in range(first - period, start + numframes, period):
+                lo, hi = max(onset, start), min(onset + PULSE_SAMPLES, start + numframes)
+                if lo < hi:
+                    x[lo - start:hi - start] = src.amplitude
+                if onset >= start:
+                    onsets.append(onset)
+        else:
+            t = np.arange(start, start + numframes) / self.rate
+            x = src.amplitude * np.sin(2 * np.pi * src.frequency * t)
+        self.phase += numframes
+        self.pacer.advance(numframes)
+        if onsets:
+            # Blok şimdi tamamlandı; her darbenin başladığı an geriye doğru hesaplanır.
+            now = time.monotonic()
+            end = start + numframes
+            src.markers.extend(now - (end - onset) / self.rate for onset in onsets)
+        return np.repeat(x.astype(np.float32)[:, None], self.channels, axis=1)
+
+class GeneratorSource:
+    """
+    Sinüs, beyaz gürültü veya işaret darbesi üreten sentetik kaynak. Darbe
+    türünde her darbenin yakalandığı an (monotonic) `markers`'a eklenir.
+    """
+    def __init__(self, kind="sine", frequency=440.0, amplitude=0.5, speed=1.0, seed=0,
+                 interval_ms=200.0):
+        self.kind = kind
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.speed = speed
+        self.seed = seed
+        self.interval_ms = interval_ms
+        self.markers = []
+        if kind == "sine":
+            self.name = f"sine {frequency:g} Hz"
+        elif kind == "pulse":
+            self.name = f"pulse {interval_ms:g} ms"
+        else:
+            self.name = kind
+
+    def recorder(self, samplerate, blocksize=None, channels=2):
+        return _GeneratorRecorder(self, samplerate, blocksize, channels)
+
+class GeneratorBackend(Backend):
+    """Tek bir sentetik kaynak sağlayan arka uç."""
+    name = "generator"
+
+    def __init__(self, kind="sine", frequency=440.0, amplitude=0.5, speed=1.0, interval_ms=200.0):
+        self.source = GeneratorSource(kind, frequency, amplitude, speed, interval_ms=interval_ms)
+
+    def microphones(self):
+        return [self.source]
+
+    def get_microphone(self, name):
+        # Tek kaynak var; aygıt adı ne olursa olsun o kullanılır.
+        return self.source
+
+# --------------------------------------------------------------------------
+# WAV dosyası
+# --------------------------------------------------------------------------
+
+class _WavRecorder:
+    def __init__(self, source, samplerate, channels):
+        self.channels = channels
+        self.loop = source.loop
+        self.pacer = _Pacer(samplerate, source.speed)
+        with wave.open(source.path, "rb") as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"Yalnızca 16 bit WAV destekleniyor: {source.path}")
+            if f.getframerate() != samplerate:
+                print(f"⚠️  {source.path} {f.getframerate()} Hz, akış {samplerate} Hz; "
+                      f"yeniden örnekleme yapılmadan okunuyor.")
+            data = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+            data = data.reshape(-1, f.getnchannels())
+        if data.shape[1] != channels:
+            data = np.repeat(data.mean(axis=1, keepdims=True), channels, axis=1)
+        self.data = data.astype(np.float32) / 32767
+        self.pos = 0
+        self.finished = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, numframes):
+        out = np.zeros((numframes, self.channels), dtype=np.float32)
+        filled = 0
+        while filled < numframes and len(self.data):
+            n = min(numframes - filled, len(self.data) - self.pos)
+            out[filled:filled + n] = self.data[self.pos:self.pos + n]
+            filled += n
+            self.pos += n
+            if self.pos >= len(self.data):
+                if not self.loop:
+                    self.finished = True
+                    break
+                self.pos = 0
+        self.pacer.advance(numframes)
+        return out
+
+class WavSource:
+    """16 bit WAV dosyasından okuyan kaynak; dosya bitince başa döner (loop) veya sessizlik verir."""
+    def __init__(self, path, loop=True, speed=1.0):
+        self.path = path
+        self.loop = loop
+        self.speed = speed
+        self.name = path
+
+    def recorder(self, samplerate, blocksize=None, channels=2):
+        return _WavRecorder(self, samplerate, channels)
+
+class _WavPlayer:
+    def __init__(self, sink, samplerate, blocksize, channels):
+        self.sink = sink
+        self.rate = samplerate
+        self.channels = channels
+        self.pacer = _Pacer(samplerate, sink.speed)
+        self.ahead = blocksize or 0
+        self.file = None
+
+    def __enter__(self):
+        self.file = wave.open(self.sink.path, "wb")
+        self.file.setnchannels(self.channels)
+        self.file.setsampwidth(2)
+        self.file.setframerate(self.rate)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file:
+            self.file.close()
+            self.file = None
+        return False
+
+    def play(self, data):
+        pcm = np.clip(np.asarray(data, dtype=np.float32), -1.0, 1.0) * 32767
+        self.file.writeframes(pcm.astype("<i2").tobytes())
+        self.pacer.advance(len(data), self.ahead)
+
+class WavSink:
+    """Çalınan sesi 16 bit WAV dosyasına yazan çıkış (her açılışta dosya yeniden yazılır)."""
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.name = path
+
+    def player(self, samplerate, blocksize=None, channels=2):
+        return _WavPlayer(self, samplerate, blocksize, channels)
+
+class WavBackend(Backend):
+    """Aynı dosya yolunu kaynak olarak okuyan veya çıkış olarak yazan arka uç."""
+    name = "wav"
+
+    def __init__(self, path, loop=True, speed=1.0):
+        self.source = WavSource(path, loop, speed)
+        self.sink = WavSink(path, speed)
+
+    def microphones(self):
+        return [self.source]
+
+    def get_microphone(self, name):
+        return self.source
+
+    def speakers(self):
+        return [self.sink]
+
+    def get_speaker(self, name):
+        return self.sink
+
+    def native_format(self, device):
+        if device is self.source:
+            try:
+                with wave.open(self.source.path, "rb") as f:
+                    return f.getframerate(), f.getnchannels()
+            except (OSError, EOFError, wave.Error):
+                return None, None
+        # Yazılan dosya her biçimde açılabilir
+        return None, None
+
+# --------------------------------------------------------------------------
+# Boş çıkış
+# --------------------------------------------------------------------------
+
+class _NullPlayer:
+    def __init__(self, sink, samplerate, blocksize, channels):
+        self.sink = sink
+        self.rate = samplerate
+        self.channels = channels
+        self.pacer = _Pacer(samplerate, sink.speed)
+        self.ahead = blocksize or 0
+
+    def __enter__(self):
+        self.sink.players += 1
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def play(self, data):
+        sink = self.sink
+        n = len(data)
+        sink.log.append((time.monotonic(), sink.consumed, n))
+        if sink.keep:
+            sink.blocks.append(np.array(data, dtype=np.float32))
+        sink.consumed += n
+        self.pacer.advance(n, self.ahead)
+
+class NullSink:
+    """
+    Sesi atan, ancak her bloğun tüketildiği anı (monotonic), bloğun akıştaki
+    ilk örneğinin sırasını ve uzunluğunu `log`'a yazan çıkış. `keep` açıksa
+    blokların kopyaları da `blocks`'ta saklanır.
+    """
+    name = "null"
+
+    def __init__(self, speed=1.0, keep=False):
+        self.speed = speed
+        self.keep = keep
+        self.log = collections.deque(maxlen=NULL_LOG)  # (zaman, ilk örnek, örnek sayısı)
+        self.blocks = []
+        self.consumed = 0
+        self.players = 0
+
+    def player(self, samplerate, blocksize=None, channels=2):
+        return _NullPlayer(self, samplerate, blocksize, channels)
+
+class NullBackend(Backend):
+    """Tek bir boş çıkış sağlayan arka uç."""
+    name = "null"
+
+    def __init__(self, speed=1.0, keep=False):
+        self.sink = NullSink(speed, keep)
+
+    def speakers(self):
+        return [self.sink]
+
+    def get_speaker(self, name):
+        return self.sink
+
+def get_backend(spec=None, speed=1.0):
+    """
+    Tanım dizesine göre bir arka uç oluşturur (bkz. modül açıklaması).
+    Zaten bir Backend nesnesi verilirse aynen döndürülür.
+    """
+    if isinstance(spec, Backend):
+        return spec
+    spec = spec or DEFAULT_BACKEND
+    kind, _, arg = spec.partition(":")
+    if kind == "soundcard":
+        # Durumsuzdur; tek örnek paylaşılır (aygıt kayıt defteri de paylaşılsın diye)
+        global _soundcard_backend
+        if _soundcard_backend is None:
+            _soundcard_backend = SoundcardBackend()
+        return _soundcard_backend
+    if kind == "sine":
+        return GeneratorBackend("sine", float(arg) if arg else 440.0, speed=speed)
+    if kind == "noise":
+        return GeneratorBackend("noise", speed=speed)
+    if kind == "pulse":
+        return GeneratorBackend("pulse", amplitude=0.8, speed=speed,
+                                interval_ms=float(arg) if arg else 200.0)
+    if kind == "wav":
+        if not arg:
+            raise ValueError("WAV arka ucu için dosya yolu gerekli (ör. wav:kayit.wav)")
+        return WavBackend(arg, speed=speed)
+    if kind == "null":
+        return NullBackend(speed)
+    raise ValueError(f"Bilinmeyen ses arka ucu: {spec} (soundcard, sine[:Hz], noise, pulse[:ms], wav:dosya, null)")
@@ -2,106 +2,653 @@
 
 """
 Ağdan gelen ses verisini alıp çalan modül.
+
+Aynı porta birden çok gönderici ses yollayabilir: paketler akış kimliğine
+göre kaynaklara ayrılır (bkz. core.source), her kaynak kendi jitter
+tamponundan çekilir ve kaynaklar tek bir çıkış aygıtında karıştırılır.
 """
 
 import socket
+import selectors
+import struct
 import threading
-import collections
 import time
-import struct
 import numpy as np
-import soundcard as sc
+from core import clock, codecs, packet
+from core.audio_backend import get_backend
+from core.device_registry import get_registry
+from core.feedback import REPORT_INTERVAL
+from core.mixer import SourceMixer
+from core.negotiation import Caps
+from core.source import MAX_SOURCES, SOURCE_TIMEOUT, Source
+from core.stats import Stats
+
+RX_BATCH = 64            # Bir uyanışta okunacak en fazla paket
+RECV_BUFFER = 1 << 20    # Çekirdek alma kuyruğu boyutu (bayt)
+POLL_TIMEOUT = 0.2       # Boşta bekleme süresi (saniye)
+
+# Kaynak başına sayaçlar: metrik adı -> (nesne, öznitelik). Atılan kaynakların
+# değerleri toplamda kalır, böylece sayaçlar geriye gitmez.
+SOURCE_COUNTERS = {
+    "frames_received": ("jitter", "received"), "gaps": ("jitter", "gaps"),
+    "reordered": ("jitter", "reordered"), "duplicates": ("jitter", "duplicates"),
+    "late": ("jitter", "late"), "concealed": ("jitter", "concealed"),
+    "underruns": ("jitter", "underruns"), "overruns": ("jitter", "overruns"),
+    "dropped": ("jitter", "dropped"), "inserted": ("jitter", "inserted"),
+    "fec_recovered": ("fec", "recovered"), "nacks_sent": ("nack", "sent"),
+    "retransmits_received": ("nack", "retransmits"), "reports_sent": ("feedback", "sent"),
+}
 
 class AudioReceiver:
     """
     UDP üzerinden gelen ses verisini dinleyen ve varsayılan ses aygıtında çalan sınıf.
+    Akış biçimi (örnekleme hızı, kanal, çerçeve boyu) paket başlıklarından okunur.
+
+    Alıcı, çıkış aygıtının doğal biçimini (bilinmeyen değerler için `rate` ve
+    `channels` tercihlerini) göndericiye bildirir (bkz. core.negotiation).
+    Çıkış aygıtı akıştan gerçekten farklı bir biçimdeyse ses burada, bir kez
+    dönüştürülür; aksi halde hiçbir dönüştürme yapılmaz.
+
+    En fazla `max_sources` gönderici aynı anda çalınır. Tek kaynak varken
+    çerçeveleri doğrudan çalınır; birden çok kaynak kazançlarıyla (bkz.
+    `set_gain`) karıştırılır. `source_timeout` saniye sessiz kalan kaynak atılır.
     """
-    def __init__(self, port=5555, rate=48000, prebuffer=2):
+    def __init__(self, port=5555, rate=48000, prebuffer=1, max_buffer=50, nack=True, drift=True,
+                 multicast_group=None, device=None, backend=None, feedback=True, channels=2,
+                 max_sources=MAX_SOURCES, source_timeout=SOURCE_TIMEOUT):
         self.port = port
         self.control_port = port + 1
-        self.rate = rate
-        self.prebuffer = prebuffer
+        self.preferred_format = (rate, channels)  # Aygıtın biçimi bilinmiyorsa bildirilen
+        self.output_format = None   # Player'ın açıldığı (rate, channels)
+        self.prebuffer = prebuffer  # Jitter tamponunun en küçük hedef derinliği (çerçeve)
+        self.max_buffer = max_buffer
         self.sock = None
         self.control_sock = None
         self.player = None
         self.speaker = None
         self.listening = False
         self.thread = None
+        self.net_thread = None
         self.control_thread = None
-        self.jitter = None
+        self.cond = threading.Condition()
+        self.malformed = 0
+        self.nack = nack            # Kaynak başına NACK ile yeniden gönderim isteği
+        self.drift = drift          # Kaynak başına saat kayması telafisi
+        self.feedback = feedback    # Göndericilere periyodik rapor
+        self.sources = {}           # akış kimliği -> Source
+        self.gains = {}             # akış kimliği veya gönderici IP'si -> karıştırma kazancı
+        self.max_sources = max_sources
+        self.source_timeout = source_timeout
+        self.sources_evicted = 0
+        self.sources_rejected = 0   # Kaynak sınırı dolu olduğu için atılan paketler
+        self._retired = {}          # Atılan kaynakların sayaç toplamları
+        self._mixer = None          # Çok kaynaklı karıştırıcı (bkz. core.mixer.SourceMixer)
+        self.multicast_group = multicast_group  # Katılınacak çoklu yayın grubu (ör. "239.0.0.1")
+        self.device_name = device   # None: varsayılan hoparlör (değişirse onu izler)
+        self.backend = get_backend(backend)  # Ses çıkışı (bkz. core.audio_backend)
+        self.registry = None        # Aygıt önbelleği (bkz. core.device_registry)
+        self._switch_output = False # Çalma thread'i sıradaki döngüde çıkışı yeniden açar
+        self.packets_received = 0
+        self.bytes_received = 0
+        self.play_errors = 0
+        self.last_block = None      # Son çalınan blok (seviye göstergeleri için; dizi yeniden kullanılır)
+        self.stats = Stats("receiver", port=port)
+        self.stats.add_source(self._stats_values)
+        self.play_latency = self.stats.histogram("receive_to_play_ms")
+        self.net_delay = self.stats.histogram("network_delay_ms")
+        self.glass_latency = self.stats.histogram("glass_to_glass_ms")
+        self._alloc_rx()
+
+    @property
+    def lead(self):
+        """Çıkış biçimini belirleyen kaynak: akış biçimi bilinen en eski kaynak (yoksa None)."""
+        for source in list(self.sources.values()):
+            if source.jitter is not None:
+                return source
+        return None
+
+    @property
+    def jitter(self):
+        """Öndeki kaynağın jitter tamponu (tek göndericili kullanım için); yoksa None."""
+        lead = self.lead
+        return lead.jitter if lead else None
+
+    @property
+    def stream_format(self):
+        lead = self.lead
+        return lead.stream_format if lead else None
 
-    def _open_player(self):
-        """Varsayılan hoparlörü açar ve player nesnesini döndürür."""
-        FRAME = 480  # 10 ms @ 48 kHz
+    def _source_counters(self, source):
+        values = {}
+        for name, (part, attr) in SOURCE_COUNTERS.items():
+            obj = getattr(source, part)
+            if obj is not None:
+                values[name] = getattr(obj, attr)
+        return values
+
+    def _retire(self, source):
+        """Atılan kaynağın sayaçlarını toplama ekler (kilit tutulurken)."""
+        for name, value in self._source_counters(source).items():
+            self._retired[name] = self._retired.get(name, 0) + value
+
+    def _stats_values(self):
+        """İstatistik anlık görüntüsü için sayaçları toplar (bkz. core.stats)."""
+        values = {"packets_received": self.packets_received, "bytes_received": self.bytes_received,
+                  "malformed": self.malformed, "play_errors": self.play_errors,
+                  "sources_evicted": self.sources_evicted, "sources_rejected": self.sources_rejected}
+        values.update(self._retired)
+        sources = list(self.sources.values())
+        values["sources"] = len(sources)
+        for source in sources:
+            for name, value in self._source_counters(source).items():
+                values[name] = values.get(name, 0) + value
+        # Göstergelerde en kötü kaynak; kayma ve saat farkı öndeki kaynağın
+        active = [source.jitter for source in sources if source.jitter is not None]
+        if active:
+            values.update(jitter_ms=max(j.jitter for j in active) * 1000,
+                          buffer_depth=max(j.depth for j in active),
+                          buffer_target=max(j.target for j in active))
+        lead = self.lead
+        if lead and lead.clock_offset is not None:
+            values.update(clock_offset_ms=lead.clock_offset * 1000, rtt_ms=lead.path_rtt * 1000)
+        if lead and lead.drift:
+            values["drift_ppm"] = lead.drift.ppm
+        mixer = self._mixer
+        if mixer:
+            values["mix_limited"] = mixer.limited
+        return values
+
+    def snapshot(self):
+        """Alıcının sayaç, gösterge ve gecikme histogramlarının anlık görüntüsü."""
+        return self.stats.snapshot()
+
+    def discovery_info(self):
+        """Ağ keşfinde duyurulan bilgiler (bkz. core.network_discovery): port, biçim ve yük."""
+        caps = self._caps()
+        return {"port": self.port, "rate": caps.rate, "channels": caps.channels,
+                "formats": [codecs.CODECS[i].name for i in caps.formats],
+                "load": len(self.sources), "max_sources": self.max_sources}
+
+    def _caps(self):
+        """Göndericiye bildirilecek biçim: çıkış aygıtının doğal biçimi, bilinmeyenler için tercihler."""
+        spk = self.registry.speaker(self.device_name) if self.registry else None
+        rate, channels = self.backend.native_format(spk) if spk else (None, None)
+        return Caps(rate or self.preferred_format[0], channels or self.preferred_format[1])
+
+    def _open_player(self, fmt):
+        """
+        Hoparlörü (belirtilmediyse varsayılanı) açar ve player nesnesini
+        döndürür. Aygıt, listeleme yapılmadan önbellekten alınır. Doğal biçimi
+        biliniyorsa o biçimle, bilinmiyorsa öndeki kaynağın akış biçimiyle
+        (`fmt`) açılır.
+        """
         try:
-            spk = sc.default_speaker()
-            print(f"🔊  Çıkış → {spk.name}")
-            player = spk.player(samplerate=self.rate, blocksize=FRAME, channels=2)
+            spk = self.registry.speaker(self.device_name)
+            if spk is None:
+                raise ValueError("çıkış aygıtı yok")
+            if self.device_name and spk.name != self.device_name:
+                print(f"‼️ '{self.device_name}' bulunamadı, varsayılan çıkış kullanılıyor.")
+            stream_rate, stream_channels, frames = fmt
+            native_rate, native_channels = self.backend.native_format(spk)
+            rate = native_rate or stream_rate
+            channels = native_channels or stream_channels
+            self.output_format = (rate, channels)
+            converted = "" if (rate, channels) == (stream_rate, stream_channels) else \
+                f", akış {stream_rate} Hz / {stream_channels} kanal dönüştürülüyor"
+            print(f"🔊  Çıkış → {spk.name} ({rate} Hz, {channels} kanal{converted})")
+            blocksize = int(round(frames * rate / stream_rate))
+            player = spk.player(samplerate=rate, blocksize=blocksize, channels=channels)
+            player.__enter__()
             return spk, player
         except Exception as e:
             print(f"💥  Hoparlör açılırken hata: {e}")
             return None, None
 
-    def _listen_thread(self):
-        """Ayrı bir thread'de ağdan ses verisi dinler ve çalar."""
-        self.speaker, self.player = self._open_player()
-        if not self.player:
-            self.listening = False
+    def _close_player(self):
+        """Açık player'ı kapatır."""
+        if self.player:
+            try:
+                self.player.__exit__(None, None, None)
+            except Exception as e:
+                print(f"Hoparlör kapatılırken hata: {e}")
+        self.player = None
+
+    def _on_devices_changed(self, old, new):
+        """
+        Kayıt defteri thread'inden çağrılır: istenen çıkış (adı verilen veya
+        varsayılan) artık çalınan aygıt değilse çalma thread'ine geçiş ister.
+        """
+        speaker = self.speaker
+        wanted = new.speaker(self.device_name)
+        if speaker is None or wanted is None or wanted.name == speaker.name:
             return
+        print(f"⟳  Çıkış aygıtı değişti: {speaker.name} → {wanted.name}")
+        self._switch_output = True
+
+    def switch_output(self, device_name=None):
+        """
+        Çıkış aygıtını değiştirir (None: varsayılanı izle). Jitter tamponu ve
+        saat kayması durumu korunur; yalnızca player yeniden açılır.
+        """
+        self.device_name = device_name
+        self._switch_output = True
+
+    def _gain_for(self, source):
+        """Kaynağın kazancı: akış kimliğine, yoksa göndericinin IP'sine verilen; yoksa 1."""
+        gain = self.gains.get(source.stream)
+        if gain is None and source.control:
+            gain = self.gains.get(source.control[0])
+        return 1.0 if gain is None else gain
+
+    def set_gain(self, source, gain):
+        """
+        Bir kaynağın karıştırma kazancını ayarlar. `source` bir akış kimliği
+        veya göndericinin IP adresidir (o adresten gelen tüm akışlar, sonradan
+        gelenler dahil).
+        """
+        with self.cond:
+            self.gains[source] = gain
+            for src in self.sources.values():
+                src.gain = self._gain_for(src)
+
+    def _add_source(self, stream, now):
+        """Yeni bir kaynak ekler (kilit tutulurken); sınır doluysa None döndürür."""
+        if len(self.sources) >= self.max_sources:
+            self._evict_idle(now)
+            if len(self.sources) >= self.max_sources:
+                return None
+        source = Source(stream, self.prebuffer, self.max_buffer, nack=self.nack,
+                        drift=self.drift, feedback=self.feedback)
+        source.last_seen = now
+        source.gain = self._gain_for(source)
+        self.sources[stream] = source
+        print(f"➕  Yeni kaynak: #{stream:08x} ({len(self.sources)} kaynak)")
+        return source
 
-        self.jitter = collections.deque(maxlen=self.prebuffer + 50)
-        last_dev_check = time.time()
+    def _evict_idle(self, now):
+        """`source_timeout` boyunca paket veya ping gelmeyen kaynakları atar (kilit tutulurken)."""
+        for stream, source in list(self.sources.items()):
+            if now - source.last_seen > self.source_timeout:
+                del self.sources[stream]
+                self._retire(source)
+                self.sources_evicted += 1
+                print(f"👋  Kaynak ayrıldı: {source.name} ({len(self.sources)} kaynak)")
 
-        with self.player:
+    def _alloc_rx(self):
+        """Toplu okuma için paket tamponlarını önceden ayırır."""
+        self._rx = np.zeros((RX_BATCH, packet.MAX_PACKET), dtype=np.uint8)
+        self._rx_views = [memoryview(row) for row in self._rx]
+        self._rx_len = [0] * RX_BATCH
+        self._rx_frames = {}
+        self._dec_frames = {}
+
+    def _frame_views(self, count, samples, channels):
+        """
+        Her okuma tamponu için paketteki çerçevelerin int16 görünümlerini döndürür.
+        Görünümler biçim başına bir kez oluşturulur ve yeniden kullanılır.
+        """
+        key = (count, samples, channels)
+        views = self._rx_frames.get(key)
+        if views is None:
+            end = packet.HEADER.size + count * packet.frame_bytes(samples, channels)
+            views = [list(row[packet.HEADER.size:end].view(np.int16).reshape(count, samples, channels))
+                     for row in self._rx]
+            self._rx_frames[key] = views
+        return views
+
+    def _decode(self, codec, payload, count, samples, channels):
+        """
+        Bir paket yükünü biçim başına ayrılmış int16 tampona çözer ve çerçeve
+        görünümlerini döndürür. Çözülemezse None döner.
+        """
+        key = (count, samples, channels)
+        cached = self._dec_frames.get(key)
+        if cached is None:
+            buf = np.zeros((count * samples, channels), dtype=np.int16)
+            cached = (buf, list(buf.reshape(count, samples, channels)))
+            self._dec_frames[key] = cached
+        buf, frames = cached
+        try:
+            codec.decode(payload, buf)
+        except Exception:
+            return None
+        return frames
+
+    def _drain(self, sock):
+        """Soket kuyruğundaki paketleri (en fazla RX_BATCH) hazır tamponlara okur."""
+        n = 0
+        while n < RX_BATCH:
+            try:
+                self._rx_len[n] = sock.recv_into(self._rx_views[n])
+            except BlockingIOError:
+                break
+            n += 1
+        return n
+
+    def _recover(self, source, recovered, codec_id, channels, samples, arrival):
+        """FEC ile yeniden oluşturulan paketleri çözüp kaynağın tamponuna koyar."""
+        codec = codecs.CODECS.get(codec_id)
+        for seq, count, payload in recovered:
+            frames = self._decode(codec, payload, count, samples, channels) if codec else None
+            if frames is not None:
+                source.push(seq, count, frames, arrival)
+
+    def _ingest(self, n, arrival):
+        """Okunan n paketi kaynaklarının jitter tamponlarına aktarır (kilit tutulurken çağrılır)."""
+        sources = self.sources
+        for i in range(n):
+            length = self._rx_len[i]
+            self.bytes_received += length
+            hdr = packet.parse_header(self._rx_views[i], length)
+            if hdr is None:
+                self.malformed += 1
+                continue
+            seq, flags, codec_id, channels, count, rate, samples, timestamp, stream = hdr
+            source = sources.get(stream) or self._add_source(stream, arrival)
+            if source is None:
+                self.sources_rejected += 1
+                continue
+            source.last_seen = arrival
+            source.packets += 1
+            if (rate, channels, samples) != source.stream_format:
+                source.set_format((rate, channels, samples))
+            jitter = source.jitter
+            fec = source.fec
+            payload = self._rx_views[i][packet.HEADER.size:length]
+
+            if flags & packet.FLAG_PARITY:
+                recovered = fec.add_parity(payload, count)
+                self._recover(source, recovered, codec_id, channels, samples, arrival)
+                # Eşlik, grubun son paketinin hemen ardından gelir: gruptaki i.
+                # çerçeve için span - i çerçeve sonra. Kaybın kurtarılabilmesi için
+                # en kötü durumda (ilk çerçeve) tampon bir grup, yani span çerçeve
+                # derinliğinde olmalı; fazlası yalnızca gecikme ekler.
+                if jitter.min_depth < fec.span:
+                    jitter.set_min_depth(max(self.prebuffer, fec.span))
+                continue
+
+            if codec_id == packet.PCM16:
+                frames = self._frame_views(count, samples, channels)[i]
+            else:
+                codec = codecs.CODECS.get(codec_id)
+                frames = self._decode(codec, payload, count, samples, channels) if codec else None
+                if frames is None:
+                    self.malformed += 1
+                    continue
+            capture = None
+            if source.clock_offset is not None:
+                # Yakalamadan varışa geçen süre (gönderici saatinde ölçülen kodlama süresi dahil)
+                delay = clock.age(timestamp, arrival - source.clock_offset)
+                capture = arrival - delay
+                if not flags & packet.FLAG_RETRANSMIT:
+                    self.net_delay.observe(delay * 1000)
+            accepted = source.push(seq, count, frames, arrival, capture)
+            if source.feedback and not flags & packet.FLAG_RETRANSMIT:
+                source.feedback.fresh += count
+            if not flags & packet.FLAG_FEC and fec.span:
+                # Gönderici FEC'i kapattı: eşlik için beklenen fazladan derinliği bırak
+                fec.span = 0
+                jitter.set_min_depth(self.prebuffer)
+            if flags & packet.FLAG_RETRANSMIT and source.nack:
+                source.nack.retransmits += 1
+                if not accepted:
+                    # Çalma zamanı geçmiş (veya başka yoldan zaten gelmiş) yeniden gönderim
+                    source.nack.late_retransmits += 1
+
+            if flags & packet.FLAG_FEC:
+                recovered = fec.add_packet(seq, count, bytes(payload))
+                self._recover(source, recovered, codec_id, channels, samples, arrival)
+
+    def _poll_nacks(self, now):
+        """Kaynakların tamponlarındaki boşluklar için (mesaj, adres) listesi döndürür (kilit tutulurken)."""
+        nacks = []
+        for source in self.sources.values():
+            msg = source.poll_nack(now)
+            if msg:
+                nacks.append((msg, source.control))
+        return nacks
+
+    def _send_control(self, msg, addr):
+        """Bir kontrol mesajını (NACK, rapor) bir göndericinin kontrol soketine yollar."""
+        try:
+            self.control_sock.sendto(msg, addr)
+        except OSError as e:
+            if self.listening:
+                print(f"Kontrol mesajı gönderilemedi: {e}")
+
+    def _send_reports(self):
+        """Her kaynağın son aralıktaki alıcı raporunu göndericisine yollar (bkz. core.feedback)."""
+        with self.cond:
+            reports = [(report.pack(), source.control) for source in self.sources.values()
+                       for report in (source.build_report(),) if report]
+        for msg, addr in reports:
+            self._send_control(msg, addr)
+
+    def _membership(self, group, option):
+        """Veri ve kontrol soketlerini bir çoklu yayın grubuna katar veya ayırır."""
+        mreq = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton("0.0.0.0"))
+        for sock in (self.sock, self.control_sock):
+            sock.setsockopt(socket.IPPROTO_IP, option, mreq)
+
+    def join_group(self, group):
+        """
+        Bir çoklu yayın grubuna katılır; dinleme sürüyorsa önceki gruptan
+        ayrılıp hemen katılır, sürmüyorsa grup dinleme başlarken kullanılır.
+        """
+        if self.listening:
+            self.leave_group()
+            try:
+                self._membership(group, socket.IP_ADD_MEMBERSHIP)
+            except OSError as e:
+                print(f"‼️ Çoklu yayın grubuna katılınamadı ({group}): {e}")
+                return False
+            print(f"📡  Çoklu yayın grubuna katılındı: {group}")
+        self.multicast_group = group
+        return True
+
+    def leave_group(self):
+        """Katılınan çoklu yayın grubundan ayrılır."""
+        group, self.multicast_group = self.multicast_group, None
+        if group and self.listening:
+            try:
+                self._membership(group, socket.IP_DROP_MEMBERSHIP)
+                print(f"📡  Çoklu yayın grubundan ayrılındı: {group}")
+            except OSError as e:
+                print(f"Çoklu yayın grubundan ayrılırken hata: {e}")
+
+    def _network_thread(self):
+        """
+        Soketi `selectors` ile bekler; her uyanışta kuyruktaki tüm paketleri
+        tek seferde okuyup jitter tamponuna aktarır.
+        """
+        sock = self.sock
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        next_report = time.monotonic() + REPORT_INTERVAL
+        try:
             while self.listening:
-                # -------- ağdan oku ----------
-                try:
-                    pkt, _ = self.sock.recvfrom(4096)
-                    pcm = np.frombuffer(pkt[2:], dtype=np.int16)
-                    self.jitter.append(pcm.reshape(-1, 2).astype(np.float32) / 32767)
-                except BlockingIOError:
-                    time.sleep(0.001)  # CPU kullanımını azaltmak için küçük bir bekleme
-                except Exception as e:
-                    if self.listening:
-                        print(f"Socket hatası: {e}")
+                ready = sel.select(timeout=POLL_TIMEOUT)
+                arrival = time.monotonic()
+                if arrival >= next_report:
+                    next_report = arrival + REPORT_INTERVAL
+                    self._send_reports()
+                    with self.cond:
+                        self._evict_idle(arrival)
+                if not ready:
+                    continue
+                n = self._drain(sock)
+                self.packets_received += n
+                with self.cond:
+                    self._ingest(n, arrival)
+                    self.cond.notify()
+                    nacks = self._poll_nacks(arrival)
+                for msg, addr in nacks:
+                    self._send_control(msg, addr)
+        except Exception as e:
+            if self.listening:
+                print(f"Socket hatası: {e}")
+        finally:
+            sel.close()
+
+    def _next_frame(self, source, deadline=None):
+        """
+        Kaynağın çalınacak sıradaki çerçevesini tamponundan alır (kilit
+        tutulurken çağrılır). Sıradaki paket henüz gelmediyse `deadline`'a
+        (verilmezse aygıttaki blok bitene) kadar onu bekler. Tampon dolum
+        aşamasındaysa None döner.
+        """
+        jitter = source.jitter
+        if not jitter.buffering and not jitter.head_ready():
+            if deadline is None:
+                deadline = time.monotonic() + jitter.frame_s
+            while self.listening and source.jitter is jitter and not jitter.head_ready():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            jitter = source.jitter
+
+        if source.drift and not jitter.buffering:
+            source.drift.update(jitter.depth, jitter.shifted)
+        return jitter.pop()
+
+    def _render_single(self, source):
+        """
+        Tek kaynak: sıradaki çerçeveyi döndürür, dönüştürme kilit dışında
+        yapılır (kilit tutulurken çağrılır). Bekleyen karıştırma artığı atılır.
+        """
+        frame = self._next_frame(source)
+        if frame is None:
+            self.cond.wait(POLL_TIMEOUT)
+            return None, ()
+        source.set_output(self.output_format)
+        source.fill = 0
+        jitter = source.jitter
+        return frame, ((jitter.played_arrival, jitter.played_capture),)
+
+    def _render_mix(self, sources):
+        """
+        Birden çok kaynak: her kaynaktan bir çıkış bloğu dolacak kadar çerçeve
+        çekip çıkış biçimine çevirir ve blokları tek geçişte karıştırır (kilit
+        tutulurken çağrılır). Blok, kaynakların en kısa çerçevesi kadardır;
+        geç kalan paketler için hepsine ortak bir süre beklenir. Tamponu
+        dolmakta olan kaynaklar bu bloğa katılmaz.
+        """
+        out_rate, out_channels = self.output_format
+        frame_s = min(source.jitter.frame_s for source in sources)
+        n = max(1, int(round(frame_s * out_rate)))
+        mixer = self._mixer
+        if mixer is None or (mixer.frames, mixer.channels) != (n, out_channels):
+            mixer = self._mixer = SourceMixer(n, out_channels, self.max_sources)
+        deadline = time.monotonic() + frame_s
+        played = []
+        count = 0
+        for source in sources:
+            while source.fill < n:
+                frame = self._next_frame(source, deadline)
+                if frame is None:
                     break
+                source.set_output(self.output_format)
+                source.queue(source.convert(frame))
+                played.append((source.jitter.played_arrival, source.jitter.played_capture))
+            if source.fill >= n:
+                source.take(n, mixer.stack[count])
+                mixer.gains[count] = source.gain
+                count += 1
+        if not count:
+            self.cond.wait(POLL_TIMEOUT)
+            return None, ()
+        return mixer.mix(count), played
 
-                # -------- çal -----------------
-                if len(self.jitter) > self.prebuffer:
-                    try:
-                        self.player.play(self.jitter.popleft())
-                    except Exception as e:
-                        print(f"Çalma hatası: {e}")
-
-
-                # -------- aygıt değişti mi? ----
-                if time.time() - last_dev_check > 0.5:
-                    last_dev_check = time.time()
-                    try:
-                        cur = sc.default_speaker()
-                        if cur.name != self.speaker.name:
-                            print("⟳  Varsayılan ses aygıtı değişti!")
-                            self.player.close()
-                            self.speaker, self.player = self._open_player()
-                            if self.player:
-                                self.player.__enter__()
-                            else:
-                                print("Yeni aygıt açılamadı, dinleme durduruluyor.")
-                                self.listening = False
-                    except Exception as e:
-                        print(f"Aygıt kontrol hatası: {e}")
-                        self.listening = False
+    def _playout_thread(self):
+        """
+        Çalma aygıtının hızında kaynakların tamponlarından çerçeve çekip çalar.
+        Player, öndeki kaynağın akış biçimi veya çıkış aygıtı değişince yeniden açılır.
+        """
+        player_format = None
 
+        while self.listening:
+            # -------- akış biçimi veya çıkış aygıtı değişti mi? ----
+            if self._switch_output:
+                self._switch_output = False
+                player_format = None
+            single = None
+            with self.cond:
+                lead = self.lead
+                if lead is None:
+                    self.cond.wait(POLL_TIMEOUT)
+                    continue
+                fmt = lead.stream_format
+                if fmt == player_format:
+                    sources = [s for s in self.sources.values() if s.jitter is not None]
+                    if len(sources) == 1 and sources[0].gain == 1.0:
+                        single = sources[0]
+                        block, played = self._render_single(single)
+                    else:
+                        block, played = self._render_mix(sources)
+
+            if fmt != player_format:
+                self._close_player()
+                self.speaker, self.player = self._open_player(fmt)
+                if not self.player:
+                    print("Hoparlör açılamadı, dinleme durduruluyor.")
+                    self.listening = False
+                    break
+                player_format = fmt
+                continue
+
+            # -------- çal -----------------
+            if block is not None:
+                if single:
+                    block = single.convert(block)
+                try:
+                    self.player.play(block)
+                except Exception as e:
+                    self.play_errors += 1
+                    print(f"Çalma hatası: {e}")
+                self.last_block = block
+                now = time.monotonic()
+                for arrival, capture in played:
+                    if arrival is not None:
+                        self.play_latency.observe((now - arrival) * 1000)
+                    if capture is not None:
+                        self.glass_latency.observe((now - capture) * 1000)
+
+        self._close_player()
+        with self.cond:
+            self.cond.notify_all()
         print("⏹️  Dinleme durduruldu.")
 
     def _control_listen_thread(self):
-        """Kontrol mesajlarını (ping) dinleyen thread."""
+        """
+        Kontrol mesajlarını dinleyen thread: ping'lere varış ve yanıt zaman
+        damgalarıyla pong ve ardından çıkış biçimini (CAPS) döner, ping'deki
+        akış kimliğiyle göndericinin kontrol adresini kaynağına eşler ve
+        göndericinin saat farkı tahminini (SYNC) alır.
+        """
         while self.listening:
             try:
                 data, addr = self.control_sock.recvfrom(1024)
-                if data.startswith(b"PING"):
-                    # Gelen ping mesajını hemen pong olarak geri gönder
-                    self.control_sock.sendto(b"PONG" + data[4:], addr)
+                t2 = time.monotonic()
+                if data.startswith(clock.PING_PREFIX):
+                    ping = clock.parse_ping(data)
+                    if ping:
+                        ping_id, t1, stream = ping
+                        self.control_sock.sendto(clock.pack_pong(ping_id, t1, t2, time.monotonic()), addr)
+                        self.control_sock.sendto(self._caps().pack(), addr)
+                        with self.cond:
+                            source = self.sources.get(stream) or self._add_source(stream, t2)
+                            if source:
+                                source.control = addr
+                                source.last_seen = t2
+                                source.gain = self._gain_for(source)
+                elif data.startswith(clock.SYNC_PREFIX):
+                    sync = clock.parse_sync(data)
+                    if sync:
+                        with self.cond:
+                            for source in self.sources.values():
+                                if source.control == addr:
+                                    source.clock_offset, source.path_rtt = sync
             except Exception as e:
                 if self.listening:
                     print(f"Kontrol dinleme hatası: {e}")
@@ -122,11 +669,39 @@ class AudioReceiver:
             print(f"‼️ Port {self.port} veya {self.control_port} zaten kullanılıyor: {e}")
             return False
             
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        except OSError as e:
+            print(f"Alma tamponu büyütülemedi: {e}")
         self.sock.setblocking(False)
-        
+
+        self.registry = get_registry(self.backend).acquire()
+        self.registry.subscribe(self._on_devices_changed)
+        self.registry.wait_ready()
+        self._switch_output = False
+        self.speaker = None
+
+        self.output_format = None
+        self.sources = {}
+        self._retired = {}
+        self._mixer = None
+        self.last_block = None
+        if self.multicast_group:
+            try:
+                self._membership(self.multicast_group, socket.IP_ADD_MEMBERSHIP)
+            except OSError as e:
+                print(f"‼️ Çoklu yayın grubuna katılınamadı ({self.multicast_group}): {e}")
+                self.sock.close()
+                self.control_sock.close()
+                self._release_registry()
+                return False
         self.listening = True
-        
-        self.thread = threading.Thread(target=self._listen_thread)
+
+        self.net_thread = threading.Thread(target=self._network_thread)
+        self.net_thread.daemon = True
+        self.net_thread.start()
+
+        self.thread = threading.Thread(target=self._playout_thread)
         self.thread.daemon = True
         self.thread.start()
 
@@ -144,6 +719,10 @@ class AudioReceiver:
             return
 
         self.listening = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.net_thread:
+            self.net_thread.join(timeout=1)
         if self.sock:
             self.sock.close()
         if self.control_sock:
@@ -153,8 +732,17 @@ class AudioReceiver:
             self.thread.join(timeout=1)
         if self.control_thread:
             self.control_thread.join(timeout=1)
-        
+
         self.thread = None
+        self.net_thread = None
         self.control_thread = None
         self.sock = None
-        self.control_sock = None
\ No newline at end of file
+        self.control_sock = None
+        self._release_registry()
+
+    def _release_registry(self):
+        """Aygıt kayıt defterinden ayrılır."""
+        if self.registry:
+            self.registry.unsubscribe(self._on_devices_changed)
+            self.registry.release()
+            self.registry = None
\ No newline at end of file
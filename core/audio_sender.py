@@ -4,89 +4,598 @@
 Ses verisini yakalayıp ağ üzerinden gönderen modül.
 """
 
+import ipaddress
+import random
 import socket
-import struct
 import threading
 import time
 import numpy as np
-import soundcard as sc
+from core import clock, codecs, packet
+from core.audio_backend import get_backend
+from core.capture_ring import CAPTURE_HEADROOM_MS, CAPTURE_QUEUE_MS, DROP_POLICIES, CaptureRing
+from core.feedback import FALLBACK_CODEC, REPORT_PREFIX, AdaptiveController, Report, build_ladder
+from core.fec import FecEncoder
+from core.nack import NACK_PREFIX, RetransmitHistory
+from core.negotiation import CAPS_PREFIX, NEGOTIATE_TIMEOUT, Caps, choose_format
+from core.stats import Stats
+
+PING_INTERVAL = 1.0  # Saniye
+PING_STALE = 3.0     # Bu kadar süre pong gelmeyen alıcı ping hesabından çıkarılır
+MULTICAST_TTL = 1    # Çoklu yayın paketleri yerel ağın dışına çıkmaz
+
+# float32 sıfır boyutlu diziler: ufunc'lar Python sayısını her çağrıda dönüştürmez
+_ONE = np.array(1, dtype=np.float32)
+_MINUS_ONE = np.array(-1, dtype=np.float32)
+_PCM_SCALE = np.array(32767, dtype=np.float32)
+
+if hasattr(socket.socket, "sendmsg"):
+    def send_parts(sock, parts):
+        """Paket parçalarını kopyalamadan tek datagram olarak gönderir (scatter-gather)."""
+        return sock.sendmsg(parts)
+else:
+    def send_parts(sock, parts):
+        # Windows'ta sendmsg yok: parçalar birleştirilip gönderilir
+        return sock.send(b"".join(parts))
+
+def parse_destinations(dest_ip, dest_port):
+    """
+    Hedefleri (ip, port) demetlerinin listesine çevirir. `dest_ip` tek bir
+    adres, virgülle ayrılmış adresler ("10.0.0.5, 10.0.0.6:6000") veya liste
+    olabilir; port verilmeyen adresler `dest_port` kullanır.
+    """
+    items = dest_ip.split(",") if isinstance(dest_ip, str) else dest_ip
+    dests = []
+    for item in items:
+        if isinstance(item, tuple):
+            dest = item
+        else:
+            host, _, port = item.strip().partition(":")
+            if not host:
+                continue
+            dest = (host, int(port) if port else dest_port)
+        if dest not in dests:
+            dests.append(dest)
+    if not dests:
+        raise ValueError("En az bir hedef adres gerekli")
+    return dests
+
+def is_multicast(host):
+    """Adres bir IPv4 çoklu yayın (multicast) grubu mu?"""
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False
+
+class _TxRing:
+    """
+    Akış thread'inin her pakette yeniden kullandığı gönderim tamponları.
+
+    Yakalanan float blok önceden ayrılmış dizilerde kırpılarak int16'ya
+    çevrilir; pcm16'da dönüşüm doğrudan yuvanın yük tamponuna yazılır, diğer
+    kodekler yükü `encode_into` ile yuvaya kodlar. Başlık da yuvanın kendi
+    tamponuna yazılır ve ikisi `send_parts` ile birlikte gönderilir.
+    Yeniden gönderim geçmişi yuvaları kopyalamadan tuttuğu için halka geçmişle
+    aynı boydadır: bir yuvanın üzerine, geçmişteki kaydı silinirken yazılır.
+    """
+    def __init__(self, slots, samples, channels, rate, count, codec):
+        shape = (samples * count, channels)
+        self.samples = samples
+        self.channels = channels
+        self.rate = rate
+        pcm_bytes = packet.frame_bytes(samples, channels) * count
+        self.direct = codec.id == packet.PCM16
+        self.size = packet.frame_bytes(samples, channels, codec.sample_bytes) * count + codec.overhead
+        self.scratch = np.zeros(shape, dtype=np.float32)
+        self.pcm = np.zeros(shape, dtype=np.int16)  # pcm16 dışındaki kodeklerin girdisi
+        self.headers = [bytearray(packet.HEADER.size) for _ in range(slots)]
+        # En kötü durumda yük ham PCM'den `overhead` kadar uzundur (kayıpsız kodeğin kip baytı)
+        self.payloads = [np.zeros(max(pcm_bytes, self.size), dtype=np.uint8) for _ in range(slots)]
+        self.buffers = [memoryview(p) for p in self.payloads]
+        self.pcm_views = [p[:pcm_bytes].view(np.int16).reshape(shape) for p in self.payloads]
+        self.parts = [(h, b[:self.size]) for h, b in zip(self.headers, self.buffers)]
+        self.parity_header = bytearray(packet.HEADER.size)
+        self.block = np.zeros(shape, dtype=np.float32)  # Halkanın sonunu saran bloklar için
+        self.pos = 0
+
+    def convert(self, data, out):
+        """Float bloğu [-1, 1] dışını kırparak `out` int16 dizisine çevirir (taşıp sarmaz)."""
+        scratch = self.scratch
+        # np.clip'in Python sarmalayıcısı her çağrıda bellek ayırıyor; ufunc'lar ayırmaz
+        np.minimum(data, _ONE, out=scratch)
+        np.maximum(scratch, _MINUS_ONE, out=scratch)
+        np.multiply(scratch, _PCM_SCALE, out=scratch)
+        # Doğrudan int16 çıktıya çarpmak dönüştürme için ara tampon ayırır
+        np.copyto(out, scratch, casting="unsafe")
 
 class AudioSender:
     """
-    Sistem sesini yakalayıp UDP üzerinden belirli bir hedefe gönderen sınıf.
+    Sistem sesini yakalayıp UDP üzerinden gönderen sınıf. Ses bir kez
+    yakalanıp kodlanır; aynı paket tüm hedeflere (tekil adres listesi veya bir
+    çoklu yayın grubu) gönderilir. Hedefler akış sürerken eklenip çıkarılabilir.
+
+    Yakalama ve gönderim ayrı thread'lerdir: yakalama thread'i çerçeveleri
+    zaman damgasıyla bir halkaya yazar (bkz. core.capture_ring), gönderim
+    thread'i onları kodlayıp gönderir. Yavaş bir gönderim kaydı geciktirmez;
+    kuyruk `queue_ms`'i aşarsa `drop_policy`'ye göre çerçeve atılır.
+
+    `negotiate` açıkken `rate`, `channels` ve `codec` yalnızca tercihtir:
+    yakalama, alıcıların bildirdiği biçimle başlar (bkz. core.negotiation) ve
+    bildirim değişince yeni biçimle yeniden açılır. Gönderici sesi hiç dönüştürmez.
     """
-    def __init__(self, dest_ip, dest_port=5555, rate=48000, device=None):
+    def __init__(self, dest_ip, dest_port=5555, rate=48000, device=None, channels=2,
+                 frame_ms=packet.DEFAULT_FRAME_MS, frames_per_packet=1, mtu=packet.DEFAULT_MTU,
+                 codec="pcm16", fec_group=0, fec_interleave=1, nack=True, backend=None,
+                 adapt=False, ladder=None, queue_ms=CAPTURE_QUEUE_MS, drop_policy="oldest",
+                 negotiate=True):
+        if frame_ms not in packet.FRAME_DURATIONS_MS:
+            raise ValueError(f"Geçersiz çerçeve süresi: {frame_ms} ms "
+                             f"(desteklenenler: {packet.FRAME_DURATIONS_MS})")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Bilinmeyen atma politikası: {drop_policy} (desteklenenler: {DROP_POLICIES})")
         self.dest_ip = dest_ip
         self.dest_port = dest_port
         self.control_port = dest_port + 1
+        self.destinations = tuple(parse_destinations(dest_ip, dest_port))
+        self._dest_lock = threading.Lock()
         self.rate = rate
+        self.channels = channels
+        self.frame_ms = frame_ms
+        self.frames_per_packet = frames_per_packet  # İstenen; MTU'ya göre azaltılabilir
+        self.mtu = mtu
+        self.codec = codecs.get_codec(codec)
+        self.fec_group = fec_group            # 0: FEC kapalı; N: her N pakete bir eşlik paketi
+        self.fec_interleave = fec_interleave  # Patlama kayıplarına karşı araya ekleme derinliği
+        self.nack = nack                      # NACK'lere yanıt olarak yeniden gönderim
+        self.adapt = adapt                    # Alıcı raporlarına göre uyarlama (bkz. core.feedback)
+        self.ladder = ladder                  # None: başlangıç ayarından otomatik merdiven
+        self._base = (frames_per_packet, codec)
+        self.negotiate = negotiate            # Akış biçimini alıcılarla anlaş
+        self._format = (rate, channels, codec)  # Yapılandırılan (tercih edilen) biçim
+        self._source_format = (None, None)    # Kaynağın doğal hızı ve kanal sayısı
+        self._negotiated = None               # Geçerli oturumun (hız, kanal, kodek) biçimi
+        self._renegotiate = False
+        self.caps = {}        # alıcı kontrol adresi -> bildirdiği biçim (Caps)
+        self.stream_id = 0    # Alıcıların bu akışı diğer göndericilerden ayırdığı kimlik
+        self.controller = None
+        self.reports = {}     # alıcı kontrol adresi -> son alıcı raporu
+        self._pending_reports = {}
+        self._reconfigure = False
+        self.history = None
+        self.queue_ms = queue_ms              # Yakalama kuyruğunun sınırı
+        self.drop_policy = drop_policy        # Kuyruk dolunca atılacaklar: "oldest" / "newest"
+        self.ring = None
         self.device_substr = device
+        self.backend = get_backend(backend)  # Ses kaynağı (bkz. core.audio_backend)
         self.loop_mic = None
         self.sock = None
         self.control_sock = None
+        self.links = {}       # hedef -> o hedefe bağlı (connect edilmiş) veri soketi
+        self._links = ()      # Akış thread'inin gezdiği soketler (yazarken kopyalanır)
         self.seq = 0
         self.streaming = False
         self.thread = None
+        self.capture_thread = None
         self.control_thread = None
         self.ping_ms = -1
+        self.receivers = {}   # alıcı kontrol adresi -> clock.ClockEstimator
+        self._pings = {}      # ping kimliği -> gönderim zamanı (t1)
+        self._ping_id = 0
+        self.send_errors = 0
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.parity_sent = 0
+        self.stats = Stats("sender", port=dest_port)
+        self.stats.add_source(self._stats_values)
+        self.send_latency = self.stats.histogram("capture_to_send_ms")
+
+    def _stats_values(self):
+        """İstatistik anlık görüntüsü için sayaçları toplar (bkz. core.stats)."""
+        values = {"packets_sent": self.packets_sent, "bytes_sent": self.bytes_sent,
+                  "parity_sent": self.parity_sent, "send_errors": self.send_errors,
+                  "destinations": len(self.destinations), "receivers": len(self.receivers),
+                  "ping_ms": self.ping_ms, "one_way_delay_ms": self.one_way_ms}
+        history = self.history
+        if history:
+            values.update(nacks_received=history.nacks, retransmits_sent=history.resent)
+        reports = list(self.reports.values())
+        if reports:
+            values["reported_loss"] = max(report.loss for report in reports)
+        if self.controller:
+            values.update(adapt_level=self.controller.level, adapt_changes=self.controller.changes)
+        ring = self.ring
+        if ring:
+            values.update(capture_overruns=ring.overruns, queue_dropped=ring.dropped,
+                          queue_depth=ring.depth, queue_depth_max=ring.max_depth)
+        return values
+
+    def snapshot(self):
+        """Göndericinin sayaç, gösterge ve gecikme histogramlarının anlık görüntüsü."""
+        return self.stats.snapshot()
+
+    def add_destination(self, ip, port=None):
+        """Akışa yeni bir hedef ekler (akış sürerken de çağrılabilir)."""
+        dest = (ip, port or self.dest_port)
+        with self._dest_lock:
+            if dest not in self.destinations:
+                self.destinations = self.destinations + (dest,)
+                if self.sock:
+                    if is_multicast(ip):
+                        self._enable_multicast()
+                    self._open_link(dest)
+        print(f"➕  Hedef eklendi: {dest[0]}:{dest[1]}")
+
+    def remove_destination(self, ip, port=None):
+        """Bir hedefi akıştan çıkarır."""
+        dest = (ip, port or self.dest_port)
+        with self._dest_lock:
+            self.destinations = tuple(d for d in self.destinations if d != dest)
+            self._close_link(dest)
+        self.receivers.pop((dest[0], dest[1] + 1), None)
+        self.caps.pop((dest[0], dest[1] + 1), None)
+        print(f"➖  Hedef çıkarıldı: {dest[0]}:{dest[1]}")
+
+    def _enable_multicast(self):
+        """Çoklu yayın paketlerinin TTL'ini ayarlar."""
+        for sock in (self.sock, self.control_sock):
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+
+    def _open_link(self, dest):
+        """
+        Hedef için bağlı bir UDP soketi açar (`_dest_lock` tutulurken); gönderimde
+        adres çözülmez, hedef demeti de oluşturulmaz.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            if is_multicast(dest[0]):
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+            sock.connect(dest)
+        except OSError as e:
+            sock.close()
+            print(f"‼️ Hedefe bağlanılamadı: {dest[0]}:{dest[1]} ({e})")
+            return
+        self.links[dest] = sock
+        self._links = tuple(self.links.values())
+
+    def _close_link(self, dest):
+        sock = self.links.pop(dest, None)
+        self._links = tuple(self.links.values())
+        if sock:
+            sock.close()
+
+    def _send_all(self, parts):
+        """Paketi (başlık, yük) tüm hedeflere gönderir; tek bir hedefin hatası diğerlerini etkilemez."""
+        for sock in self._links:
+            try:
+                self.bytes_sent += send_parts(sock, parts)
+            except ConnectionRefusedError:
+                # Bağlı soket önceki bir datagramın ICMP hatasını bu gönderimde bildirdi
+                # (alıcı henüz açık değil); hata temizlendi, paket bir kez daha denenir.
+                try:
+                    self.bytes_sent += send_parts(sock, parts)
+                except OSError:
+                    self.send_errors += 1
+            except OSError:
+                self.send_errors += 1
 
     def _find_loopback(self):
         """Belirtilen ada sahip geri döngü mikrofonunu bulur."""
         # Not: Arayüzden tam aygıt adı geldiği için artık alt dize kontrolü yerine
         # doğrudan isimle arama yapıyoruz.
         try:
-            # `get_microphone` tam ad eşleşmesi bekler.
-            return sc.get_microphone(self.device_substr, include_loopback=True)
+            return self.backend.get_microphone(self.device_substr)
         except Exception as e:
             print(f"Aygıt bulunurken hata: {e}")
             # Alternatif olarak, listeden de arayabiliriz.
-            for mic in sc.all_microphones(include_loopback=True):
+            for mic in self.backend.microphones():
                 if self.device_substr == mic.name:
                     return mic
             return None
 
-    def _stream_mic_thread(self):
-        """Ses verisini ayrı bir thread'de yakalar ve gönderir."""
-        FRAME = 480 if self.rate == 48_000 else 882  # 10 ms frame
+    def _packet_settings(self, samples, channels):
+        """Geçerli ayarlardan (kodek, paket başına çerçeve, FEC kodlayıcı, bayraklar) döndürür."""
+        codec = self.codec
+        count = packet.frames_per_packet(samples, channels, self.frames_per_packet, self.mtu,
+                                         codec.sample_bytes, codec.overhead)
+        fec = FecEncoder(self.fec_group, self.fec_interleave) if self.fec_group else None
+        return codec, count, fec, packet.FLAG_FEC if fec else 0
 
+    def _apply_step(self, step):
+        """Uyarlama basamağını uygular; akış thread'i sıradaki pakette yeni ayara geçer."""
+        count, codec, fec_group = step
+        self.frames_per_packet = count
+        self.codec = codecs.get_codec(codec)
+        self.fec_group = fec_group
+        self._reconfigure = True
+        fec = f"FEC 1/{fec_group}" if fec_group else "FEC yok"
+        print(f"🎚️  Uyarlama: basamak {self.controller.level}/{len(self.controller.ladder) - 1} "
+              f"({self.frame_ms} ms x {count}, {codec}, {fec})")
+
+    def _handle_reports(self):
+        """Son aralıkta gelen raporların en kötüsüyle denetleyiciyi günceller."""
+        if not self.controller or not self._pending_reports:
+            return
+        worst = Report.worst(list(self._pending_reports.values()))
+        self._pending_reports = {}
+        step = self.controller.update(worst)
+        if step:
+            self._apply_step(step)
+
+    def _start_controller(self, codec):
+        """Uyarlama merdivenini geçerli biçimden kurar ve ilk basamağı uygular."""
+        fallback = FALLBACK_CODEC
+        if not all(caps.supports(codecs.get_codec(fallback).id) for caps in self._offers()):
+            fallback = None  # Alıcılardan biri yedek kodeği çözemiyor
+        ladder = self.ladder or build_ladder(self.rate, self.frame_ms, self.channels, self._base[0],
+                                             codec, mtu=self.mtu, fallback_codec=fallback)
+        self.controller = AdaptiveController(ladder)
+        self._apply_step(self.controller.step)
+
+    def _offers(self):
+        """Yakın zamanda yanıt veren alıcıların bildirdiği biçimler."""
+        now = time.monotonic()
+        receivers = self.receivers
+        return [caps for addr, caps in list(self.caps.items())
+                if addr in receivers and now - receivers[addr].last_seen < PING_STALE]
+
+    def _choose_format(self):
+        return choose_format(self._offers(), *self._source_format, *self._format)
+
+    def _negotiate(self, wait):
+        """
+        Akış biçimini seçip uygular (yakalama thread'i, oturum başında). `wait`
+        ise önce tüm hedeflerden (çoklu yayında ilk alıcıdan) bildirim gelmesini
+        en fazla NEGOTIATE_TIMEOUT kadar bekler; gelmezse yapılandırılan biçim kullanılır.
+        """
+        deadline = time.monotonic() + NEGOTIATE_TIMEOUT
+        while wait and self.streaming and time.monotonic() < deadline:
+            if len(self._offers()) >= len(self.destinations):
+                break
+            time.sleep(0.01)
+        fmt = self._choose_format()
+        if fmt == self._negotiated:
+            return
+        self._negotiated = fmt
+        self.rate, self.channels, codec = fmt
+        if self.adapt:
+            self._start_controller(codec)
+        else:
+            self.codec = codecs.get_codec(codec)
+            self._reconfigure = True
+        print(f"🤝  Akış biçimi: {self.rate} Hz, {self.channels} kanal, {codec} "
+              f"({len(self._offers())} alıcı bildirdi)")
+
+    def _check_format(self):
+        """Alıcıların bildirdiği biçim değiştiyse yakalamanın yeni biçimle açılmasını ister."""
+        if self.negotiate and self._negotiated and self._choose_format() != self._negotiated:
+            self._renegotiate = True
+
+    def _tx_ring(self, ring, codec, count):
+        slots = self.history.size if self.history else 1
+        return _TxRing(slots, ring.samples, ring.channels, ring.rate, count, codec)
+
+    def _send_block(self, tx, data, captured, codec, count, fec, flags):
+        """Yakalanan bir bloğu paketleyip gönderir; çerçeve başına bellek ayırmaz."""
+        slot = tx.pos
+        tx.pos = (slot + 1) % len(tx.headers)
+        header = tx.headers[slot]
+        if tx.direct:
+            tx.convert(data, tx.pcm_views[slot])
+            parts = tx.parts[slot]
+        else:
+            tx.convert(data, tx.pcm)
+            n = codec.encode_into(tx.pcm, tx.payloads[slot])
+            parts = tx.parts[slot] if n == tx.size else (header, tx.buffers[slot][:n])
+        # Bloğun ilk örneği, kayıt dönmeden bir paket süresi önce yakalandı
+        samples = tx.samples
+        timestamp = clock.timestamp_us(captured - samples * count / tx.rate)
+        packet.pack_header_into(header, self.seq, codec.id, tx.channels, count,
+                                tx.rate, samples, flags, timestamp, self.stream_id)
+        self._send_all(parts)
+        self.packets_sent += 1
+        if self.history:
+            self.history.add(self.seq, count, parts)
+
+        parity = fec.add(self.seq, count, parts[1]) if fec else None
+        if parity:
+            first, group, body = parity
+            packet.pack_header_into(tx.parity_header, first, codec.id, tx.channels, group,
+                                    tx.rate, samples, packet.FLAG_PARITY, 0, self.stream_id)
+            self._send_all((tx.parity_header, body))
+            self.parity_sent += 1
+        self.send_latency.observe((time.monotonic() - captured) * 1000)
+        self.seq = (self.seq + count) & 0xFFFF
+
+    def _capture_thread_func(self):
+        """
+        Yalnızca yakalar: her bloğu yakalama anıyla halkaya yazar, ağı hiç
+        beklemez. Her biçim için bir oturum açılır: biçim anlaşılır, yeni halka
+        yayınlanır (gönderim thread'i eskisini boşaltınca ona geçer) ve kayıt
+        bu biçimle, yeniden anlaşma istenene kadar sürer.
+        """
+        ring = None
         try:
-            with self.loop_mic.recorder(samplerate=self.rate, blocksize=FRAME, channels=2) as rec:
-                print(f"⏺️  Akış başladı: {self.dest_ip}:{self.dest_port}")
+            while self.streaming:
+                self._renegotiate = False
+                if self.negotiate:
+                    self._negotiate(wait=ring is None)
+                new = self._capture_ring()
+                self.ring = new
+                if ring:
+                    ring.close()
+                ring = new
+                block = ring.samples * self._packet_settings(ring.samples, ring.channels)[1]
+                with self.loop_mic.recorder(samplerate=ring.rate, blocksize=ring.samples,
+                                            channels=ring.channels) as rec:
+                    while self.streaming and not self._renegotiate:
+                        data = rec.record(numframes=block)
+                        ring.write(data, time.monotonic())
+        except Exception as e:
+            print(f"💥  Yakalama sırasında hata: {e}")
+        finally:
+            if ring:
+                ring.close()
+
+    def _next_ring(self, ring):
+        """Yakalama thread'inin yayınladığı yeni halkayı bekler; yakalama bittiyse None döndürür."""
+        while self.streaming:
+            if self.ring is not ring:
+                return self.ring
+            if not self.capture_thread.is_alive():
+                return None
+            time.sleep(0.01)
+        return None
+
+    def _stream_mic_thread(self):
+        """Halkada biriken çerçeveleri paketleyip gönderir (kodlama / gönderim aşaması)."""
+        ring = self._next_ring(None)
+        started = False
+        try:
+            while ring:
+                codec, count, fec, flags = self._packet_settings(ring.samples, ring.channels)
+                tx = self._tx_ring(ring, codec, count)
+                if not started:
+                    started = True
+                    targets = ", ".join(f"{ip}:{port}" for ip, port in self.destinations)
+                    print(f"⏺️  Akış başladı: {targets} "
+                          f"({self.frame_ms} ms x {count} çerçeve/paket, {self.codec.name})")
                 while self.streaming:
-                    data = rec.record(numframes=FRAME)
-                    pcm = (data * 32767).astype(np.int16).tobytes()
-                    header = struct.pack("!H", self.seq)
-                    self.sock.sendto(header + pcm, (self.dest_ip, self.dest_port))
-                    self.seq = (self.seq + 1) & 0xFFFF
+                    if self._reconfigure:
+                        self._reconfigure = False
+                        codec, count, fec, flags = self._packet_settings(ring.samples, ring.channels)
+                        tx = self._tx_ring(ring, codec, count)
+                    if not ring.wait(count, 0.1):
+                        if ring.closed:
+                            break
+                        continue
+                    skipped = ring.trim(count)
+                    if skipped:
+                        # Atılan çerçeveler alıcıda kayıp görünür; zaman çizgisi kaymaz
+                        self.seq = (self.seq + skipped) & 0xFFFF
+                    data, captured = ring.read(count, tx.block)
+                    self._send_block(tx, data, captured, codec, count, fec, flags)
+                    ring.advance(count)
+                # Halka kapandı: biçim değiştiyse yeni halkaya geç
+                ring = self._next_ring(ring)
         except Exception as e:
             print(f"💥  Akış sırasında hata: {e}")
         finally:
             print("⏹️  Akış durduruldu.")
 
+    def _handle_nack(self, data, addr):
+        """
+        Alıcının NACK'ine, zamanında yetişebilecek paketleri yalnızca o alıcıya
+        yeniden göndererek yanıt verir (alıcının veri portu kontrol portundan bir azdır).
+        """
+        if not self.history:
+            return
+        est = self.receivers.get(addr)
+        rtt = est.rtt_ms if est else -1
+        dest = (addr[0], addr[1] - 1)
+        # Çoklu yayında alıcının tekil adresine bağlı soket yoktur
+        link = self.links.get(dest)
+        for header, payload in self.history.handle(data, rtt):
+            parts = (packet.with_flags(header, packet.FLAG_RETRANSMIT), payload)
+            try:
+                if link:
+                    send_parts(link, parts)
+                else:
+                    self.sock.sendto(b"".join(parts), dest)
+            except OSError:
+                self.send_errors += 1
+
+    @property
+    def one_way_ms(self):
+        """Yakın zamanda yanıt veren alıcılar arasındaki en kötü tek yön gecikme tahmini (ms)."""
+        now = time.monotonic()
+        fresh = [est.one_way_ms for est in list(self.receivers.values()) if now - est.last_seen < PING_STALE]
+        return max(fresh) if fresh else -1
+
+    def _update_ping(self, now):
+        """Yakın zamanda yanıt veren alıcılar arasındaki en kötü ping'i yayınlar."""
+        fresh = [est.rtt_ms for est in self.receivers.values() if now - est.last_seen < PING_STALE]
+        self.ping_ms = max(fresh) if fresh else -1
+
+    def _send_ping(self, now):
+        """Tüm hedeflere yeni kimlikli bir ping gönderir; yanıtsız eski ping'leri unutur."""
+        self._ping_id = (self._ping_id + 1) & 0xFFFFFFFF
+        for ping_id in [i for i, t1 in self._pings.items() if now - t1 > PING_STALE]:
+            del self._pings[ping_id]
+        self._pings[self._ping_id] = now
+        msg = clock.pack_ping(self._ping_id, now, self.stream_id)
+        for ip, port in self.destinations:
+            self.control_sock.sendto(msg, (ip, port + 1))
+
+    def _handle_pong(self, data, addr, t4):
+        """
+        Pong'u ping kimliğiyle eşleştirir, alıcının saat tahminini günceller ve
+        tahmini SYNC mesajıyla alıcıya bildirir. Eşleşmeyen pong'lar yok sayılır.
+        """
+        pong = clock.parse_pong(data)
+        if not pong:
+            return
+        ping_id, _, t2, t3 = pong
+        t1 = self._pings.get(ping_id)  # Çoklu yayında aynı ping'e birden çok pong gelir
+        if t1 is None:
+            return
+        est = self.receivers.get(addr)
+        if est is None:
+            est = self.receivers[addr] = clock.ClockEstimator()
+        est.add(t1, t2, t3, t4)
+        self._update_ping(t4)
+        try:
+            self.control_sock.sendto(clock.pack_sync(est.offset, est.min_rtt), addr)
+        except OSError:
+            pass
+
     def _control_thread_func(self):
-        """Ping gönderip yanıtları dinleyen thread."""
+        """
+        Her saniye tüm hedeflere ping gönderen; pong ve NACK mesajlarını
+        dinleyen thread. Çoklu yayında her alıcı ayrı pong gönderir.
+        """
+        self.control_sock.settimeout(0.1)
+        last_ping = 0.0
         while self.streaming:
             try:
-                # Ping gönder
-                timestamp = time.time()
-                msg = struct.pack("!d", timestamp)
-                self.control_sock.sendto(b"PING" + msg, (self.dest_ip, self.control_port))
-
-                # Pong bekle
-                self.control_sock.settimeout(1)
-                data, _ = self.control_sock.recvfrom(1024)
-                if data.startswith(b"PONG"):
-                    rtt = time.time() - timestamp
-                    self.ping_ms = rtt * 1000
-                
+                now = time.monotonic()
+                if now - last_ping >= PING_INTERVAL:
+                    self._update_ping(now)
+                    self._send_ping(now)
+                    self._handle_reports()
+                    self._check_format()
+                    last_ping = now
+
+                data, addr = self.control_sock.recvfrom(1024)
+                if data.startswith(clock.PONG_PREFIX):
+                    self._handle_pong(data, addr, time.monotonic())
+                elif data.startswith(NACK_PREFIX):
+                    self._handle_nack(data, addr)
+                elif data.startswith(REPORT_PREFIX):
+                    report = Report.parse(data)
+                    if report:
+                        self.reports[addr] = self._pending_reports[addr] = report
+                elif data.startswith(CAPS_PREFIX):
+                    caps = Caps.parse(data)
+                    if caps:
+                        self.caps[addr] = caps
+
             except socket.timeout:
-                self.ping_ms = -1 # Zaman aşımı
+                continue
             except Exception as e:
                 if self.streaming:
                     print(f"Kontrol soketi hatası: {e}")
                 break
-            
-            time.sleep(1) # Her saniye ping gönder
+
+    def _capture_ring(self):
+        """Yakalama halkasını, merdivendeki en büyük paketi de alacak boyda kurar."""
+        samples = packet.frame_samples(self.rate, self.frame_ms)
+        counts = [step[0] for step in self.controller.ladder] if self.controller else []
+        count = max(counts + [self._packet_settings(samples, self.channels)[1]])
+        limit = max(2 * count, int(np.ceil(self.queue_ms / self.frame_ms)))
+        capacity = limit
+        if self.drop_policy == "oldest":
+            # Takılma sırasında yakalanan ses halkada kalır; okuyucu dönünce fazlasını atar
+            capacity = max(limit + count, int(np.ceil(CAPTURE_HEADROOM_MS / self.frame_ms)))
+        return CaptureRing(capacity, samples, self.channels, self.rate, limit, self.drop_policy)
 
     def start_streaming(self):
         """Akışı başlatır."""
@@ -103,18 +612,44 @@ class AudioSender:
 
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.control_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        
+        if any(is_multicast(ip) for ip, _ in self.destinations):
+            self._enable_multicast()
+        with self._dest_lock:
+            for dest in self.destinations:
+                self._open_link(dest)
+        self.receivers = {}
+        self._pings = {}
         self.seq = 0
+        self.stream_id = random.getrandbits(32)
+        self.history = RetransmitHistory() if self.nack else None
+        self.reports = {}
+        self._pending_reports = {}
+        self.controller = None
+        self.caps = {}
+        self._negotiated = None
+        self._source_format = (None, None)
+        if self.negotiate:
+            self._source_format = self.backend.native_format(self.loop_mic)
+        else:
+            self.rate, self.channels, codec = self._format
+            if self.adapt:
+                self._start_controller(codec)
+        self.ring = None
         self.streaming = True
-        
-        self.thread = threading.Thread(target=self._stream_mic_thread)
-        self.thread.daemon = True
-        self.thread.start()
 
+        # Kontrol thread'i önce başlar: ilk ping'e gelen biçim bildirimleri yakalamadan önce beklenir
         self.control_thread = threading.Thread(target=self._control_thread_func)
         self.control_thread.daemon = True
         self.control_thread.start()
 
+        self.capture_thread = threading.Thread(target=self._capture_thread_func)
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+
+        self.thread = threading.Thread(target=self._stream_mic_thread)
+        self.thread.daemon = True
+        self.thread.start()
+
         return True
 
     def stop_streaming(self):
@@ -124,6 +659,8 @@ class AudioSender:
             return
 
         self.streaming = False
+        if self.capture_thread:
+            self.capture_thread.join(timeout=1)
         if self.thread:
             self.thread.join(timeout=1)
         if self.control_thread:
@@ -133,8 +670,12 @@ class AudioSender:
             self.sock.close()
         if self.control_sock:
             self.control_sock.close()
+        with self._dest_lock:
+            for dest in list(self.links):
+                self._close_link(dest)
 
         self.thread = None
+        self.capture_thread = None
         self.control_thread = None
         self.sock = None
         self.control_sock = None
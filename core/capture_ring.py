@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+Yakalama ile kodlama/gönderim arasındaki zaman damgalı çerçeve halkası.
+
+Yakalama thread'i kayıt aygıtından gelen blokları çerçevelere bölüp halkaya
+yazar ve başka hiçbir iş yapmaz; gönderim thread'i paket başına gereken
+çerçeve sayısı birikince onları okur. Yazıcı ile okuyucu tektir ve kilit
+almazlar: yalnızca yazıcı `head`'i, yalnızca okuyucu `tail`'i ilerletir,
+veri yuvaya sayaç ilerletilmeden önce yazılır.
+
+Halka sınırlıdır (geri basınç). Gönderim takılırsa iki politika vardır:
+
+    "oldest"  Okuyucu kuyruk `limit` çerçeveyi aşınca en eskileri atar ve
+              canlı sese yetişir (gecikme sınırlı kalır, varsayılan). Halka
+              sınırdan büyük tutulur; uzun bir takılmada da yeni ses kaybolmaz.
+    "newest"  Okuyucu hiç atlamaz; halka dolunca yeni yakalanan çerçeveler
+              atılır (eldeki ses sırayla ama gecikerek gider).
+
+Her iki durumda da halka tamamen doluysa yazıcı beklemez, yeni çerçeveyi
+atar ve `overruns`'ı artırır: yakalama hiçbir zaman ağı beklemez.
+"""
+
+import threading
+import numpy as np
+
+CAPTURE_QUEUE_MS = 100      # Kuyrukta tutulacak en fazla ses
+CAPTURE_HEADROOM_MS = 1000  # "oldest" politikasında halkanın boyu (gönderimin takılabileceği süre)
+DROP_POLICIES = ("oldest", "newest")
+
+class CaptureRing:
+    """Tek yazıcılı / tek okuyuculu, yakalama zamanlarını da tutan float32 çerçeve halkası."""
+    def __init__(self, capacity, samples, channels, rate, limit=None, policy="oldest"):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Bilinmeyen atma politikası: {policy} (desteklenenler: {DROP_POLICIES})")
+        self.capacity = capacity
+        self.samples = samples
+        self.channels = channels
+        self.rate = rate
+        self.frame_s = samples / rate
+        self.limit = min(limit or capacity, capacity)
+        self.policy = policy
+        self.frames = np.zeros((capacity, samples, channels), dtype=np.float32)
+        self.times = np.zeros(capacity)  # Çerçevenin son örneğinin yakalandığı an (monotonic)
+        self.head = 0        # Yazılan toplam çerçeve (yalnızca yazıcı)
+        self.tail = 0        # Tüketilen toplam çerçeve (yalnızca okuyucu)
+        self.overruns = 0    # Halka dolu olduğu için atılan yeni çerçeveler (yazıcı)
+        self.dropped = 0     # Gecikmeyi sınırlamak için atılan eski çerçeveler (okuyucu)
+        self.max_depth = 0
+        self.closed = False
+        self.ready = threading.Event()
+        self._views = {}     # (başlangıç yuvası, çerçeve sayısı) -> bitişik görünüm
+
+    @property
+    def depth(self):
+        return self.head - self.tail
+
+    def write(self, block, captured):
+        """
+        Yakalanan bloğu çerçevelere bölerek yazar (yazıcı thread'i). `captured`
+        bloğun son örneğinin yakalandığı andır; önceki çerçevelerin zamanı
+        buradan geriye doğru hesaplanır. Sığmayan çerçeveler atılır.
+        """
+        n = len(block) // self.samples
+        frames = block[:n * self.samples].reshape(n, self.samples, self.channels)
+        head = self.head
+        free = self.capacity - (head - self.tail)
+        if n > free:
+            self.overruns += n - free
+        for i in range(min(n, free)):
+            slot = (head + i) % self.capacity
+            self.frames[slot] = frames[i]
+            self.times[slot] = captured - (n - 1 - i) * self.frame_s
+        head += min(n, free)
+        self.head = head  # Yayınla: okuyucu yalnızca buraya kadar okur
+        self.max_depth = max(self.max_depth, head - self.tail)
+        self.ready.set()
+
+    def close(self):
+        """Yazıcı bitti; bekleyen okuyucu uyanır."""
+        self.closed = True
+        self.ready.set()
+
+    def wait(self, count, timeout):
+        """`count` çerçeve birikene kadar bekler (okuyucu); birikmediyse False döndürür."""
+        while self.head - self.tail < count:
+            if self.closed or not self.ready.wait(timeout):
+                return False
+            self.ready.clear()
+        return True
+
+    def trim(self, count):
+        """
+        "oldest" politikasında kuyruk sınırı aşıldıysa en yeni `count` çerçeve
+        dışındakileri atar; atılan çerçeve sayısını döndürür (okuyucu).
+        """
+        depth = self.head - self.tail
+        if self.policy != "oldest" or depth <= self.limit:
+            return 0
+        skip = depth - count
+        self.tail += skip
+        self.dropped += skip
+        return skip
+
+    def read(self, count, out):
+        """
+        En eski `count` çerçeveyi (örnek, kanal) biçiminde ve son çerçevenin
+        yakalama anıyla döndürür; halkanın sonunu sarmıyorsa kopyalamaz, sarıyorsa
+        `out`'a kopyalar. Yuvalar `advance` çağrılana kadar üzerine yazılmaz.
+        """
+        start = self.tail % self.capacity
+        captured = self.times[(self.tail + count - 1) % self.capacity]
+        if start + count <= self.capacity:
+            view = self._views.get((start, count))
+            if view is None:
+                view = self._views[(start, count)] = self.frames[start:start + count].reshape(-1, self.channels)
+            return view, captured
+        first = (self.capacity - start) * self.samples
+        out[:first] = self.frames[start:].reshape(-1, self.channels)
+        out[first:] = self.frames[:start + count - self.capacity].reshape(-1, self.channels)
+        return out, captured
+
+    def advance(self, count):
+        """Okunan çerçevelerin yuvalarını yazıcıya geri verir."""
+        self.tail += count
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+Kontrol kanalında NTP tarzı saat eşitleme.
+
+Gönderici her ping'e bir kimlik verir; dört monoton zaman damgası
+(t1: ping gönderimi, t2: alıcıya varış, t3: pong gönderimi, t4: pong varışı)
+ile gidiş-dönüş süresi ve iki saat arasındaki fark hesaplanır:
+
+    rtt    = (t4 - t1) - (t3 - t2)
+    offset = ((t2 - t1) + (t3 - t4)) / 2      # alıcı saati - gönderici saati
+
+Son `CLOCK_WINDOW` örnek içinden RTT'si en küçük olanın farkı kullanılır
+(kuyrukta bekleyen ölçümler farkı bozduğu için). Gönderici tahminini SYNC
+mesajıyla alıcıya bildirir; alıcı ses paketlerindeki yakalama zaman
+damgalarını bu farkla kendi saatine çevirerek paket başına ağ gecikmesini ve
+yakalamadan çalmaya toplam gecikmeyi ölçer.
+
+Ping göndericinin akış kimliğini de taşır; alıcı göndericinin kontrol
+adresini bununla akışın kaynağına eşler (bkz. core.source).
+
+Tüm zamanlar `time.monotonic()` değerleridir; NTP'nin duvar saatini
+ayarlaması ölçümleri bozmaz.
+"""
+
+import struct
+from collections import deque
+
+PING_PREFIX = b"PING"
+PONG_PREFIX = b"PONG"
+SYNC_PREFIX = b"SYNC"
+PING = struct.Struct("!4sIdI")    # önek, ping kimliği, t1, göndericinin akış kimliği
+PONG = struct.Struct("!4sIddd")   # önek, ping kimliği, t1, t2, t3
+SYNC = struct.Struct("!4sdd")     # önek, saat farkı (s), en küçük RTT (s)
+CLOCK_WINDOW = 8                  # Fark tahmininde kullanılan son örnek sayısı
+TIMESTAMP_MASK = 0xFFFFFFFF       # Ses paketlerindeki 32 bit mikrosaniye damgası
+TIMESTAMP_HALF = 0x80000000
+
+def pack_ping(ping_id, t1, stream=0):
+    return PING.pack(PING_PREFIX, ping_id & 0xFFFFFFFF, t1, stream)
+
+def parse_ping(data):
+    """(ping kimliği, t1, akış kimliği) döndürür; biçim tutmazsa None."""
+    if len(data) != PING.size:
+        return None
+    return PING.unpack(data)[1:]
+
+def pack_pong(ping_id, t1, t2, t3):
+    return PONG.pack(PONG_PREFIX, ping_id, t1, t2, t3)
+
+def parse_pong(data):
+    """(ping kimliği, t1, t2, t3) döndürür; biçim tutmazsa None."""
+    if len(data) != PONG.size:
+        return None
+    return PONG.unpack(data)[1:]
+
+def pack_sync(offset, rtt):
+    return SYNC.pack(SYNC_PREFIX, offset, rtt)
+
+def parse_sync(data):
+    """(saat farkı, en küçük RTT) döndürür; biçim tutmazsa None."""
+    if len(data) != SYNC.size:
+        return None
+    return SYNC.unpack(data)[1:]
+
+def timestamp_us(t):
+    """Monoton zamanı ses paketi başlığındaki 32 bit mikrosaniye damgasına çevirir."""
+    return int(t * 1000000) & TIMESTAMP_MASK
+
+def age(timestamp, now):
+    """
+    32 bit damganın `now` anına göre kaç saniye önce olduğunu döndürür
+    (`now` damgayla aynı saatte olmalı). Sarma hesaba katılır.
+    """
+    diff = ((timestamp_us(now) - timestamp + TIMESTAMP_HALF) & TIMESTAMP_MASK) - TIMESTAMP_HALF
+    return diff / 1000000
+
+class ClockEstimator:
+    """Bir karşı taraf için RTT ve saat farkı tahmini (gönderici tarafı)."""
+    def __init__(self, window=CLOCK_WINDOW):
+        self.samples = deque(maxlen=window)  # (rtt, offset)
+        self.rtt = -1.0        # Son ölçülen RTT (s)
+        self.min_rtt = -1.0    # Penceredeki en küçük RTT (s)
+        self.offset = 0.0      # Karşı taraf saati - yerel saat (s)
+        self.last_seen = 0.0   # Son pong'un varış zamanı (yerel monoton)
+
+    def add(self, t1, t2, t3, t4):
+        """Bir ping/pong değişiminin dört zaman damgasını ekler."""
+        rtt = max(0.0, (t4 - t1) - (t3 - t2))
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        self.samples.append((rtt, offset))
+        self.rtt = rtt
+        self.min_rtt, self.offset = min(self.samples)
+        self.last_seen = t4
+
+    @property
+    def rtt_ms(self):
+        return self.rtt * 1000 if self.rtt >= 0 else -1
+
+    @property
+    def one_way_ms(self):
+        """Simetrik yol varsayımıyla tek yön gecikme tahmini (ms)."""
+        return self.min_rtt * 500 if self.min_rtt >= 0 else -1
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ses kodekleri.
+
+Gönderici yakaladığı int16 PCM bloğunu paketlemeden önce kodlar, alıcı ise
+paketi jitter tamponuna koymadan önce çözer. Kodek kimliği paket başlığında
+taşınır. Tüm kodekler NumPy ile vektörel çalışır.
+"""
+
+import struct
+import threading
+import numpy as np
+from core import packet
+
+class Codec:
+    """
+    Kodek arayüzü. `encode` (n, kanal) biçimli int16 bloğu bayta çevirir,
+    `decode` ise baytları önceden ayrılmış (n, kanal) int16 diziye çözer.
+    `encode_into` aynı kodlamayı önceden ayrılmış bir uint8 diziye yazar.
+    """
+    id = None
+    name = None
+    lossless = True
+    sample_bytes = 2  # Örnek başına en kötü durum bayt sayısı (MTU hesabı için)
+    overhead = 0      # Çerçeve sayısından bağımsız, paket başına en fazla ek bayt
+
+    def encode(self, pcm):
+        raise NotImplementedError
+
+    def encode_into(self, pcm, out):
+        """Kodlanmış baytları `out` dizisinin başına yazar ve bayt sayısını döndürür."""
+        data = self.encode(pcm)
+        out[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        return len(data)
+
+    def decode(self, payload, out):
+        raise NotImplementedError
+
+class PCM16Codec(Codec):
+    """Sıkıştırmasız int16 PCM."""
+    id = packet.PCM16
+    name = "pcm16"
+
+    def encode(self, pcm):
+        return pcm.tobytes()
+
+    def encode_into(self, pcm, out):
+        out[:pcm.nbytes] = pcm.reshape(-1).view(np.uint8)
+        return pcm.nbytes
+
+    def decode(self, payload, out):
+        np.copyto(out, np.frombuffer(payload, dtype=np.int16).reshape(out.shape))
+        return out
+
+# --------------------------------------------------------------------------
+# µ-law (G.711 benzeri, örnek başına 8 bit)
+# --------------------------------------------------------------------------
+
+MULAW_MU = 255.0
+
+def _mulaw_tables():
+    """Tüm int16 değerleri için kodlama ve 256 kod için çözme tablolarını üretir."""
+    codes = np.arange(-128, 128, dtype=np.float64) / 127.0
+    codes = np.clip(codes, -1.0, 1.0)
+    decode = np.sign(codes) * np.expm1(np.abs(codes) * np.log1p(MULAW_MU)) / MULAW_MU
+    decode = np.round(decode * 32767).astype(np.int16)
+    # İndeks: uint8 olarak yorumlanan int8 kod
+    decode = np.roll(decode, -128)
+
+    x = np.arange(-32768, 32768, dtype=np.float64) / 32768.0
+    y = np.sign(x) * np.log1p(MULAW_MU * np.abs(x)) / np.log1p(MULAW_MU)
+    encode = np.round(y * 127).astype(np.int8)
+    # İndeks: uint16 olarak yorumlanan int16 örnek
+    encode = np.roll(encode, -32768)
+    return encode.view(np.uint8), decode
+
+class MuLawCodec(Codec):
+    """Ucuz kayıplı kodek: µ-law ile örnek başına 8 bit (2:1)."""
+    id = 1
+    name = "mulaw"
+    lossless = False
+    sample_bytes = 1
+
+    def __init__(self):
+        self._enc, self._dec = _mulaw_tables()
+        self._local = threading.local()
+
+    def encode(self, pcm):
+        return np.take(self._enc, pcm.view(np.uint16)).tobytes()
+
+    def encode_into(self, pcm, out):
+        # np.take uint16 indeksleri her çağrıda intp'ye çevirir; dönüşüm thread'in tamponuna yapılır
+        index = getattr(self._local, "index", None)
+        if index is None or index.size != pcm.size:
+            index = self._local.index = np.empty(pcm.size, dtype=np.intp)
+        np.copyto(index, pcm.view(np.uint16).reshape(-1))
+        # Tablo tüm uint16 değerlerini kapsar; "clip" kipi `out` için ara kopya yapmaz
+        np.take(self._enc, index, out=out[:pcm.size], mode="clip")
+        return pcm.size
+
+    def decode(self, payload, out):
+        codes = np.frombuffer(payload, dtype=np.uint8, count=out.size)
+        np.take(self._dec, codes, out=out.reshape(-1))
+        return out
+
+# --------------------------------------------------------------------------
+# Kayıpsız: sabit doğrusal öngörü + blok Rice kodlaması
+# --------------------------------------------------------------------------
+
+MAX_ORDER = 3    # Sabit öngörücü derecesi (FLAC'taki gibi 0..3)
+MAX_RICE_K = 20
+RICE_ESCAPE = 32  # Bu kadar veya daha uzun tekli kısım ham 32 bit olarak yazılır
+
+# Kanal bloğu başlığı: öngörü derecesi, Rice k, tekli akış bayt sayısı, kaçış sayısı
+BLOCK_HEADER = struct.Struct("!BBHH")
+STEREO_INDEPENDENT = 0
+STEREO_LEFT_SIDE = 1
+VERBATIM = 2  # Sıkıştırma kazanç sağlamadıysa ham PCM
+
+class _LosslessScratch:
+    """Kayıpsız kodlamanın bir thread'e ait, blok boyuna göre ayrılmış ara dizileri."""
+    def __init__(self, n, channels):
+        self.n = n
+        self.channels = channels
+        self.x = np.empty((channels, n), dtype=np.int32)
+        self.side = np.empty(n, dtype=np.int32)
+        self.diff = np.empty(max(0, n - 1), dtype=np.int32)
+        self.res = np.empty((MAX_ORDER + 1, n), dtype=np.int32)
+        self.u = np.empty(n, dtype=np.int32)
+        self.q = np.empty(n, dtype=np.int32)
+        self.tmp = np.empty(n, dtype=np.int32)
+        self.escaped = np.empty(n, dtype=bool)
+        self.pos = np.empty(n, dtype=np.intp)
+        self.unary = np.empty(n * (RICE_ESCAPE + 1), dtype=np.uint8)
+        self.low = np.empty(n * MAX_RICE_K, dtype=np.uint8)
+
+def _abs_sum(x, tmp):
+    return int(np.abs(x, out=tmp[:len(x)]).sum())
+
+def _best_residual(x, sc):
+    """0..MAX_ORDER dereceli sabit öngörücülerden en küçük artığı vereni seçer."""
+    res = sc.res
+    np.copyto(res[0], x)
+    best_order = 0
+    best_cost = _abs_sum(x, sc.tmp)
+    for order in range(1, MAX_ORDER + 1):
+        # Baştaki 0 ile fark alma: r[0] = önceki[0], r[i] = önceki[i] - önceki[i-1]
+        prev, cur = res[order - 1], res[order]
+        cur[0] = prev[0]
+        np.subtract(prev[1:], prev[:-1], out=cur[1:])
+        cost = _abs_sum(cur, sc.tmp)
+        if cost < best_cost:
+            best_order, best_cost = order, cost
+    return best_order, res[best_order]
+
+def _rice_k(u, tmp):
+    """
+    Toplam bit sayısını en aza indiren Rice parametresini seçer. Maliyet k'de
+    dışbükeydir; ortalamadan tahmin edilen k'den komşulara doğru aranır.
+    """
+    n = len(u)
+
+    def cost(k):
+        np.right_shift(u, k, out=tmp)
+        return int(tmp.sum()) + k * n
+
+    k = min(MAX_RICE_K, max(0, (int(u.sum()) // max(1, n)).bit_length() - 1))
+    best = cost(k)
+    while k > 0:
+        c = cost(k - 1)
+        if c > best:
+            break
+        k, best = k - 1, c
+    while k < MAX_RICE_K:
+        c = cost(k + 1)
+        if c >= best:
+            break
+        k, best = k + 1, c
+    return k
+
+def _rice_encode_into(order, res, sc, out, offset, limit):
+    """
+    Bir kanal bloğunun artıklarını Rice ile `out[offset:]`'a kodlar. Tekli
+    (unary) bölümler ve k bitlik düşük bölümler ayrı bit akışlarına yazılır;
+    böylece çözme de tamamen vektörel yapılabilir. Blok `limit`'i aşacaksa
+    hiçbir şey yazmadan None, aksi halde yeni ofseti döndürür.
+    """
+    n = len(res)
+    u, q, tmp, pos = sc.u, sc.q, sc.tmp, sc.pos
+    # zigzag: işaretli → işaretsiz
+    np.left_shift(res, 1, out=u)
+    np.right_shift(res, 31, out=tmp)
+    np.bitwise_xor(u, tmp, out=u)
+    k = _rice_k(u, tmp)
+    np.right_shift(u, k, out=q)
+    np.greater_equal(q, RICE_ESCAPE, out=sc.escaped)
+    n_esc = int(np.count_nonzero(sc.escaped))
+    np.minimum(q, RICE_ESCAPE, out=q)
+
+    # Her değerin tekli kısmını bitiren 1 bitinin konumu
+    np.add(q, 1, out=pos)
+    np.cumsum(pos, out=pos)
+    total = int(pos[-1]) if n else 0
+    pos -= 1
+    n_unary = (total + 7) // 8
+    n_low = (n * k + 7) // 8
+    end = offset + BLOCK_HEADER.size + n_unary + n_low + 4 * n_esc
+    if end > limit:
+        return None
+
+    BLOCK_HEADER.pack_into(out, offset, order, k, n_unary, n_esc)
+    offset += BLOCK_HEADER.size
+    unary = sc.unary[:total]
+    unary.fill(0)
+    unary[pos] = 1
+    out[offset:offset + n_unary] = np.packbits(unary)
+    offset += n_unary
+
+    if k:
+        # Düşük k bit, en anlamlısı önce: bits[i, j] = (u[i] >> (k - 1 - j)) & 1
+        bits = sc.low[:n * k]
+        matrix = bits.reshape(n, k)
+        for j in range(k):
+            np.right_shift(u, k - 1 - j, out=tmp)
+            np.bitwise_and(tmp, 1, out=matrix[:, j], casting="unsafe")
+        out[offset:offset + n_low] = np.packbits(bits)
+        offset += n_low
+
+    if n_esc:
+        out[offset:offset + 4 * n_esc] = u[sc.escaped].astype(">u4").view(np.uint8)
+        offset += 4 * n_esc
+    return offset
+
+def _rice_decode(buf, offset, n):
+    """Bir kanal bloğunu çözer; (derece, artıklar, yeni ofset) döndürür."""
+    order, k, n_unary, n_esc = BLOCK_HEADER.unpack_from(buf, offset)
+    offset += BLOCK_HEADER.size
+
+    unary = np.unpackbits(np.frombuffer(buf, dtype=np.uint8, count=n_unary, offset=offset))
+    offset += n_unary
+    ends = np.flatnonzero(unary)[:n]
+    q = np.diff(ends, prepend=-1) - 1
+
+    n_low = (n * k + 7) // 8
+    if k:
+        bits = np.unpackbits(np.frombuffer(buf, dtype=np.uint8, count=n_low, offset=offset))[:n * k]
+        weights = (1 << np.arange(k - 1, -1, -1, dtype=np.int64))
+        low = bits.reshape(n, k).astype(np.int64) @ weights
+    else:
+        low = 0
+    offset += n_low
+
+    u = (q << k) | low
+    if n_esc:
+        esc = np.frombuffer(buf, dtype=">u4", count=n_esc, offset=offset).astype(np.int64)
+        u[q == RICE_ESCAPE] = esc
+    offset += n_esc * 4
+
+    res = (u >> 1) ^ -(u & 1)  # zigzag tersi
+    return order, res, offset
+
+class LosslessCodec(Codec):
+    """
+    Kayıpsız kodek: her kanal için 0..3 dereceli sabit doğrusal öngörü
+    (FLAC'taki fark alma yaklaşımı), stereo için isteğe bağlı sol/yan
+    dönüşümü ve blok başına tek parametreli Rice kodlaması.
+    """
+    id = 2
+    name = "lossless"
+
+    # Blok sıkıştırılamazsa yazılan kip baytı: yük ham PCM'den bir bayt uzun olabilir
+    overhead = 1
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _scratch(self, n, channels):
+        sc = getattr(self._local, "scratch", None)
+        if sc is None or (sc.n, sc.channels) != (n, channels):
+            sc = self._local.scratch = _LosslessScratch(n, channels)
+        return sc
+
+    def encode(self, pcm):
+        out = np.empty(pcm.nbytes + self.overhead, dtype=np.uint8)
+        return out[:self.encode_into(pcm, out)].tobytes()
+
+    def encode_into(self, pcm, out):
+        """
+        Bloğu `out`'a kodlar (en az pcm.nbytes + 1 bayt). Ara diziler thread
+        başına bir kez ayrılır; yalnızca bit paketleme yük boyunda küçük
+        geçici diziler üretir.
+        """
+        n, channels = pcm.shape
+        sc = self._scratch(n, channels)
+        x = sc.x
+        np.copyto(x, pcm.T)
+        sources = list(x)
+        mode = STEREO_INDEPENDENT
+        if channels == 2:
+            side = np.subtract(x[0], x[1], out=sc.side)
+            d = sc.diff
+            np.subtract(side[1:], side[:-1], out=d)
+            side_cost = _abs_sum(d, d)
+            np.subtract(x[1][1:], x[1][:-1], out=d)
+            if side_cost < _abs_sum(d, d):
+                mode = STEREO_LEFT_SIDE
+                sources[1] = side
+
+        out[0] = mode
+        offset = 1
+        for src in sources:
+            offset = _rice_encode_into(*_best_residual(src, sc), sc, out, offset, pcm.nbytes)
+            if offset is None:
+                # Gürültü gibi sıkıştırılamayan girdide büyümeyi bir bayta sınırla.
+                out[0] = VERBATIM
+                out[1:1 + pcm.nbytes] = pcm.reshape(-1).view(np.uint8)
+                return 1 + pcm.nbytes
+        return offset
+
+    def decode(self, payload, out):
+        n, channels = out.shape
+        mode = payload[0]
+        if mode == VERBATIM:
+            np.copyto(out, np.frombuffer(payload, dtype=np.int16, offset=1).reshape(out.shape))
+            return out
+        offset = 1
+        chans = []
+        for _ in range(channels):
+            order, x, offset = _rice_decode(payload, offset, n)
+            for _ in range(order):
+                x = np.cumsum(x)
+            chans.append(x)
+        if mode == STEREO_LEFT_SIDE:
+            chans[1] = chans[0] - chans[1]
+        for ch, x in enumerate(chans):
+            out[:, ch] = x
+        return out
+
+CODECS = {codec.id: codec for codec in (PCM16Codec(), MuLawCodec(), LosslessCodec())}
+CODECS_BY_NAME = {codec.name: codec for codec in CODECS.values()}
+
+def get_codec(codec):
+    """Kodeği kimliğine veya adına göre döndürür."""
+    found = CODECS.get(codec) if isinstance(codec, int) else CODECS_BY_NAME.get(codec)
+    if found is None:
+        raise ValueError(f"Bilinmeyen kodek: {codec} (desteklenenler: {', '.join(CODECS_BY_NAME)})")
+    return found
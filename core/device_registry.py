@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+Arka planda aygıt listesini tutan kayıt defteri.
+
+Aygıt listeleme (özellikle `soundcard` ile) işletim sisteminin ses
+katmanını baştan sorgular ve onlarca milisaniye sürebilir. Bu modül
+listelemeyi kendi thread'inde `REFRESH_INTERVAL` aralıklarla yapar, sonucu
+önbellekte tutar ve değişiklikleri (yeni / kaybolan aygıt, varsayılan
+hoparlörün değişmesi) abonelere bildirir. Ses thread'leri ve arayüz yalnızca
+önbelleği okur; hiçbiri listeleme çağrısı yapmaz.
+
+Aynı arka uç için tek bir kayıt defteri paylaşılır (`get_registry`);
+kullanan her bileşen `acquire()` / `release()` çağırır, son kullanıcı
+bırakınca thread durur.
+"""
+
+import threading
+import weakref
+from core.audio_backend import get_backend
+
+REFRESH_INTERVAL = 2.0  # Saniye
+READY_TIMEOUT = 5.0     # İlk listelemenin beklenme süresi
+
+_registries = weakref.WeakValueDictionary()  # id(arka uç) -> DeviceRegistry
+_registries_lock = threading.Lock()
+
+class DeviceSnapshot:
+    """Bir listelemenin sonucu: kaynaklar, çıkışlar ve varsayılan çıkış."""
+    def __init__(self, microphones=(), speakers=(), default_speaker=None):
+        self.microphones = list(microphones)
+        self.speakers = list(speakers)
+        self.default_speaker = default_speaker
+
+    def key(self):
+        """Değişiklik karşılaştırması için aygıt adları."""
+        default = self.default_speaker.name if self.default_speaker else None
+        return (tuple(m.name for m in self.microphones), tuple(s.name for s in self.speakers), default)
+
+    def speaker(self, name=None):
+        """Adı verilen çıkışı (yoksa varsayılanı) döndürür; hiçbiri yoksa None."""
+        if name:
+            for spk in self.speakers:
+                if spk.name == name:
+                    return spk
+        return self.default_speaker
+
+    def microphone(self, name):
+        for mic in self.microphones:
+            if mic.name == name:
+                return mic
+        return None
+
+class DeviceRegistry:
+    """
+    Bir arka ucun aygıtlarını arka planda listeleyip önbellekte tutar.
+    Abonelere `callback(eski, yeni)` biçiminde, kayıt defteri thread'inden
+    bildirim yapılır (arayüz bunu kendi thread'ine aktarmalıdır).
+    """
+    def __init__(self, backend=None, interval=REFRESH_INTERVAL):
+        self.backend = get_backend(backend)
+        self.interval = interval
+        self.snapshot = None
+        self.enumerations = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._users = 0
+        self._stop = None     # Çalışan thread'in durdurma olayı
+        self._thread = None
+
+    def acquire(self):
+        """Bir kullanıcı ekler; thread çalışmıyorsa başlatır."""
+        with self._lock:
+            self._users += 1
+            if self._stop is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+                self._thread.start()
+        return self
+
+    def release(self):
+        """Bir kullanıcıyı bırakır; kullanıcı kalmadıysa thread'i durdurur."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users or self._stop is None:
+                return
+            self._stop.set()
+            self._stop = None
+        self._wake.set()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def refresh(self, wait=False):
+        """Listelemeyi hemen tetikler; `wait` ise bitmesini bekler."""
+        done = self.enumerations
+        self._wake.set()
+        if wait:
+            while self._stop is not None and self.enumerations == done:
+                self._ready.wait(0.05)
+
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        """İlk listeleme bitene kadar bekler; bittiyse True döner."""
+        return self._ready.wait(timeout)
+
+    def current(self):
+        """Son listelemenin sonucu (henüz yoksa ilkini bekler)."""
+        if self.snapshot is None:
+            self.wait_ready()
+        return self.snapshot or DeviceSnapshot()
+
+    def loopback_devices(self):
+        """Önbellekteki geri döngü kaynaklarının adları."""
+        return [mic.name for mic in self.current().microphones]
+
+    def speaker(self, name=None):
+        """Önbellekteki çıkışı (ad verilmezse veya bulunamazsa varsayılanı) döndürür."""
+        return self.current().speaker(name)
+
+    def _enumerate(self):
+        backend = self.backend
+        try:
+            mics = backend.microphones()
+        except Exception as e:
+            print(f"Ses kaynakları listelenemedi: {e}")
+            mics = []
+        try:
+            speakers = backend.speakers()
+        except Exception as e:
+            print(f"Ses çıkışları listelenemedi: {e}")
+            speakers = []
+        try:
+            default = backend.default_speaker()
+        except Exception:
+            default = None
+        return DeviceSnapshot(mics, speakers, default)
+
+    def _run(self, stop):
+        while not stop.is_set():
+            new = self._enumerate()
+            old, self.snapshot = self.snapshot, new
+            self.enumerations += 1
+            self._ready.set()
+            if old is not None and old.key() != new.key():
+                with self._lock:
+                    callbacks = list(self._callbacks)
+                for callback in callbacks:
+                    try:
+                        callback(old, new)
+                    except Exception as e:
+                        print(f"Aygıt bildirimi işlenemedi: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+def get_registry(backend=None):
+    """Arka uç için paylaşılan kayıt defterini döndürür (gerekirse oluşturur)."""
+    backend = get_backend(backend)
+    with _registries_lock:
+        registry = _registries.get(id(backend))
+        if registry is None or registry.backend is not backend:
+            registry = DeviceRegistry(backend)
+            _registries[id(backend)] = registry
+    return registry
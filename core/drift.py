@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+Saat kayması (clock drift) telafisi.
+
+Göndericinin yakalama saati ile alıcının çalma saati farklı ses kartlarına
+aittir; aradaki küçük hız farkı saatler içinde jitter tamponunu ya boşaltır ya
+da doldurur. Alıcı, tampon doluluğunun eğiliminden kayma oranını bir PI
+denetleyiciyle tahmin eder ve çalınan sesi kübik (Catmull-Rom) ara değerlemeyle
+bu oranda yeniden örnekler. Çerçeve başına çıkış uzunluğu ±1 örnek değişir;
+perde değişimi en fazla MAX_DRIFT oranındadır ve duyulmaz.
+
+Doluluk sabit bir hedefe göre değil, çekimden hemen önce görülen derinliğin
+ilk `SETTLE_TIME` saniyedeki ortalamasına göre ölçülür. Çekimler aygıtın
+sabit temposuyla yapıldığından bu derinlik ağın ve aygıtın zamanlamasına
+bağlıdır; aynı saati paylaşan iki uç başka bir derinliğe ulaşamaz ve sabit
+bir hedef, tümlev teriminde kalıcı bir hız farkı (duyulur bir perde kayması)
+bırakırdı. Derinlik tam sayı olduğundan `DRIFT_DEADBAND` kadarlık fark
+yok sayılır. Jitter tamponunun kendi eklediği/attığı çerçeveler (bkz.
+`JitterBuffer.shifted`) derinlikten düşülür; yalnızca referanstan geri
+kalan uzaklaşma kayma sayılır.
+
+Çıkış aygıtı akıştan farklı bir hızda açıldıysa (bkz. core.negotiation) hız
+dönüştürme de aynı ara değerlemede yapılır: adım, kayma oranı ile hızların
+oranının çarpımıdır ve ses yalnızca bir kez yeniden örneklenir. Kayma
+güncellemesi hiç yapılmayan bir nesne yalnızca hız dönüştürür.
+"""
+
+import math
+import numpy as np
+
+MAX_DRIFT = 0.002       # En büyük düzeltme oranı (2000 ppm ≈ 3.5 cent)
+DRIFT_DEADBAND = 0.5    # Referansa bu kadar çerçeve yakın doluluk kayma sayılmaz (nicemleme)
+SETTLE_TIME = 2.0       # Referans doluluğun ölçüldüğü süre (saniye); bu sürede düzeltme yapılmaz
+LEVEL_TC = 0.5          # Doluluk ölçümünün yumuşatma zaman sabiti (saniye)
+DRIFT_KP = 0.1          # Oransal kazanç (1/s): fazla her saniyelik ses için düzeltme
+DRIFT_KI = 0.0025       # Tümlev kazancı (1/s²): kalıcı saat farkını öğrenir
+
+class DriftCompensator:
+    """
+    Tampon doluluğuna göre kayma oranını tahmin eden ve çerçeveleri bu oranda
+    yeniden örnekleyen sınıf. `update` her çekimde doluluğu bildirir,
+    `process` ise çerçeveyi yeniden örnekleyip önceden ayrılmış çıkış dizisinin
+    bir görünümünü döndürür (2 örnek gecikmeyle). `out_rate` verilirse çıkış
+    o hızdadır.
+    """
+    def __init__(self, rate=48000, frames=480, channels=2, out_rate=None):
+        self.rate = rate
+        self.out_rate = out_rate or rate
+        self.conversion = rate / self.out_rate  # Hız dönüştürme: çıkış örneği başına giriş örneği
+        self.frames = frames
+        self.channels = channels
+        self.frame_s = frames / rate
+        self._alpha = min(1.0, self.frame_s / LEVEL_TC)
+
+        self.ratio = 1.0      # Çıkış örneği başına tüketilen giriş örneği
+        self.level = None     # Yumuşatılmış doluluk (çerçeve)
+        self.reference = None # Aynı saatte beklenen doluluk (ilk SETTLE_TIME'ın ortalaması)
+        self.integral = 0.0
+        self._settle = max(1, int(round(SETTLE_TIME / self.frame_s)))
+        self._settle_sum = 0.0
+        self._settle_count = 0
+        self.phase = 1.0      # Sıradaki çıkış örneğinin genişletilmiş tampondaki konumu
+        self.resampled = 0    # Ara değerlemeyle işlenen çerçeve sayısı
+
+        # Önceki çerçevenin son 3 örneği + yeni çerçeve
+        self._ext = np.zeros((frames + 3, channels), dtype=np.float32)
+        self._taps = [self._ext[k:] for k in range(4)]
+        n = int(math.ceil((frames + 1) / ((1 - MAX_DRIFT) * self.conversion))) + 1
+        self._steps = np.arange(n, dtype=np.float64)
+        self._pos = np.empty(n, dtype=np.float64)
+        self._idx = np.empty(n, dtype=np.intp)
+        self._frac = np.empty((n, 1), dtype=np.float32)
+        self._p = [np.empty((n, channels), dtype=np.float32) for _ in range(4)]
+        self._tmp = np.empty((n, channels), dtype=np.float32)
+        self.out = np.empty((n, channels), dtype=np.float32)
+
+    @property
+    def ppm(self):
+        """Uygulanan düzeltme, milyonda bir cinsinden."""
+        return (self.ratio - 1.0) * 1e6
+
+    def update(self, depth, shifted=0):
+        """
+        Çekimden hemen önceki tampon derinliğiyle kayma oranını günceller.
+        `shifted`, tamponun kendi kararıyla eklediği net çerçeve sayısıdır.
+        """
+        level = depth - shifted
+        if self.level is None:
+            self.level = level
+        self.level += (level - self.level) * self._alpha
+        if self.reference is None:
+            # Referans: çekim öncesi derinliğin ortalaması (oran bu sürede 1 kalır)
+            self._settle_sum += level
+            self._settle_count += 1
+            if self._settle_count >= self._settle:
+                self.reference = self._settle_sum / self._settle_count
+            return
+
+        # Referansın üstünde/altında biriken ses (saniye): fazlaysa daha hızlı tüket.
+        # Derinlik tam sayıdır; aynı saatte referansa tam ulaşılamayabilir, bu yüzden
+        # yarım çerçevelik fark yok sayılır (tümlev orada kalıcı bir sapma biriktirmesin).
+        offset = self.level - self.reference
+        if abs(offset) <= DRIFT_DEADBAND:
+            offset = 0.0
+        else:
+            offset -= math.copysign(DRIFT_DEADBAND, offset)
+        err = offset * self.frame_s
+        self.integral = min(max(self.integral + DRIFT_KI * err * self.frame_s, -MAX_DRIFT), MAX_DRIFT)
+        self.ratio = 1.0 + min(max(DRIFT_KP * err + self.integral, -MAX_DRIFT), MAX_DRIFT)
+
+    def process(self, frame):
+        """
+        (frames, channels) float32 çerçeveyi geçerli oranda yeniden örnekler.
+        Dönen dizi her çağrıda yeniden kullanılır; uzunluğu frames ± 1 olabilir
+        (hız dönüştürülüyorsa frames × out_rate / rate ± 1).
+        """
+        ext = self._ext
+        frames = self.frames
+        ext[:3] = ext[frames:]
+        ext[3:] = frame
+
+        r = self.ratio * self.conversion
+        q0 = self.phase
+        if r == 1.0 and q0 == 1.0:
+            # Düzeltme yok: 2 örnek gecikmeli doğrudan kopya.
+            return ext[1:frames + 1]
+
+        count = int(math.ceil((frames + 1 - q0) / r))
+        self.phase = q0 + r * count - frames
+        if abs(self.phase - 1.0) < 1e-9:
+            self.phase = 1.0
+        self.resampled += 1
+
+        pos = self._pos[:count]
+        np.multiply(self._steps[:count], r, out=pos)
+        pos += q0
+        idx = self._idx[:count]
+        idx[...] = pos  # pos >= 1 olduğundan kesme = taban
+        frac = self._frac[:count]
+        np.subtract(pos, idx, out=frac[:, 0], casting="same_kind")
+        idx -= 1
+        p0, p1, p2, p3 = (np.take(tap, idx, axis=0, out=p[:count], mode="clip")
+                          for tap, p in zip(self._taps, self._p))
+
+        # Catmull-Rom: y = p1 + f/2 (c1 + f (c2 + f c3))
+        #   c3 = 3 (p1 - p2) + p3 - p0
+        #   c2 = 2 p0 - 5 p1 + 4 p2 - p3 = 2 p0 - p1 - 4 (p1 - p2) - p3
+        #   c1 = p2 - p0
+        d = np.subtract(p1, p2, out=self._tmp[:count])
+        y = np.multiply(d, 3, out=self.out[:count])
+        y += p3
+        y -= p0
+        y *= frac
+        y += p0
+        y += p0
+        y -= p1
+        d *= 4
+        y -= d
+        y -= p3
+        y *= frac
+        y += p2
+        y -= p0
+        y *= frac
+        y *= 0.5
+        y += p1
+        return y
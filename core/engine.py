@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ses motorunu arayüzden ayrı bir süreçte çalıştırma.
+
+Arayüz, tepsi simgesi ve keşif aynı yorumlayıcıda (ve aynı GIL'de) ses
+thread'leriyle yarışırsa Tk'nin yeniden çizimleri ve `after()` geri
+çağrıları 10 ms'lik ses döngüsünü geciktirebilir. `Engine` göndericiyi ve
+alıcıyı ayrı bir süreçte başlatır ve onu hafif bir komut borusuyla
+yönetir:
+
+    arayüz süreci                         motor süreci
+    Engine.start_sender(...)  --boru-->   AudioSender.start_streaming()
+    Engine.status()           <--paylaşılan bellek--  durum thread'i
+
+Durum (akış durumu, ses seviyesi, ping, metrikler) `STATUS_INTERVAL`'da
+bir JSON olarak `multiprocessing.shared_memory` bloğuna yazılır. Blok bir
+sıra sayacıyla korunur: yazıcı başlamadan önce sayacı tek, bitince çift
+yapar; okuyucu sayaç değişmediyse kopyasını kabul eder. Arayüz hiçbir
+zaman motorun bir kilidini tutmaz ve motorun yazmasını beklemez; en kötü
+ihtimalle bir önceki durumu görür.
+
+Motor süreci `spawn` ile başlar, böylece Tk'nin durumu kopyalanmaz ve
+arayüz modülleri motorda hiç içe aktarılmaz. `multiprocessing` yalnızca
+motor ilk kez başlatılırken yüklenir; uygulamanın açılışını yavaşlatmaz.
+"""
+
+import json
+import struct
+import threading
+import time
+
+STATUS_SIZE = 1 << 16                # Durum bloğunun boyutu (bayt)
+STATUS_HEADER = struct.Struct("=II")  # sıra sayacı (tekse yazılıyor), yük uzunluğu
+STATUS_INTERVAL = 0.1                # Durumun yazılma aralığı (saniye)
+COMMAND_TIMEOUT = 10.0               # Bir komutun yanıtı için en uzun bekleme (saniye)
+READ_RETRIES = 5                     # Yazma sürerken okumanın yeniden deneme sayısı
+
+class StatusBlock:
+    """Tek yazıcılı, kilitsiz okunan durum bloğu (paylaşılan bellek)."""
+    def __init__(self, name=None, size=STATUS_SIZE):
+        from multiprocessing import shared_memory
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.owner = create
+        self.sequence = 0
+        if create:
+            STATUS_HEADER.pack_into(self.buf, 0, 0, 0)
+
+    def write(self, status):
+        """Durumu yazar (yalnızca motor sürecindeki tek yazıcı)."""
+        data = json.dumps(status).encode("utf-8")
+        if STATUS_HEADER.size + len(data) > len(self.buf):
+            print(f"Durum bloğa sığmadı ({len(data)} bayt)")
+            return False
+        self.sequence += 1
+        STATUS_HEADER.pack_into(self.buf, 0, self.sequence, 0)
+        self.buf[STATUS_HEADER.size:STATUS_HEADER.size + len(data)] = data
+        self.sequence += 1
+        STATUS_HEADER.pack_into(self.buf, 0, self.sequence, len(data))
+        return True
+
+    def read(self):
+        """Son tutarlı durumu döndürür; henüz yazılmadıysa veya yazma sürüyorsa None."""
+        for _ in range(READ_RETRIES):
+            sequence, length = STATUS_HEADER.unpack_from(self.buf, 0)
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if not sequence:
+                return None
+            data = bytes(self.buf[STATUS_HEADER.size:STATUS_HEADER.size + length])
+            if STATUS_HEADER.unpack_from(self.buf, 0)[0] == sequence:
+                return json.loads(data)
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+def _peak(block):
+    """Bir float ses bloğunun tepe seviyesi (0..1); blok yoksa 0."""
+    if block is None or not len(block):
+        return 0.0
+    return float(max(block.max(), -block.min()))
+
+class EngineWorker:
+    """
+    Motor sürecinde çalışan taraf: borudan gelen komutları gönderici ve
+    alıcıya uygular, durumu periyodik olarak paylaşılan belleğe yazar.
+    """
+    def __init__(self, conn, status_name):
+        self.conn = conn
+        self.status = StatusBlock(status_name)
+        self.sender = None
+        self.receiver = None
+        self.announcer = None
+        self.running = False
+        self.lock = threading.Lock()  # Komutlar ile durum thread'i arasında
+
+    def run(self):
+        self.running = True
+        thread = threading.Thread(target=self._status_thread)
+        thread.daemon = True
+        thread.start()
+        while self.running:
+            try:
+                command, kwargs = self.conn.recv()
+            except (EOFError, OSError):
+                # Arayüz süreci kapandı
+                break
+            handler = getattr(self, "cmd_" + command, None)
+            try:
+                if handler is None:
+                    raise ValueError(f"bilinmeyen komut: {command}")
+                with self.lock:
+                    reply = (True, handler(**kwargs))
+            except Exception as e:
+                reply = (False, f"{type(e).__name__}: {e}")
+            try:
+                self.conn.send(reply)
+            except (EOFError, OSError):
+                break
+        self.running = False
+        with self.lock:
+            self.cmd_stop_sender()
+            self.cmd_stop_receiver()
+        thread.join(timeout=1)
+        self.status.close()
+
+    def cmd_start_sender(self, dest_ip, device=None, **kwargs):
+        if self.sender:
+            return False
+        from core.audio_sender import AudioSender
+        sender = AudioSender(dest_ip=dest_ip, device=device, **kwargs)
+        if not sender.start_streaming():
+            return False
+        self.sender = sender
+        return True
+
+    def cmd_stop_sender(self):
+        if not self.sender:
+            return False
+        self.sender.stop_streaming()
+        self.sender = None
+        return True
+
+    def cmd_start_receiver(self, announce=True, **kwargs):
+        if self.receiver:
+            return False
+        from core.audio_receiver import AudioReceiver
+        receiver = AudioReceiver(**kwargs)
+        if not receiver.start_listening():
+            return False
+        self.receiver = receiver
+        if announce:
+            from core.network_discovery import Announcer
+            self.announcer = Announcer(receiver.discovery_info)
+            self.announcer.start()
+        return True
+
+    def cmd_stop_receiver(self):
+        if self.announcer:
+            self.announcer.stop()
+            self.announcer = None
+        if not self.receiver:
+            return False
+        self.receiver.stop_listening()
+        self.receiver = None
+        return True
+
+    def cmd_switch_output(self, device_name=None):
+        if self.receiver:
+            self.receiver.switch_output(device_name)
+
+    def cmd_set_gain(self, source, gain):
+        if self.receiver:
+            self.receiver.set_gain(source, gain)
+
+    def cmd_shutdown(self):
+        self.running = False
+
+    def _sender_status(self, sender):
+        ring = sender.ring
+        level = 0.0
+        if ring and ring.head:
+            level = _peak(ring.frames[(ring.head - 1) % ring.capacity])
+        return {"streaming": sender.streaming, "dest_ip": sender.dest_ip, "ping_ms": sender.ping_ms,
+                "format": [sender.rate, sender.channels, sender.codec.name], "level": level,
+                "stats": sender.snapshot()}
+
+    def _receiver_status(self, receiver):
+        with receiver.cond:
+            sources = [{"name": s.name, "stream": s.stream, "gain": s.gain, "format": s.stream_format}
+                       for s in receiver.sources.values()]
+        return {"listening": receiver.listening, "output": receiver.output_format,
+                "level": _peak(receiver.last_block), "sources": sources,
+                "stats": receiver.snapshot()}
+
+    def _status_thread(self):
+        """Durumu `STATUS_INTERVAL`'da bir paylaşılan belleğe yazar."""
+        while self.running:
+            with self.lock:
+                sender, receiver = self.sender, self.receiver
+            status = {"time": time.monotonic(), "sender": None, "receiver": None}
+            try:
+                if sender:
+                    status["sender"] = self._sender_status(sender)
+                if receiver:
+                    status["receiver"] = self._receiver_status(receiver)
+                self.status.write(status)
+            except Exception as e:
+                print(f"Motor durumu yazılamadı: {e}")
+            time.sleep(STATUS_INTERVAL)
+
+def _worker_main(conn, status_name):
+    EngineWorker(conn, status_name).run()
+
+class Engine:
+    """
+    Arayüz tarafı: motor sürecini başlatır, komut gönderir ve durumu okur.
+    Komutlar sırayla yürütülür; yanıtı beklenir (en fazla `COMMAND_TIMEOUT`).
+    Başlatma ve durdurma komutları bir şey değiştiyse True döndürür; durum
+    bloğu gecikmeli olabileceğinden karar için onlar kullanılır.
+    """
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.status_block = None
+        self.lock = threading.Lock()
+        self._last_status = None
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Motor sürecini başlatır."""
+        if self.alive:
+            return True
+        import multiprocessing
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child = ctx.Pipe()
+        self.status_block = StatusBlock()
+        self.process = ctx.Process(target=_worker_main, args=(child, self.status_block.name),
+                                   name="yakamoz-engine", daemon=True)
+        try:
+            self.process.start()
+        except Exception as e:
+            print(f"💥  Ses motoru başlatılamadı: {e}")
+            self._cleanup()
+            return False
+        child.close()
+        print(f"⚙️  Ses motoru başladı (süreç {self.process.pid})")
+        return True
+
+    def call(self, command, **kwargs):
+        """Bir komutu motorda yürütür ve sonucunu döndürür; hata olursa yazdırıp None döndürür."""
+        if not self.alive and not self.start():
+            return None
+        with self.lock:
+            try:
+                self.conn.send((command, kwargs))
+                if not self.conn.poll(COMMAND_TIMEOUT):
+                    print(f"‼️ Ses motoru '{command}' komutuna yanıt vermedi.")
+                    return None
+                ok, result = self.conn.recv()
+            except (EOFError, OSError) as e:
+                print(f"‼️ Ses motoruna ulaşılamadı: {e}")
+                return None
+        if not ok:
+            print(f"‼️ {command}: {result}")
+            return None
+        return result
+
+    def start_sender(self, dest_ip, device=None, **kwargs):
+        return bool(self.call("start_sender", dest_ip=dest_ip, device=device, **kwargs))
+
+    def stop_sender(self):
+        return bool(self.call("stop_sender"))
+
+    def start_receiver(self, **kwargs):
+        return bool(self.call("start_receiver", **kwargs))
+
+    def stop_receiver(self):
+        return bool(self.call("stop_receiver"))
+
+    def switch_output(self, device_name=None):
+        self.call("switch_output", device_name=device_name)
+
+    def set_gain(self, source, gain):
+        self.call("set_gain", source=source, gain=gain)
+
+    def status(self):
+        """
+        Motorun son durumunu döndürür: {"time", "sender", "receiver"}; çalışmayan
+        taraf None'dır. Hiç beklemez; yazma sürüyorsa bir önceki durum döner.
+        """
+        if not self.status_block:
+            return None
+        status = self.status_block.read()
+        if status is not None:
+            self._last_status = status
+        return self._last_status
+
+    def sender_status(self):
+        status = self.status()
+        return status["sender"] if status else None
+
+    def receiver_status(self):
+        status = self.status()
+        return status["receiver"] if status else None
+
+    def stop(self):
+        """Motoru kapatır (gönderici ve alıcı durdurulur)."""
+        if self.alive:
+            self.call("shutdown")
+            self.process.join(timeout=3)
+            if self.process.is_alive():
+                print("‼️ Ses motoru kapanmadı, sonlandırılıyor.")
+                self.process.terminate()
+                self.process.join(timeout=1)
+        self._cleanup()
+
+    def _cleanup(self):
+        if self.conn:
+            self.conn.close()
+        if self.status_block:
+            self.status_block.close()
+        self.conn = None
+        self.status_block = None
+        self.process = None
+        self._last_status = None
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+XOR eşlik paketleriyle ileri hata düzeltme (FEC).
+
+Gönderici her N ses paketi için, bu paketlerin yüklerinin XOR'unu taşıyan bir
+eşlik paketi gönderir. Alıcı bir gruptaki tek bir kayıp paketi, geri kalanları
+ve eşlik paketini XOR'layarak çalınmadan önce yeniden oluşturur. Araya ekleme
+(interleave) derinliği D > 1 seçilirse ardışık paketler farklı gruplara düşer;
+böylece D pakete kadar uzunluktaki kayıp patlamaları da kurtarılabilir.
+
+Eşlik paketinin yükü: gruptaki her paket için (sıra no, çerçeve sayısı, yük
+uzunluğu) girdileri ve ardından en uzun yük boyunda XOR baytları.
+"""
+
+import collections
+import struct
+import numpy as np
+from core import packet
+
+ENTRY = struct.Struct("!HBH")  # sıra no, çerçeve sayısı, yük uzunluğu
+HISTORY = 512                  # Alıcıda saklanan en fazla veri paketi
+MAX_PENDING = 64               # Eksikleri tamamlanmayı bekleyen en fazla grup
+PENDING_AGE = 256              # Bu kadar çerçeve geride kalan grup kurtarılamaz sayılır
+
+class FecEncoder:
+    """Gönderilen paketlerden XOR eşlik paketleri üretir (gönderici tarafı)."""
+    def __init__(self, group=4, interleave=1):
+        if group < 2:
+            raise ValueError("FEC grubu en az 2 paket olmalı")
+        self.group = group
+        self.interleave = max(1, interleave)
+        self._index = 0
+        self._acc = [np.zeros(packet.MAX_PACKET, dtype=np.uint8) for _ in range(self.interleave)]
+        self._entries = [[] for _ in range(self.interleave)]
+        self._width = [0] * self.interleave
+
+    def add(self, seq, count, payload):
+        """
+        Gönderilen bir veri paketini grubuna ekler. Grup tamamlandıysa
+        (ilk sıra no, grup boyu, eşlik yükü) döndürür, aksi halde None.
+        """
+        g = self._index % self.interleave
+        self._index += 1
+        data = np.frombuffer(payload, dtype=np.uint8)
+        acc = self._acc[g]
+        acc[:len(data)] ^= data
+        self._entries[g].append((seq, count, len(data)))
+        self._width[g] = max(self._width[g], len(data))
+
+        entries = self._entries[g]
+        if len(entries) < self.group:
+            return None
+        width = self._width[g]
+        body = b"".join(ENTRY.pack(*e) for e in entries) + acc[:width].tobytes()
+        acc[:width] = 0
+        self._entries[g] = []
+        self._width[g] = 0
+        return entries[0][0], len(entries), body
+
+class FecDecoder:
+    """
+    Alınan veri paketlerini kısa süre saklar ve eşlik paketleri yardımıyla tek
+    kayıplı grupları yeniden oluşturur (alıcı tarafı).
+    """
+    def __init__(self):
+        self.packets = collections.OrderedDict()  # sıra no -> (çerçeve sayısı, yük)
+        self.pending = []                          # [(girdiler, xor baytları)]
+        self.recovered = 0
+        self.unrecoverable = 0
+        self.span = 0  # Bir grubun kapsadığı en uzun çerçeve aralığı
+
+    def _remember(self, seq, count, payload):
+        self.packets[seq] = (count, payload)
+        self.packets.move_to_end(seq)
+        while len(self.packets) > HISTORY:
+            self.packets.popitem(last=False)
+
+    def _missing(self, entries):
+        return [e for e in entries if e[0] not in self.packets]
+
+    def _rebuild(self, entries, xor, missing):
+        """Tek eksik paketi diğerleri ve eşlik baytlarıyla yeniden oluşturur."""
+        acc = np.frombuffer(xor, dtype=np.uint8).copy()
+        for seq, count, length in entries:
+            if seq == missing[0]:
+                continue
+            data = np.frombuffer(self.packets[seq][1], dtype=np.uint8)
+            acc[:len(data)] ^= data
+        seq, count, length = missing
+        payload = acc[:length].tobytes()
+        self._remember(seq, count, payload)
+        self.recovered += 1
+        return seq, count, payload
+
+    def add_packet(self, seq, count, payload):
+        """
+        Bir veri paketini kaydeder. Bu paket bekleyen bir grubu tek eksiğe
+        indirdiyse kurtarılan paketleri [(seq, count, payload)] olarak döndürür.
+        """
+        self._remember(seq, count, payload)
+        recovered = []
+        still = []
+        for entries, xor in self.pending:
+            if not any(e[0] == seq for e in entries):
+                age = (seq - entries[-1][0]) & 0xFFFF
+                if PENDING_AGE < age < 0x8000:
+                    self.unrecoverable += len(self._missing(entries))
+                else:
+                    still.append((entries, xor))
+                continue
+            missing = self._missing(entries)
+            if len(missing) == 1:
+                recovered.append(self._rebuild(entries, xor, missing[0]))
+            elif missing:
+                still.append((entries, xor))
+        self.pending = still
+        return recovered
+
+    def add_parity(self, body, group):
+        """Bir eşlik paketini işler; kurtarılabilen paketleri döndürür."""
+        n = ENTRY.size * group
+        entries = [ENTRY.unpack_from(body, i * ENTRY.size) for i in range(group)]
+        xor = bytes(body[n:])
+        self.span = max(self.span, ((entries[-1][0] - entries[0][0]) & 0xFFFF) + entries[-1][1])
+        missing = self._missing(entries)
+        if not missing:
+            return []
+        if len(missing) == 1:
+            return [self._rebuild(entries, xor, missing[0])]
+
+        # Birden fazla eksik: geç gelen paketlerle tamamlanabilir, bekle.
+        self.pending.append((entries, xor))
+        while len(self.pending) > MAX_PENDING:
+            old_entries, _ = self.pending.pop(0)
+            self.unrecoverable += len(self._missing(old_entries))
+        return []
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+RTCP alıcı raporuna benzer geri bildirim ve göndericinin uyarlamalı denetleyicisi.
+
+Alıcı her `REPORT_INTERVAL` saniyede bir kontrol portu üzerinden, son aralıkta
+ağdaki kayıp oranını, titreşimi, tampon derinliğini, boşalma / gizleme /
+geç kalma sayılarını ve aralıktaki çerçeve sayısını taşıyan kısa bir rapor
+gönderir. Boşalma ve gizlemeler de kayıp gibi bu çerçeve sayısına oranla
+değerlendirilir; tek bir olay (ör. açılıştaki boşalma) raporu kötü yapmaz.
+
+Gönderici raporlara göre bir "merdiven" üzerinde ilerler. Merdivenin her
+basamağı bir (paket başına çerçeve, kodek, FEC grubu) üçlüsüdür; ilk basamak
+en düşük gecikme, son basamak en dayanıklı ayardır. Kötü bir rapor bir basamak
+aşağı indirir (daha çok yedeklilik, daha az bit hızı, daha az paket), art arda
+`CLEAN_REPORTS` temiz rapor bir basamak geri çıkarır. Çerçeve boyu (dolayısıyla
+alıcıdaki akış biçimi) değişmez; alıcının jitter tamponu yeniden kurulmaz.
+"""
+
+import struct
+from core import codecs, packet
+
+REPORT_PREFIX = b"RPRT"
+# önek, kayıp oranı (1/255), titreşim, tampon derinliği, hedef derinlik (0.1 ms),
+# aralıktaki boşalma, gizlenen, geç kalan ve beklenen çerçeve sayıları
+REPORT = struct.Struct("!4sBHHHHHHH")
+REPORT_INTERVAL = 1.0    # Saniye
+LOSS_HIGH = 0.02         # Bu orandan fazla kayıp (veya gizleme + boşalma): kötü rapor
+LOSS_LOW = 0.005         # Bu orandan az kayıp ve gizleme + boşalma: temiz rapor
+CLEAN_REPORTS = 5        # Bir basamak geri çıkmak için gereken ardışık temiz rapor
+HOLD_REPORTS = 1         # Değişiklikten sonra yok sayılan rapor (eski ayarın etkisi)
+MAX_PACKET_MS = 40       # Merdivendeki en uzun paket süresi
+FALLBACK_CODEC = "mulaw"
+FEC_LEVELS = (8, 4, 2)   # Sırayla artan yedeklilik
+
+def _u16(value):
+    return max(0, min(0xFFFF, int(value)))
+
+class Report:
+    """Çözülmüş bir alıcı raporu."""
+    def __init__(self, loss=0.0, jitter_ms=0.0, depth_ms=0.0, target_ms=0.0,
+                 underruns=0, concealed=0, late=0, frames=0):
+        self.loss = loss
+        self.jitter_ms = jitter_ms
+        self.depth_ms = depth_ms
+        self.target_ms = target_ms
+        self.underruns = underruns
+        self.concealed = concealed
+        self.late = late
+        self.frames = frames  # Aralıkta beklenen (gönderilen) çerçeve sayısı
+
+    @property
+    def impaired(self):
+        """Gizlenen çerçeve ve boşalmaların aralıktaki çerçevelere oranı."""
+        return (self.underruns + self.concealed) / max(1, self.frames)
+
+    def pack(self):
+        return REPORT.pack(REPORT_PREFIX, max(0, min(255, round(self.loss * 255))),
+                           _u16(self.jitter_ms * 10), _u16(self.depth_ms * 10),
+                           _u16(self.target_ms * 10), _u16(self.underruns),
+                           _u16(self.concealed), _u16(self.late), _u16(self.frames))
+
+    @classmethod
+    def parse(cls, data):
+        """Raporu çözer; biçim tutmazsa None döndürür."""
+        if len(data) != REPORT.size:
+            return None
+        _, loss, jitter, depth, target, underruns, concealed, late, frames = REPORT.unpack(data)
+        return cls(loss / 255, jitter / 10, depth / 10, target / 10, underruns, concealed, late,
+                   frames)
+
+    @classmethod
+    def worst(cls, reports):
+        """
+        Birden çok alıcının raporlarından her alanın en kötüsünü birleştirir
+        (çerçeve sayısı için en azını: oranlar küçümsenmez).
+        """
+        worst = cls(*(max(getattr(r, name) for r in reports)
+                      for name in ("loss", "jitter_ms", "depth_ms", "target_ms",
+                                   "underruns", "concealed", "late")))
+        worst.frames = min(r.frames for r in reports)
+        return worst
+
+    def is_bad(self):
+        return self.loss >= LOSS_HIGH or self.impaired >= LOSS_HIGH
+
+    def is_clean(self):
+        return self.loss <= LOSS_LOW and self.impaired <= LOSS_LOW
+
+class FeedbackReporter:
+    """
+    Alıcı tarafı: aralık başına raporu jitter tamponunun sayaçlarından üretir.
+    `fresh`, ilk kez gönderilmiş (yeniden gönderim olmayan) gelen çerçeve sayısıdır;
+    alıcı her veri paketinde artırır.
+    """
+    def __init__(self):
+        self.fresh = 0
+        self.sent = 0
+        self._jitter = None
+        self._base = None
+
+    def _counters(self, jitter):
+        return (jitter.highest, self.fresh, jitter.underruns, jitter.concealed, jitter.late)
+
+    def build(self, jitter):
+        """Son rapordan bu yana olanların raporunu döndürür; ölçüm yoksa None (kilit tutulurken)."""
+        if jitter is None or jitter.highest is None:
+            self._jitter = None
+            return None
+        now = self._counters(jitter)
+        base, self._base = self._base, now
+        if jitter is not self._jitter or base[0] is None:
+            # Yeni akış biçimi veya sıfırlanmış tampon: ölçüme buradan başla
+            self._jitter = jitter
+            return None
+        expected = now[0] - base[0]
+        fresh = now[1] - base[1]
+        loss = 1.0 - fresh / expected if expected > 0 else 0.0
+        frame_ms = jitter.frame_s * 1000
+        self.sent += 1
+        return Report(loss=max(0.0, min(1.0, loss)), jitter_ms=jitter.jitter * 1000,
+                      depth_ms=jitter.depth * frame_ms, target_ms=jitter.target * frame_ms,
+                      underruns=now[2] - base[2], concealed=now[3] - base[3], late=now[4] - base[4],
+                      frames=max(0, expected))
+
+def build_ladder(rate, frame_ms, channels, frames_per_packet, codec, mtu=packet.DEFAULT_MTU,
+                 max_packet_ms=MAX_PACKET_MS, fallback_codec=FALLBACK_CODEC, fec_levels=FEC_LEVELS):
+    """
+    Başlangıç ayarından en dayanıklı ayara giden basamakları döndürür:
+    önce FEC eklenir, sonra daha ucuz kodeğe geçilir, sonra (MTU'ya sığdıkça)
+    paketler büyütülür ve en sonda yedeklilik en üst düzeye çıkarılır.
+    """
+    samples = packet.frame_samples(rate, frame_ms)
+
+    def fit(count, name):
+        codec = codecs.get_codec(name)
+        return packet.frames_per_packet(samples, channels, count, mtu, codec.sample_bytes,
+                                        codec.overhead)
+
+    ladder = []
+
+    def add(count, name, fec):
+        step = (fit(count, name), name, fec)
+        if step not in ladder:
+            ladder.append(step)
+
+    count = fit(frames_per_packet, codec)
+    add(count, codec, 0)
+    for fec in fec_levels[:-1]:
+        add(count, codec, fec)
+    fec = fec_levels[-2] if len(fec_levels) > 1 else fec_levels[-1]
+    name = fallback_codec or codec
+    add(count, name, fec)
+    while (count * 2) * frame_ms <= max_packet_ms and fit(count * 2, name) > count:
+        count = fit(count * 2, name)
+        add(count, name, fec)
+    add(count, name, fec_levels[-1])
+    return ladder
+
+class AdaptiveController:
+    """
+    Göndericinin merdiven üzerindeki konumunu raporlara göre yönetir:
+    kötüleşmede hemen iner, iyileşmede yavaş çıkar (histerezis).
+    """
+    def __init__(self, ladder):
+        if not ladder:
+            raise ValueError("Uyarlama merdiveni boş olamaz")
+        self.ladder = list(ladder)
+        self.level = 0
+        self.changes = 0
+        self._clean = 0
+        self._hold = 0
+
+    @property
+    def step(self):
+        return self.ladder[self.level]
+
+    def update(self, report):
+        """Bir (birleştirilmiş) raporu işler; basamak değiştiyse yeni basamağı, yoksa None döndürür."""
+        if self._hold:
+            self._hold -= 1
+            return None
+        if report.is_bad():
+            self._clean = 0
+            if self.level + 1 < len(self.ladder):
+                return self._move(self.level + 1)
+        elif report.is_clean():
+            self._clean += 1
+            if self._clean >= CLEAN_REPORTS and self.level > 0:
+                return self._move(self.level - 1)
+        else:
+            self._clean = 0
+        return None
+
+    def _move(self, level):
+        self.level = level
+        self.changes += 1
+        self._clean = 0
+        self._hold = HOLD_REPORTS
+        return self.ladder[level]
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ağ bozulması benzetimi yapan kullanıcı alanı UDP aktarıcısı.
+
+Gönderici ile alıcı arasına girer ve hem ses hem kontrol portunu aktarır:
+
+    AudioSender ──▶ [listen_port, listen_port+1] ──▶ AudioReceiver [port, port+1]
+                ◀──                               ◀──  (pong, NACK)
+
+Birden çok gönderici aynı aktarıcıyı kullanabilir: her gönderici adresi
+(ve kanal) için alıcıya giden ayrı bir soket açılır, böylece alıcının
+yanıtları doğru göndericiye döner.
+
+Her yön için ayrı ayarlanabilen bağlantı modeli: gecikme dağılımı ve
+titreşim, Gilbert-Elliott patlama kaybı, çoğaltma, sıra bozma ve bant
+genişliği sınırı (kuyruk taşarsa düşürme). Rastgelelik tohumludur; aynı
+tohum ve aynı paket sırası aynı kararları üretir. Her paket için yapılan
+işlem (ses paketlerinde sıra numarasıyla birlikte) JSON satırları olarak
+günlüğe yazılabilir; alıcının davranışı bu gerçek kayda göre puanlanabilir.
+
+`tc netem` gibi yönetici yetkisi gerektirmez.
+"""
+
+import heapq
+import itertools
+import json
+import random
+import selectors
+import socket
+import threading
+import time
+from collections import OrderedDict
+from core import packet
+
+POLL_TIMEOUT = 0.2
+MAX_DATAGRAM = 65536
+MAX_CLIENTS = 64       # Kanal başına en fazla gönderici adresi; dolunca en eskisi kapatılır
+DISTRIBUTIONS = ("constant", "uniform", "normal", "exponential")
+
+class LinkProfile:
+    """
+    Bir yönün bozulma ayarları.
+
+    delay_ms / jitter_ms: taban gecikme ve titreşim; `distribution` titreşimin
+        dağılımı (uniform: ±jitter, normal: σ=jitter, exponential: ortalama jitter).
+    loss: iyi durumdaki kayıp olasılığı (Gilbert-Elliott kapalıyken düz kayıp).
+    ge_p / ge_r: iyi→kötü ve kötü→iyi geçiş olasılıkları (ge_p=0: patlama yok).
+    ge_loss: kötü durumdaki kayıp olasılığı.
+    duplicate: paketin bir kopyasının daha gönderilme olasılığı.
+    reorder / reorder_ms: paketin fazladan gecikmeyle sonrakilerin arkasına düşme olasılığı.
+    rate_kbps / queue_ms: bant genişliği sınırı (0: sınırsız) ve kuyruk sınırı.
+    """
+    def __init__(self, delay_ms=0.0, jitter_ms=0.0, distribution="uniform", loss=0.0,
+                 ge_p=0.0, ge_r=1.0, ge_loss=1.0, duplicate=0.0, reorder=0.0, reorder_ms=20.0,
+                 rate_kbps=0.0, queue_ms=200.0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Bilinmeyen dağılım: {distribution} (desteklenenler: {DISTRIBUTIONS})")
+        for name, p in (("loss", loss), ("ge_p", ge_p), ("ge_r", ge_r), ("ge_loss", ge_loss),
+                        ("duplicate", duplicate), ("reorder", reorder)):
+            if not 0.0 <= p <= 1.0:
+                raise ValueError(f"{name} 0 ile 1 arasında olmalı: {p}")
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.loss = loss
+        self.ge_p = ge_p
+        self.ge_r = ge_r
+        self.ge_loss = ge_loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.reorder_ms = reorder_ms
+        self.rate_kbps = rate_kbps
+        self.queue_ms = queue_ms
+
+    def to_dict(self):
+        return dict(vars(self))
+
+class Link:
+    """Bir yöndeki bağlantının durumu (kayıp durumu, kuyruk) ve kararları."""
+    def __init__(self, profile, seed=0):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.bad = False       # Gilbert-Elliott durumu
+        self.link_free = 0.0   # Bant sınırında hattın boşalacağı an
+
+    def _delay(self):
+        p = self.profile
+        j = p.jitter_ms
+        if p.distribution == "uniform":
+            extra = self.rng.uniform(-j, j)
+        elif p.distribution == "normal":
+            extra = self.rng.gauss(0.0, j)
+        elif p.distribution == "exponential":
+            extra = self.rng.expovariate(1.0 / j) if j > 0 else 0.0
+        else:
+            extra = 0.0
+        return max(0.0, p.delay_ms + extra) / 1000
+
+    def process(self, now, size):
+        """
+        Bir paket için kararı verir. (teslim anları listesi, işlem) döndürür;
+        işlem "forward", "loss" veya "queue_drop" olur. Liste çoğaltmada iki,
+        düşürmede sıfır elemanlıdır. Her teslim (an, sıra bozuldu mu) ikilisidir.
+        """
+        p = self.profile
+        rng = self.rng
+        if p.ge_p > 0:
+            if self.bad:
+                if rng.random() < p.ge_r:
+                    self.bad = False
+            elif rng.random() < p.ge_p:
+                self.bad = True
+        if rng.random() < (p.ge_loss if self.bad else p.loss):
+            return [], "loss"
+
+        depart = now
+        if p.rate_kbps > 0:
+            start = max(now, self.link_free)
+            if start - now > p.queue_ms / 1000:
+                return [], "queue_drop"
+            self.link_free = start + size * 8 / (p.rate_kbps * 1000)
+            depart = self.link_free
+
+        copies = 2 if p.duplicate and rng.random() < p.duplicate else 1
+        deliveries = []
+        for _ in range(copies):
+            due = depart + self._delay()
+            reordered = bool(p.reorder) and rng.random() < p.reorder
+            if reordered:
+                due += p.reorder_ms / 1000
+            deliveries.append((due, reordered))
+        return deliveries, "forward"
+
+class ImpairmentProxy:
+    """
+    Ses ve kontrol portlarını bozarak aktaran UDP aktarıcısı. `listen_port`
+    (ses) ve `listen_port + 1` (kontrol) gönderici tarafına açılır; paketler
+    `target_host`'un `target_port` / `target_port + 1` portlarına iletilir.
+    Her gönderici adresinin alıcıya giden kendi soketi vardır; alıcının bu
+    sokete gelen yanıtları o göndericiye geri döner.
+    """
+    def __init__(self, listen_port, target_host, target_port, profile=None, return_profile=None,
+                 seed=0, log_path=None, bind="0.0.0.0"):
+        self.listen_port = listen_port
+        self.target = target_host
+        self.target_port = target_port
+        self.profile = profile or LinkProfile()
+        self.return_profile = return_profile or self.profile
+        self.seed = seed
+        self.log_path = log_path
+        self.bind = bind
+        self.running = False
+        self.thread = None
+        self.counters = {}   # (yön, kanal, işlem) -> paket sayısı
+        self._log = None
+        self._sel = None
+
+    def _open(self):
+        self.links = {"up": Link(self.profile, self.seed), "down": Link(self.return_profile, self.seed + 1)}
+        self.clients = OrderedDict()  # (kanal, gönderici adresi) -> alıcıya giden soket
+        self.sockets = []
+        self.routes = {}
+        for channel, offset in (("audio", 0), ("control", 1)):
+            front = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            front.bind((self.bind, self.listen_port + offset))
+            front.setblocking(False)
+            self.sockets.append(front)
+            self.routes[front] = ("up", channel, None, (self.target, self.target_port + offset))
+
+    def _client(self, channel, addr, front):
+        """Göndericinin alıcıya giden soketini döndürür (ilk pakette açılır)."""
+        key = (channel, addr)
+        back = self.clients.get(key)
+        if back is not None:
+            self.clients.move_to_end(key)
+            return back
+        if sum(1 for c, _ in self.clients if c == channel) >= MAX_CLIENTS:
+            old = next(k for k in self.clients if k[0] == channel)
+            self._close_client(old)
+        back = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        back.bind(("0.0.0.0", 0))
+        back.setblocking(False)
+        self.clients[key] = back
+        self.sockets.append(back)
+        self.routes[back] = ("down", channel, front, addr)
+        if self._sel:
+            self._sel.register(back, selectors.EVENT_READ)
+        return back
+
+    def _close_client(self, key):
+        back = self.clients.pop(key)
+        del self.routes[back]
+        self.sockets.remove(back)
+        if self._sel:
+            self._sel.unregister(back)
+        back.close()
+
+    def _record(self, now, direction, channel, index, data, action, deliveries):
+        key = (direction, channel, action)
+        self.counters[key] = self.counters.get(key, 0) + 1
+        if len(deliveries) > 1:
+            key = (direction, channel, "duplicate")
+            self.counters[key] = self.counters.get(key, 0) + 1
+        if not self._log:
+            return
+        event = {"t": round(now - self._t0, 6), "dir": direction, "ch": channel, "n": index,
+                 "size": len(data), "action": action}
+        if channel == "audio":
+            hdr = packet.parse_header(data, len(data))
+            if hdr:
+                event["seq"], event["flags"], _, _, event["count"] = hdr[:5]
+        if deliveries:
+            event["delay_ms"] = [round((due - now) * 1000, 3) for due, _ in deliveries]
+            if any(reordered for _, reordered in deliveries):
+                event["reordered"] = True
+        self._log.write(json.dumps(event) + "\n")
+
+    def _receive(self, sock, now, heap, counter, index):
+        direction, channel, out, dest = self.routes[sock]
+        while True:
+            try:
+                data, addr = sock.recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # Karşı taraf kapalıyken gelen ICMP hataları
+                continue
+            if direction == "up":
+                out = self._client(channel, addr, sock)
+            n = index[direction] = index[direction] + 1
+            deliveries, action = self.links[direction].process(now, len(data))
+            self._record(now, direction, channel, n, data, action, deliveries)
+            for due, _ in deliveries:
+                heapq.heappush(heap, (due, next(counter), out, data, dest))
+
+    def _run(self):
+        sel = self._sel = selectors.DefaultSelector()
+        for s in self.sockets:
+            sel.register(s, selectors.EVENT_READ)
+        heap = []
+        counter = itertools.count()
+        index = {"up": 0, "down": 0}
+        try:
+            while self.running:
+                timeout = POLL_TIMEOUT
+                if heap:
+                    timeout = min(timeout, max(0.0, heap[0][0] - time.monotonic()))
+                events = sel.select(timeout)
+                now = time.monotonic()
+                for key, _ in events:
+                    if key.fileobj in self.routes:  # Bu turda kapatılmış olabilir
+                        self._receive(key.fileobj, now, heap, counter, index)
+                now = time.monotonic()
+                while heap and heap[0][0] <= now:
+                    _, _, out, data, dest = heapq.heappop(heap)
+                    try:
+                        out.sendto(data, dest)
+                    except OSError:
+                        pass
+        except Exception as e:
+            if self.running:
+                print(f"Aktarıcı hatası: {e}")
+        finally:
+            self._sel = None
+            sel.close()
+
+    def start(self):
+        """Aktarıcıyı başlatır."""
+        if self.running:
+            return False
+        try:
+            self._open()
+        except OSError as e:
+            print(f"‼️ Port {self.listen_port} veya {self.listen_port + 1} açılamadı: {e}")
+            for s in getattr(self, "sockets", []):
+                s.close()
+            return False
+        self._t0 = time.monotonic()
+        if self.log_path:
+            self._log = open(self.log_path, "w", encoding="utf-8")
+            self._log.write(json.dumps({"profile": self.profile.to_dict(),
+                                        "return_profile": self.return_profile.to_dict(),
+                                        "seed": self.seed}) + "\n")
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print(f"🌩️  Bozucu aktarıcı: :{self.listen_port}/{self.listen_port + 1} → "
+              f"{self.target}:{self.target_port}/{self.target_port + 1}")
+        return True
+
+    def stop(self):
+        """Aktarıcıyı durdurur ve günlüğü kapatır."""
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        for s in self.sockets:
+            s.close()
+        if self._log:
+            self._log.close()
+            self._log = None
+        self.thread = None
+
+    def summary(self):
+        """Yön/kanal/işlem başına paket sayılarını {"up/audio/loss": n} biçiminde döndürür."""
+        return {"/".join(key): n for key, n in sorted(self.counters.items())}
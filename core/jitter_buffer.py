@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sıra numarasına göre çalışan, kayıpları gizleyen ve hedef derinliğini
+ağ titreşimine göre uyarlayan jitter tamponu.
+"""
+
+import numpy as np
+
+SEQ_MASK = 0xFFFF          # 16 bit sıra numarası
+SEQ_HALF = 0x8000
+JITTER_GAIN = 1 / 16       # RFC 3550 titreşim filtresi katsayısı
+JITTER_MARGIN = 3.0        # Hedef derinliğe eklenen titreşim payı (jitter'ın katı)
+CONCEAL_DECAY = 0.5        # Ardışık her gizlemede kazanç bu oranda azalır
+MAX_CONCEAL = 4            # Bu kadar ardışık kayıptan sonra sessizlik üretilir
+SHRINK_SLACK = 2           # Hedefin bu kadar üstündeki derinlik "fazla" sayılır
+SHRINK_AFTER = 50          # Fazla derinlik bu kadar çekim sürerse bir çerçeve atlanır
+GROW_AFTER = 10            # Eksik derinlik bu kadar çekim sürerse son çerçeve tekrarlanır
+RESYNC_AFTER = 3           # Pencerenin çok gerisinde kalan ardışık paket sayısı
+PCM_SCALE = 1 / 32767
+
+class JitterBuffer:
+    """
+    Paketleri 16 bit sıra numarasına göre (sarmayı da hesaba katarak) dizer.
+    Geç gelen paketleri yerine koyar, eksik çerçeveleri son çerçeveyi
+    sönümleyerek tekrarlayıp gizler. Hedef derinlik, ölçülen varışlar arası
+    titreşime göre `min_depth` ile `max_depth` arasında uyarlanır.
+
+    Tüm bellek baştan ayrılır: gelen int16 PCM sabit boyutlu bir halka
+    tamponun yuvalarına kopyalanır, `pop()` ise yuvayı her seferinde aynı
+    float32 çıkış dizisine dönüştürüp döndürür.
+    """
+    def __init__(self, rate=48000, frames=480, channels=2, min_depth=1, max_depth=50):
+        self.rate = rate
+        self.frames = frames
+        self.channels = channels
+        self.frame_s = frames / rate
+        self.min_depth = max(1, min_depth)
+        self.max_depth = max(self.min_depth + 1, max_depth)
+        self.capacity = self.max_depth
+
+        # Önceden ayrılmış halka tampon ve yardımcı diziler
+        self.slots = np.zeros((self.capacity, frames, channels), dtype=np.int16)
+        self._slot_views = list(self.slots)
+        self._slot_rev = [view[::-1] for view in self._slot_views]
+        self.out = np.zeros((frames, channels), dtype=np.float32)
+        self._last = np.zeros((frames, channels), dtype=np.int16)
+        self._scale = np.array(PCM_SCALE, dtype=np.float32)
+        self._last_rev = self._last[::-1]
+        self._ramp_base = np.linspace(0.0, 1.0, frames, dtype=np.float32)
+        self._gain = np.empty(frames, dtype=np.float32)
+        self._gain_col = self._gain.reshape(-1, 1)
+
+        # Sayaçlar
+        self.received = 0
+        self.late = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.concealed = 0
+        self.underruns = 0
+        self.dropped = 0
+        self.inserted = 0
+        self.gaps = 0
+        self.overruns = 0
+        # Tamponun kendi kararıyla derinliğe eklediği net çerçeve sayısı: tekrarlanan
+        # (+1), atlanan (-1) ve dolum sırasında biriken çerçeveler. Saat kayması
+        # telafisi bunları kaymadan ayırmak için kullanır.
+        self.shifted = 0
+
+        # Titreşim tahmini (saniye) ve ona göre hesaplanan hedef derinlik
+        self.jitter = 0.0
+        self.target = self.min_depth
+        self.reset()
+
+    def reset(self):
+        """Tamponu boşaltır; sayaçlar ve titreşim tahmini korunur."""
+        self.slot_seq = [-1] * self.capacity
+        self.slot_arrival = [0.0] * self.capacity
+        self.slot_capture = [None] * self.capacity
+        self.played_arrival = None  # Son pop() ile dönen çerçevenin varış zamanı (gizlemede None)
+        self.played_capture = None  # ... ve yerel saate çevrilmiş yakalama zamanı (bilinmiyorsa None)
+        self.next_seq = None   # Sıradaki çalınacak (genişletilmiş) sıra numarası
+        self.highest = None    # Alınan en yüksek (genişletilmiş) sıra numarası
+        self.buffering = True
+        self.has_last = False
+        self._last_idx = -1    # Son çalınan çerçeveyi hâlâ tutan yuva (-1: `_last` içinde)
+        self.gain = 1.0
+        self.conceal_run = 0
+        self._last_arrival = None
+        self._last_arrival_seq = None
+        self._over_target = 0
+        self._under_target = 0
+        self._insert = 0
+        self._stale_run = 0
+
+    def set_min_depth(self, depth):
+        """En küçük hedef derinliği değiştirir (ör. FEC grubunun tamamlanmasını beklemek için)."""
+        self.min_depth = max(1, min(depth, self.max_depth - 1))
+        self.target = max(self.target, self.min_depth)
+
+    @property
+    def depth(self):
+        """Çalınmayı bekleyen sıra aralığının uzunluğu (boşluklar dahil)."""
+        if self.next_seq is None:
+            return 0
+        return max(0, self.highest - self.next_seq + 1)
+
+    def head_ready(self):
+        """Sıradaki çalınacak çerçeve tamponda mı?"""
+        if self.next_seq is None:
+            return False
+        return self.slot_seq[self.next_seq % self.capacity] == self.next_seq
+
+    def missing(self):
+        """Çalınmayı bekleyen aralıkta henüz gelmemiş (genişletilmiş) sıra numaraları."""
+        if self.next_seq is None:
+            return []
+        slot_seq, capacity = self.slot_seq, self.capacity
+        return [ext for ext in range(self.next_seq, self.highest)
+                if slot_seq[ext % capacity] != ext]
+
+    def _unwrap(self, seq):
+        """16 bit sıra numarasını en yüksek alınan numaraya göre genişletir."""
+        diff = ((seq - self.highest + SEQ_HALF) & SEQ_MASK) - SEQ_HALF
+        return self.highest + diff
+
+    def _discard_until(self, new_next):
+        """`new_next` öncesindeki tüm çerçeveleri atar."""
+        for ext in range(self.next_seq, min(new_next, self.next_seq + self.capacity)):
+            idx = ext % self.capacity
+            if self.slot_seq[idx] == ext:
+                self.slot_seq[idx] = -1
+                self.dropped += 1
+        self.shifted -= new_next - self.next_seq
+        self.next_seq = new_next
+
+    def _update_jitter(self, ext, arrival):
+        """Varış zamanından RFC 3550 titreşimini ve hedef derinliği günceller."""
+        if self._last_arrival is not None:
+            transit = (arrival - self._last_arrival) - (ext - self._last_arrival_seq) * self.frame_s
+            if transit < 0:
+                transit = -transit
+            self.jitter += (transit - self.jitter) * JITTER_GAIN
+            target = self.min_depth + int(JITTER_MARGIN * self.jitter / self.frame_s + 0.5)
+            self.target = target if target < self.max_depth else self.max_depth - 1
+        self._last_arrival = arrival
+        self._last_arrival_seq = ext
+
+    def push(self, seq, pcm, arrival=None, capture=None):
+        """
+        Ağdan gelen (frames, channels) biçimli int16 PCM çerçevesini tampondaki
+        yuvasına kopyalar. `capture`, çerçevenin yerel saate çevrilmiş yakalama anıdır.
+        Çerçeve kabul edildiyse True, geç/tekrar olduğu için atıldıysa False döner.
+        """
+        self.received += 1
+        if self.highest is None:
+            self.highest = self.next_seq = seq
+        ext = self.highest + ((seq - self.highest + SEQ_HALF) & SEQ_MASK) - SEQ_HALF
+
+        if ext < self.next_seq:
+            # Pencerenin çok gerisindeki paketler büyük olasılıkla gönderici
+            # yeniden başladığı içindir; birkaç tane üst üste gelirse yeniden eşitle.
+            if self.next_seq - ext > self.capacity:
+                self._stale_run += 1
+                if self._stale_run >= RESYNC_AFTER:
+                    self.received -= 1
+                    self.reset()
+                    return self.push(seq, pcm, arrival, capture)
+            self.late += 1
+            return False
+        self._stale_run = 0
+
+        if ext - self.next_seq >= self.capacity - 1:
+            # Uzun bir patlama: en eskileri atıp hedef derinliğe geri dön.
+            self.overruns += 1
+            self._discard_until(ext - self.target + 1)
+
+        idx = ext % self.capacity
+        if self.slot_seq[idx] == ext:
+            self.duplicates += 1
+            return False
+        if idx == self._last_idx:
+            # Gizleme için gereken son çerçeve üzerine yazılmadan önce saklanır.
+            np.copyto(self._last, self._slot_views[idx])
+            self._last_idx = -1
+        np.copyto(self._slot_views[idx], pcm)
+        self.slot_seq[idx] = ext
+        self.slot_arrival[idx] = arrival
+        self.slot_capture[idx] = capture
+
+        if ext > self.highest:
+            self.gaps += ext - self.highest - 1
+            self.highest = ext
+            if arrival is not None:
+                self._update_jitter(ext, arrival)
+        elif ext < self.highest:
+            self.reordered += 1
+        return True
+
+    def _ramp(self, src, start, end):
+        """int16 `src`'ye `start`'tan `end`'e doğrusal kazanç uygulayıp çıkışa yazar."""
+        np.multiply(self._ramp_base, (end - start) * PCM_SCALE, out=self._gain)
+        np.add(self._gain, start * PCM_SCALE, out=self._gain)
+        np.multiply(src, self._gain_col, out=self.out)
+        return self.out
+
+    def _repeat_src(self, reverse=None):
+        """
+        Tekrarlanacak çerçeve: sırayla ters ve düz çalınır, böylece her ekleme
+        noktasında örnek değeri sürekli kalır ve tıklama oluşmaz.
+        """
+        if reverse is None:
+            reverse = self.conceal_run % 2 == 0
+        if self._last_idx >= 0:
+            fwd, rev = self._slot_views[self._last_idx], self._slot_rev[self._last_idx]
+        else:
+            fwd, rev = self._last, self._last_rev
+        return rev if reverse else fwd
+
+    def _conceal(self):
+        """Eksik bir çerçeve yerine son çerçeveyi sönümleyerek tekrarlar."""
+        self.concealed += 1
+        src = self._repeat_src()
+        self.conceal_run += 1
+        start = self.gain
+        end = start * CONCEAL_DECAY if self.conceal_run < MAX_CONCEAL else 0.0
+        self.gain = end
+        if not self.has_last or start == 0.0:
+            self.out.fill(0.0)
+            return self.out
+        return self._ramp(src, start, end)
+
+    def pop(self):
+        """
+        Sıradaki çerçeveyi döndürür. Tampon dolana kadar None döner; sıradaki
+        çerçeve kayıpsa gizleme çerçevesi, tampon tamamen boşaldıysa sessizliğe
+        inen bir geçiş çerçevesi üretir. Dönen dizi her çağrıda yeniden kullanılır.
+        """
+        next_seq = self.next_seq
+        self.played_arrival = self.played_capture = None
+        if next_seq is None:
+            return None
+
+        depth = self.highest - next_seq + 1
+        if self.buffering:
+            if depth < self.target:
+                return None
+            self.buffering = False
+            self.shifted += depth
+
+        if depth <= 0:
+            self.underruns += 1
+            self.buffering = True
+            if not self.has_last or self.gain == 0.0:
+                return None
+            frame = self._ramp(self._repeat_src(), self.gain, 0.0)
+            self.gain = 0.0
+            return frame
+
+        # Derinlik uzun süre hedefin üstünde kalırsa gecikmeyi azaltmak için bir
+        # çerçeve atla; altında kalırsa (ör. hedef yükseldiğinde) son çerçeveyi
+        # önce ters sonra düz çalarak tamponun dolmasına iki çerçevelik zaman tanı.
+        if depth > self.target + SHRINK_SLACK:
+            self._over_target += 1
+            if self._over_target >= SHRINK_AFTER:
+                self._over_target = 0
+                next_seq += 1
+                self._discard_until(next_seq)
+        elif depth < self.target and self.has_last and not self.conceal_run:
+            self._under_target += 1
+            if self._under_target >= GROW_AFTER:
+                self._under_target = 0
+                self._insert = 2
+        elif self._over_target or self._under_target:
+            self._over_target = self._under_target = 0
+
+        if self._insert:
+            self._insert -= 1
+            self.inserted += 1
+            self.shifted += 1
+            return self._ramp(self._repeat_src(reverse=self._insert == 1), self.gain, self.gain)
+
+        idx = next_seq % self.capacity
+        if self.slot_seq[idx] == next_seq:
+            self.slot_seq[idx] = -1
+            self.played_arrival = self.slot_arrival[idx]
+            self.played_capture = self.slot_capture[idx]
+            slot = self._slot_views[idx]
+            self._last_idx = idx
+            self.has_last = True
+            self.conceal_run = 0
+            if self.gain < 1.0:
+                frame = self._ramp(slot, self.gain, 1.0)
+                self.gain = 1.0
+            else:
+                frame = self.out
+                frame[...] = slot
+                np.multiply(frame, self._scale, out=frame)
+        else:
+            frame = self._conceal()
+        self.next_seq = next_seq + 1
+        return frame
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+Kanal eşleme (upmix / downmix) ve çok kaynaklı karıştırma.
+
+Akışın kanal sayısı çıkış aygıtınınkinden farklıysa alıcı her çerçeveyi bir
+(giriş kanalı, çıkış kanalı) kazanç matrisiyle çarpar; tek bir matris
+çarpımıdır ve önceden ayrılmış bir diziye yazılır. Kanal sırası WAV
+düzenidir (sol, sağ, orta, LFE, arka sol, arka sağ, ...).
+
+Birden çok gönderici aynı anda çalıyorsa (bkz. core.source) her çıkış
+bloğu, kaynakların çıkış biçimine çevrilmiş bloklarının kazançlarla
+ağırlıklı toplamıdır; bu da tek bir matris çarpımıdır. Toplam tam ölçeği
+aşarsa bir sınırlayıcı kazancı blok boyunca yumuşakça düşürür ve yavaşça
+geri bırakır, kalan aşım kırpılır.
+"""
+
+import numpy as np
+
+FOLD_GAIN = 0.5        # Stereo'ya indirgemede fazladan kanalların sol ve sağa eklenme kazancı
+LIMITER_RELEASE = 0.05 # Sınırlayıcı kazancının blok başına geri dönüş miktarı
+
+def channel_matrix(in_channels, out_channels):
+    """
+    Giriş kanallarından çıkış kanallarına kazanç matrisini döndürür:
+        mono → N       ön sol / sağ (N = 1 ise tek kanal)
+        N → mono       ortalama
+        stereo → N     ön sol / sağ, diğerleri sessiz
+        N → stereo     sol / sağ aynen, diğerleri FOLD_GAIN ile ikisine
+        diğerleri      ortak kanallar aynen
+    Bir çıkış kanalının kazanç toplamı 1'i aşıyorsa kırpılmasın diye ölçeklenir.
+    """
+    m = np.zeros((in_channels, out_channels), dtype=np.float32)
+    if out_channels == 1:
+        m[:, 0] = 1.0 / in_channels
+    elif in_channels == 1:
+        m[0, :2] = 1.0
+    else:
+        common = min(in_channels, out_channels)
+        m[np.arange(common), np.arange(common)] = 1.0
+        if out_channels == 2:
+            m[2:, :] = FOLD_GAIN
+    total = m.sum(axis=0)
+    m /= np.maximum(total, 1.0)
+    return m
+
+class ChannelMixer:
+    """
+    (n, giriş kanalı) float32 blokları çıkış kanal sayısına çevirir. Dönen
+    dizi her çağrıda yeniden kullanılır; en fazla `frames` örneklik bloklar içindir.
+    """
+    def __init__(self, in_channels, out_channels, frames):
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+        self.matrix = channel_matrix(in_channels, out_channels)
+        self.out = np.zeros((frames, out_channels), dtype=np.float32)
+
+    def process(self, block):
+        return np.matmul(block, self.matrix, out=self.out[:len(block)])
+
+class SourceMixer:
+    """
+    Kaynak bloklarını toplayan karıştırıcı. Kaynaklar bloklarını `stack[i]`
+    satırlarına, kazançlarını `gains[i]`'ye yazar; `mix(count)` ilk `count`
+    satırı toplar. Dönen dizi her çağrıda yeniden kullanılır.
+    """
+    def __init__(self, frames, channels, max_sources):
+        self.frames = frames
+        self.channels = channels
+        self.stack = np.zeros((max_sources, frames, channels), dtype=np.float32)
+        self.gains = np.zeros(max_sources, dtype=np.float32)
+        self.out = np.zeros((frames, channels), dtype=np.float32)
+        self.limit = 1.0        # Sınırlayıcının geçerli kazancı
+        self.limited = 0        # Sınırlayıcının devreye girdiği blok sayısı
+        self._flat = self.out.reshape(-1)
+        self._ramp_base = np.linspace(0.0, 1.0, frames, dtype=np.float32).reshape(-1, 1)
+        self._ramp = np.empty((frames, 1), dtype=np.float32)
+        self._one = np.array(1, dtype=np.float32)
+        self._minus_one = np.array(-1, dtype=np.float32)
+
+    def mix(self, count):
+        out = self.out
+        np.matmul(self.gains[:count], self.stack[:count].reshape(count, -1), out=self._flat)
+        peak = max(out.max(), -out.min())
+        target = 1.0 / peak if peak > 1.0 else 1.0
+        start = self.limit
+        end = min(target, start + LIMITER_RELEASE)
+        if start < 1.0 or end < 1.0:
+            if end < 1.0:
+                self.limited += 1
+            # Kazanç blok boyunca doğrusal değişir; tıklama olmaz
+            np.multiply(self._ramp_base, end - start, out=self._ramp)
+            self._ramp += start
+            out *= self._ramp
+            self.limit = end
+            # Rampanın başı hedefin üstünde kalabilir: kalan aşım kırpılır
+            np.minimum(out, self._one, out=out)
+            np.maximum(out, self._minus_one, out=out)
+        return out
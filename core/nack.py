@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+NACK tabanlı seçici yeniden gönderim.
+
+Alıcı jitter tamponundaki boşlukları (daha yeni bir paket geldiğinde
+görünür olurlar) kontrol portu üzerinden kısa NACK mesajlarıyla bildirir. Her girdi bir sıra numarası, onu izleyen 16 çerçeve
+için kayıp bit maskesi (RTCP genel NACK'indeki gibi) ve o çerçevenin
+çalınmasına kalan süreyi (ms) taşır. Gönderici son paketleri sınırlı bir
+geçmişte tutar ve yalnızca RTT'si bu süreye sığan paketleri yeniden gönderir.
+"""
+
+import struct
+import threading
+
+NACK_PREFIX = b"NACK"
+NACK_ENTRY = struct.Struct("!HHH")  # sıra no, sonraki 16 çerçevenin bit maskesi, kalan süre (ms)
+NACK_RETRY_INTERVAL = 0.02   # Aynı çerçeve için tekrar NACK aralığı
+NACK_RETRIES = 2             # Bir çerçeve için en fazla NACK sayısı
+RETRANSMIT_MARGIN_MS = 2     # Yeniden gönderim için RTT'ye eklenen güvenlik payı
+HISTORY = 512                # Göndericide saklanan son paket sayısı
+
+class NackTracker:
+    """Jitter tamponundaki boşluklar için NACK mesajları üretir (alıcı tarafı)."""
+    def __init__(self):
+        self.requests = {}   # genişletilmiş sıra no -> [deneme, son gönderim]
+        self.sent = 0        # Gönderilen NACK mesajı
+        self.requested = 0   # NACK'lenen çerçeve
+        self.retransmits = 0       # Alınan yeniden gönderim paketi
+        self.late_retransmits = 0  # Çalma zamanı geçtiği için atılan yeniden gönderim
+
+    def poll(self, missing, now, next_seq, frame_s):
+        """
+        Şu an eksik olan (genişletilmiş) sıra numaralarına bakarak gönderilmesi
+        gereken NACK mesajını döndürür; gerek yoksa None.
+        """
+        alive = set(missing)
+        for ext in [ext for ext in self.requests if ext not in alive]:
+            del self.requests[ext]
+
+        due = []
+        for ext in missing:
+            req = self.requests.get(ext)
+            if req is None:
+                req = self.requests[ext] = [0, 0.0]
+            tries, last = req
+            if tries >= NACK_RETRIES or (tries and now - last < NACK_RETRY_INTERVAL):
+                continue
+            req[0] += 1
+            req[1] = now
+            due.append(ext)
+        if not due:
+            return None
+
+        entries = []
+        i = 0
+        while i < len(due):
+            pid = due[i]
+            mask = 0
+            i += 1
+            while i < len(due) and due[i] - pid <= 16:
+                mask |= 1 << (due[i] - pid - 1)
+                i += 1
+            budget = int(min(max(pid - next_seq + 1, 1) * frame_s * 1000, 0xFFFF))
+            entries.append(NACK_ENTRY.pack(pid & 0xFFFF, mask, budget))
+        self.sent += 1
+        self.requested += len(due)
+        return NACK_PREFIX + b"".join(entries)
+
+class RetransmitHistory:
+    """
+    Son gönderilen paketleri sabit boyutlu bir halkada tutar ve NACK'lere
+    yanıt olarak yeniden gönderilecekleri seçer (gönderici tarafı).
+    """
+    def __init__(self, size=HISTORY):
+        self.size = size
+        self._ring = [None] * size   # (ilk sıra no, çerçeve sayısı, datagram veya (başlık, yük))
+        self._by_frame = {}          # çerçeve sıra no -> halka indeksi
+        self._pos = 0
+        self._lock = threading.Lock()
+        self.nacks = 0        # Alınan NACK mesajı
+        self.resent = 0       # Yeniden gönderilen paket
+        self.too_late = 0     # Zamanında yetişemeyeceği için gönderilmeyen çerçeve
+        self.unavailable = 0  # Geçmişte bulunmayan çerçeve
+
+    def add(self, seq, count, datagram):
+        """
+        Gönderilen bir paketi geçmişe ekler. `datagram` tek parça olabileceği
+        gibi gönderildiği haliyle (başlık, yük) parçaları da olabilir; geçmiş
+        kopyalamaz, `handle` aynı nesneyi döndürür.
+        """
+        with self._lock:
+            idx = self._pos
+            old = self._ring[idx]
+            if old:
+                for j in range(old[1]):
+                    f = (old[0] + j) & 0xFFFF
+                    if self._by_frame.get(f) == idx:
+                        del self._by_frame[f]
+            self._ring[idx] = (seq, count, datagram)
+            for j in range(count):
+                self._by_frame[(seq + j) & 0xFFFF] = idx
+            self._pos = (idx + 1) % self.size
+
+    def handle(self, msg, rtt_ms):
+        """
+        Bir NACK mesajını işler ve yeniden gönderilecek datagramları döndürür.
+        RTT bilinmiyorsa (negatif) tüm bulunan paketler gönderilir.
+        """
+        wanted = []
+        body = memoryview(msg)[len(NACK_PREFIX):]
+        with self._lock:
+            self.nacks += 1
+            for off in range(0, len(body) - NACK_ENTRY.size + 1, NACK_ENTRY.size):
+                pid, mask, budget = NACK_ENTRY.unpack_from(body, off)
+                frames = [pid] + [(pid + 1 + b) & 0xFFFF for b in range(16) if mask >> b & 1]
+                if rtt_ms >= 0 and rtt_ms + RETRANSMIT_MARGIN_MS >= budget:
+                    self.too_late += len(frames)
+                    continue
+                for f in frames:
+                    idx = self._by_frame.get(f)
+                    if idx is None:
+                        self.unavailable += 1
+                    elif idx not in wanted:
+                        wanted.append(idx)
+            datagrams = [self._ring[idx][2] for idx in wanted]
+            self.resent += len(datagrams)
+        return datagrams
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Kontrol portunda akış biçimi anlaşması.
+
+Alıcı her pong'un ardından çıkış aygıtının doğal biçimini bildiren kısa bir
+CAPS mesajı gönderir: örnekleme hızı, kanal sayısı ve çözebildiği örnek
+biçimleri (kodek kimliklerinin bit maskesi). Gönderici yakalamaya başlamadan
+önce `NEGOTIATE_TIMEOUT` kadar bu mesajları bekler ve hiçbir tarafta
+dönüştürme gerektirmeyen biçimi seçer (`choose_format`):
+
+    örnekleme hızı  Kaynağın doğal hızı biliniyorsa o (ör. WAV dosyası),
+                    bilinmiyorsa alıcıların en çok bildirdiği hız.
+    kanal sayısı    Alıcıların en çok bildirdiği sayı; kaynağın kanal
+                    sayısından fazla olamaz.
+    kodek           İstenen kodek tüm alıcılarda çözülebiliyorsa o, yoksa pcm16.
+
+Taraflar gerçekten farklıysa (sabit hızlı bir kaynak veya farklı aygıtlara
+sahip birden çok alıcı) dönüştürme yalnızca alıcıda ve bir kez yapılır:
+yeniden örnekleme saat kayması telafisiyle aynı adımda (bkz. core.drift),
+kanal eşleme çalmadan hemen önce (bkz. core.mixer). Bildirilen biçim
+değişirse (alıcı eklendi, çıkış aygıtı değişti) gönderici yakalamayı yeni
+biçimle yeniden açar. CAPS göndermeyen eski alıcılarda yapılandırılan biçim
+kullanılır.
+"""
+
+import struct
+from collections import Counter
+from core import codecs
+
+CAPS_PREFIX = b"CAPS"
+CAPS = struct.Struct("!4sIBH")   # önek, örnekleme hızı, kanal sayısı, kodek bit maskesi
+NEGOTIATE_TIMEOUT = 0.5          # Göndericinin ilk CAPS mesajlarını bekleme süresi (saniye)
+
+class Caps:
+    """Bir alıcının çıkış aygıtı için bildirdiği biçim."""
+    def __init__(self, rate, channels, formats=None):
+        self.rate = rate
+        self.channels = channels
+        self.formats = tuple(sorted(codecs.CODECS if formats is None else formats))
+
+    def pack(self):
+        mask = 0
+        for codec_id in self.formats:
+            mask |= 1 << codec_id
+        return CAPS.pack(CAPS_PREFIX, self.rate, self.channels, mask)
+
+    @classmethod
+    def parse(cls, data):
+        """Mesajı çözer; biçim tutmazsa None döndürür."""
+        if len(data) != CAPS.size:
+            return None
+        _, rate, channels, mask = CAPS.unpack(data)
+        if not rate or not channels:
+            return None
+        return cls(rate, channels, [i for i in range(16) if mask >> i & 1])
+
+    def supports(self, codec_id):
+        return codec_id in self.formats
+
+    def __eq__(self, other):
+        return isinstance(other, Caps) and (self.rate, self.channels, self.formats) == \
+            (other.rate, other.channels, other.formats)
+
+    def __repr__(self):
+        return f"Caps({self.rate} Hz, {self.channels} kanal, {self.formats})"
+
+def _most_common(values, default):
+    """En sık değer (eşitlikte önce görülen); liste boşsa `default`."""
+    return Counter(values).most_common(1)[0][0] if values else default
+
+def choose_format(offers, source_rate=None, source_channels=None, rate=48000, channels=2,
+                  codec="pcm16"):
+    """
+    Alıcıların bildirdikleri (`offers`) ve kaynağın doğal biçiminden
+    (bilinmeyenler None) akış biçimini seçer; (hız, kanal, kodek adı) döndürür.
+    Bildirim yoksa verilen varsayılanlar kullanılır.
+    """
+    offers = list(offers)
+    if source_rate:
+        rate = source_rate
+    else:
+        rate = _most_common([c.rate for c in offers], rate)
+    channels = _most_common([c.channels for c in offers], channels)
+    if source_channels:
+        channels = min(channels, source_channels)
+    codec_id = codecs.get_codec(codec).id
+    if not all(c.supports(codec_id) for c in offers):
+        codec = codecs.CODECS[0].name
+    return rate, channels, codec
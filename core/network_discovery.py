@@ -3,68 +3,312 @@
 """
 Yerel ağdaki diğer uygulama örneklerini bulmak için ağ keşif mekanizmaları.
 UDP broadcast kullanarak çalışır.
+
+Alıcılar (`Announcer`) `ANNOUNCE_INTERVAL`'da bir kendilerini duyurur ve
+`QUERY_PORT`'ta sorguları dinler. Göndericiler (`Listener`) başlarken
+broadcast ve çoklu yayın grubuna bir sorgu (probe) gönderir; alıcılar
+hemen, doğrudan sorgulayana yanıt verir. Böylece keşif duyuru aralığını
+beklemeden milisaniyeler içinde biter. Duyuru ve yanıtlar aynı bilgiyi
+taşır: ana bilgisayar adı, ses portu, çıkış biçimi, çözülebilen kodekler
+ve yük (çalınan kaynak sayısı).
+
+Bulunan alıcılar sınırlı bir dizinde (`HostIndex`) tutulur: `HOST_TTL`
+boyunca duyulmayan alıcı silinir, dizin dolunca en eski görülen atılır.
+Değişiklikler abonelere `callback(olay, alıcı)` biçiminde bildirilir
+("added", "updated", "removed"); arayüzün dizini yoklaması gerekmez.
+Kalabalık broadcast alanlarında maliyet düşük kalsın diye imzası
+tutmayan paketler JSON çözülmeden atılır, bir alıcıdan aynı mesaj tekrar
+gelirse yalnızca görülme zamanı yenilenir.
 """
 
 import socket
 import threading
 import time
 import json
+from collections import OrderedDict
 
-DISCOVERY_PORT = 5556  # Keşif için ayrı bir port
+DISCOVERY_PORT = 5556  # Keşif için ayrı bir port (duyurular ve yanıtlar)
+QUERY_PORT = 5557      # Alıcıların sorguları dinlediği port
+DISCOVERY_GROUP = "239.255.77.77"  # Sorguların da gönderildiği çoklu yayın grubu
 BROADCAST_ADDR = "<broadcast>"
 ANNOUNCE_INTERVAL = 5  # Saniyede bir anons
 APP_SIGNATURE = "AUDIO_STREAM_APP"
+SIGNATURE_BYTES = APP_SIGNATURE.encode("utf-8")
+HOST_TTL = 15          # Saniye; bu süre duyulmayan alıcı dizinden silinir
+MAX_HOSTS = 64         # Dizindeki en fazla alıcı
+QUERY_HOLDOFF = 0.2    # Aynı sorgulayana bu süreden sık yanıt verilmez (saniye)
+EXPIRE_INTERVAL = 1.0  # Dinleyicinin süresi dolanları kontrol etme aralığı (saniye)
+
+def _parse(data):
+    """Keşif mesajını çözer; uygulamaya ait değilse None döndürür."""
+    # İmza JSON'un başındadır: yabancı paketleri çözmeden at
+    if SIGNATURE_BYTES not in data[:48]:
+        return None
+    try:
+        message = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(message, dict) or message.get("signature") != APP_SIGNATURE:
+        return None
+    return message
+
+def _join_group(sock):
+    """Soketi keşif çoklu yayın grubuna ekler; olmazsa yalnızca broadcast kullanılır."""
+    try:
+        mreq = socket.inet_aton(DISCOVERY_GROUP) + socket.inet_aton("0.0.0.0")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    except OSError as e:
+        print(f"Keşif grubuna katılınamadı ({DISCOVERY_GROUP}): {e}")
+
+class Host:
+    """Keşfedilen bir alıcı."""
+    def __init__(self, ip, message, raw=b""):
+        self.ip = ip
+        self.seen = 0.0
+        self._info = None
+        self.update(message, raw)
+
+    def update(self, message, raw):
+        """Mesajdaki bilgileri alır; bir bilgi değiştiyse True döndürür."""
+        self.raw = raw
+        info = (message.get("hostname", "Bilinmeyen"), message.get("port", 5555), message.get("rate"),
+                message.get("channels"), tuple(message.get("formats", ())), message.get("load", 0),
+                message.get("max_sources"))
+        changed = info != self._info
+        self._info = info
+        (self.hostname, self.port, self.rate, self.channels, self.formats, self.load,
+         self.max_sources) = info
+        return changed
+
+    @property
+    def key(self):
+        return (self.ip, self.port)
+
+    @property
+    def address(self):
+        """Göndericiye verilecek hedef: varsayılan portta "ip", değilse "ip:port"."""
+        return self.ip if self.port == 5555 else f"{self.ip}:{self.port}"
+
+    def __repr__(self):
+        return f"Host({self.hostname} {self.address}, yük {self.load})"
+
+class HostIndex:
+    """
+    Keşfedilen alıcıların sınırlı, süresi dolan dizini. Thread güvenlidir;
+    abonelere kilit dışında, güncellemeyi yapan thread'den bildirilir.
+    """
+    def __init__(self, capacity=MAX_HOSTS, ttl=HOST_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._hosts = OrderedDict()   # (ip, port) -> Host; en eski görülen başta
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def _notify(self, events):
+        if not events:
+            return
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for event, host in events:
+            for callback in callbacks:
+                try:
+                    callback(event, host)
+                except Exception as e:
+                    print(f"Keşif bildirimi işlenemedi: {e}")
+
+    def seen(self, ip, data, now=None):
+        """
+        Bir duyuru veya yanıtı işler. Aynı alıcıdan aynı mesaj geldiyse
+        çözmeden yalnızca görülme zamanını yeniler.
+        """
+        now = time.monotonic() if now is None else now
+        events = []
+        with self._lock:
+            for host in self._hosts.values():
+                if host.ip == ip and host.raw == data:
+                    host.seen = now
+                    self._hosts.move_to_end(host.key)
+                    return
+        message = _parse(data)
+        if message is None:
+            return
+        with self._lock:
+            key = (ip, message.get("port", 5555))
+            host = self._hosts.get(key)
+            if host is None:
+                host = Host(ip, message, data)
+                self._hosts[key] = host
+                events.append(("added", host))
+                while len(self._hosts) > self.capacity:
+                    _, old = self._hosts.popitem(last=False)
+                    events.append(("removed", old))
+            elif host.update(message, data):
+                events.append(("updated", host))
+            host.seen = now
+            self._hosts.move_to_end(key)
+        self._notify(events)
+
+    def expire(self, now=None):
+        """`ttl` boyunca duyulmayan alıcıları siler."""
+        now = time.monotonic() if now is None else now
+        events = []
+        with self._lock:
+            while self._hosts:
+                key, host = next(iter(self._hosts.items()))
+                if now - host.seen < self.ttl:
+                    break
+                del self._hosts[key]
+                events.append(("removed", host))
+        self._notify(events)
+
+    def hosts(self, timeout=None):
+        """Son `timeout` (verilmezse `ttl`) saniyede duyulan alıcıların listesi."""
+        timeout = self.ttl if timeout is None else timeout
+        now = time.monotonic()
+        with self._lock:
+            return [host for host in self._hosts.values() if now - host.seen < timeout]
+
+    def __len__(self):
+        return len(self._hosts)
 
 class Announcer(threading.Thread):
     """
-    Belirli aralıklarla ağa varlığını duyuran sınıf (Alıcı tarafında çalışır).
+    Belirli aralıklarla ağa varlığını duyuran ve sorgulara hemen yanıt veren
+    sınıf (Alıcı tarafında çalışır). `info` verilirse her mesajda çağrılır ve
+    döndürdüğü sözlük (port, biçim, yük) mesaja eklenir.
     """
-    def __init__(self):
+    def __init__(self, info=None):
         super().__init__(daemon=True)
         self.running = False
+        self.info = info
+        self.queries = 0
+        self._answered = {}  # sorgulayan adres -> son yanıt zamanı
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    def _message(self):
+        # Duyuru ve yanıt aynıdır: dinleyici tekrarlanan mesajı çözmeden tanır
+        message = {"signature": APP_SIGNATURE, "hostname": socket.gethostname()}
+        if self.info:
+            try:
+                message.update(self.info())
+            except Exception as e:
+                print(f"Duyuru bilgisi alınamadı: {e}")
+        return json.dumps(message).encode('utf-8')
+
+    def _answer(self, data, addr, now):
+        message = _parse(data)
+        if message is None or message.get("type") != "query":
+            return
+        self.queries += 1
+        if now - self._answered.get(addr, -QUERY_HOLDOFF) < QUERY_HOLDOFF:
+            return
+        if len(self._answered) > MAX_HOSTS:
+            self._answered.clear()
+        self._answered[addr] = now
+        self.sock.sendto(self._message(), addr)
 
     def run(self):
         self.running = True
-        message = json.dumps({"signature": APP_SIGNATURE, "hostname": socket.gethostname()}).encode('utf-8')
+        try:
+            self.sock.bind(("", QUERY_PORT))
+            _join_group(self.sock)
+        except OSError as e:
+            print(f"Keşif sorgu portu açılamadı ({QUERY_PORT}), yalnızca duyuru yapılacak: {e}")
+        self.sock.settimeout(ANNOUNCE_INTERVAL)
+        next_announce = 0.0
         while self.running:
+            now = time.monotonic()
             try:
-                self.sock.sendto(message, (BROADCAST_ADDR, DISCOVERY_PORT))
-                # print(f"Duyuru yapıldı: {message}")
+                if now >= next_announce:
+                    next_announce = now + ANNOUNCE_INTERVAL
+                    self.sock.sendto(self._message(), (BROADCAST_ADDR, DISCOVERY_PORT))
+                    # print(f"Duyuru yapıldı: {message}")
+                self.sock.settimeout(max(next_announce - now, 0.01))
+                data, addr = self.sock.recvfrom(1024)
+                self._answer(data, addr, time.monotonic())
+            except socket.timeout:
+                continue
             except Exception as e:
-                print(f"Duyuru hatası: {e}")
-            time.sleep(ANNOUNCE_INTERVAL)
+                if self.running:
+                    print(f"Duyuru hatası: {e}")
+                    time.sleep(0.1)
 
     def stop(self):
         self.running = False
+        try:
+            self.sock.close()
+        except OSError:
+            pass
 
 class Listener(threading.Thread):
     """
-    Ağdaki duyuruları dinleyen sınıf (Gönderici tarafında çalışır).
+    Ağdaki duyuruları ve sorgu yanıtlarını dinleyen sınıf (Gönderici
+    tarafında çalışır). Başlarken bir sorgu gönderir; `query()` ile yenisi
+    gönderilebilir. Bulunanlar `index`'tedir (bkz. HostIndex).
     """
-    def __init__(self):
+    def __init__(self, index=None):
         super().__init__(daemon=True)
         self.running = False
+        self.index = index if index is not None else HostIndex()
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.found_hosts = {}  # {ip: (hostname, timestamp)}
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.bound = threading.Event()
+
+    def subscribe(self, callback):
+        self.index.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.index.unsubscribe(callback)
+
+    def query(self):
+        """Alıcılara hemen yanıt vermeleri için bir sorgu gönderir."""
+        message = json.dumps({"signature": APP_SIGNATURE, "type": "query"}).encode('utf-8')
+        for addr in ((BROADCAST_ADDR, QUERY_PORT), (DISCOVERY_GROUP, QUERY_PORT)):
+            try:
+                self.sock.sendto(message, addr)
+            except OSError as e:
+                print(f"Keşif sorgusu gönderilemedi ({addr[0]}): {e}")
 
     def run(self):
         self.running = True
-        self.sock.bind(("", DISCOVERY_PORT))
+        try:
+            self.sock.bind(("", DISCOVERY_PORT))
+        except OSError as e:
+            print(f"‼️ Keşif portu açılamadı ({DISCOVERY_PORT}): {e}")
+            self.running = False
+            self.bound.set()
+            return
         print(f"Keşif dinleyicisi başlatıldı: Port {DISCOVERY_PORT}")
+        self.sock.settimeout(EXPIRE_INTERVAL)
+        self.bound.set()
+        self.query()
+        next_expire = time.monotonic() + EXPIRE_INTERVAL
         while self.running:
             try:
                 data, addr = self.sock.recvfrom(1024)
-                message = json.loads(data.decode('utf-8'))
-                if message.get("signature") == APP_SIGNATURE:
-                    ip = addr[0]
-                    hostname = message.get("hostname", "Bilinmeyen")
-                    self.found_hosts[ip] = (hostname, time.time())
-                    # print(f"Alıcı bulundu: {hostname} ({ip})")
+                self.index.seen(addr[0], data)
+            except socket.timeout:
+                pass
             except Exception as e:
                 if self.running:
                     print(f"Dinleme hatası: {e}")
+                    time.sleep(0.1)
+            now = time.monotonic()
+            if now >= next_expire:
+                next_expire = now + EXPIRE_INTERVAL
+                self.index.expire(now)
 
     def stop(self):
         self.running = False
@@ -77,9 +321,9 @@ class Listener(threading.Thread):
                 print(f"Dinleyici soketi kapatılırken hata (muhtemelen zaten kapalı): {e}")
         self.sock = None
 
-    def get_active_hosts(self, timeout=15):
+    def get_active_hosts(self, timeout=HOST_TTL):
         """
-        Son 'timeout' saniye içinde görülen aktif sunucuları döndürür.
+        Son 'timeout' saniye içinde görülen aktif alıcıları {adres: hostname}
+        olarak döndürür (adres varsayılan porttaysa yalnızca IP).
         """
-        now = time.time()
-        return {ip: hostname for ip, (hostname, ts) in self.found_hosts.items() if now - ts < timeout}
\ No newline at end of file
+        return {host.address: host.hostname for host in self.index.hosts(timeout)}
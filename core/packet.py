@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ses paketlerinin ağ biçimi.
+
+Her UDP paketi sabit bir başlık ve ardından art arda dizilmiş bir veya daha
+fazla ses çerçevesi taşır. Başlık, alıcının hiçbir varsayım yapmadan
+çözebilmesi için çerçeve sayısını, örnekleme hızını ve kanal sayısını içerir.
+Sıra numarası paketin ilk çerçevesine aittir; sonraki çerçeveler ardışık
+numaralanır. Zaman damgası ilk çerçevenin ilk örneğinin göndericinin monoton
+saatine göre yakalandığı an (mikrosaniye, 32 bit sarmalı; bkz. core.clock).
+Akış kimliği gönderici her akışa başlarken rastgele seçilir; alıcı aynı porta
+gelen birden çok göndericiyi bununla ayırır (bkz. core.source).
+"""
+
+import struct
+
+MAGIC = 0x59  # 'Y'
+VERSION = 4
+
+# magic, sürüm, sıra no, bayraklar, kodek kimliği, kanal sayısı,
+# paketteki çerçeve sayısı, örnekleme hızı, çerçeve başına örnek (kanal başına),
+# yakalama zaman damgası (µs; eşlik paketlerinde 0), akış kimliği
+HEADER = struct.Struct("!BBHBBBBIHII")
+
+SAMPLE_BYTES = 2  # int16 PCM
+PCM16 = 0         # Sıkıştırmasız kodek kimliği (bkz. core.codecs)
+
+# Başlık bayrakları
+FLAG_FEC = 0x01     # Veri paketi bir FEC grubuna dahil
+FLAG_PARITY = 0x02  # XOR eşlik paketi (bkz. core.fec); "count" gruptaki paket sayısıdır
+FLAG_RETRANSMIT = 0x04  # NACK üzerine yeniden gönderilen paket (bkz. core.nack)
+FLAGS_OFFSET = 4        # Bayrak baytının başlıktaki konumu
+FRAME_DURATIONS_MS = (2.5, 5, 10, 20, 40)
+DEFAULT_FRAME_MS = 10
+DEFAULT_MTU = 1472  # 1500 bayt Ethernet MTU'su - IP (20) - UDP (8) başlıkları
+MAX_PACKET = 65536  # En büyük UDP datagramı için yeterli
+
+def frame_samples(rate, frame_ms):
+    """Verilen çerçeve süresi için kanal başına örnek sayısını döndürür."""
+    return int(round(rate * frame_ms / 1000))
+
+def frame_bytes(samples, channels, sample_bytes=SAMPLE_BYTES):
+    """Bir çerçevenin paket içindeki bayt uzunluğu."""
+    return samples * channels * sample_bytes
+
+def frames_per_packet(samples, channels, wanted, mtu=DEFAULT_MTU, sample_bytes=SAMPLE_BYTES, overhead=0):
+    """
+    Bir pakete sığdırılabilecek çerçeve sayısını döndürür. `overhead`, kodeğin
+    çerçevelerden bağımsız olarak yüke ekleyebildiği bayt sayısıdır.
+    İstenen sayı MTU'yu aşıyorsa sığabilecek kadarına indirilir; tek bir
+    çerçeve bile sığmıyorsa paket başına bir çerçeve gönderilir (IP parçalanır).
+    """
+    fit = (mtu - HEADER.size - overhead) // frame_bytes(samples, channels, sample_bytes)
+    return max(1, min(wanted, fit, 255))
+
+def pack_header(seq, codec, channels, count, rate, samples, flags=0, timestamp=0, stream=0):
+    """Paket başlığını oluşturur."""
+    return HEADER.pack(MAGIC, VERSION, seq, flags, codec, channels, count, rate, samples, timestamp,
+                       stream)
+
+def pack_header_into(buf, seq, codec, channels, count, rate, samples, flags=0, timestamp=0, stream=0):
+    """Paket başlığını önceden ayrılmış `buf` tamponunun başına yazar."""
+    HEADER.pack_into(buf, 0, MAGIC, VERSION, seq, flags, codec, channels, count, rate, samples,
+                     timestamp, stream)
+
+def with_flags(datagram, flags):
+    """Paketin bir kopyasını verilen bayraklar eklenmiş olarak döndürür."""
+    buf = bytearray(datagram)
+    buf[FLAGS_OFFSET] |= flags
+    return buf
+
+def parse_header(buf, length):
+    """
+    Başlığı çözer ve (seq, flags, codec, channels, count, rate, samples, timestamp, stream)
+    döndürür. Paket bu biçimde değilse veya ham PCM uzunluğu tutarsızsa None döner.
+    """
+    if length <= HEADER.size:
+        return None
+    magic, version, seq, flags, codec, channels, count, rate, samples, timestamp, stream = \
+        HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION or not channels or not count:
+        return None
+    if (codec == PCM16 and not flags & FLAG_PARITY
+            and length != HEADER.size + count * frame_bytes(samples, channels)):
+        return None
+    return seq, flags, codec, channels, count, rate, samples, timestamp, stream
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+Alıcıdaki kaynaklar: aynı porta ses gönderen her göndericinin durumu.
+
+Paketler başlıklarındaki akış kimliğiyle ayrılır, kaynak adresiyle değil:
+yeniden gönderimler ve aktarıcıdan (bkz. core.impairment) geçen paketler
+farklı bir adresten gelebilir. Her kaynağın kendi jitter tamponu, FEC
+çözücüsü, NACK izleyicisi, geri bildirimi, saat farkı, kayma telafisi ve
+çıkış biçimine dönüştürücüleri vardır; kaynakların sıra numaraları ve
+saatleri birbirini etkilemez. Göndericinin kontrol adresi aynı akış
+kimliğini taşıyan ping'lerden öğrenilir; NACK, rapor ve pong oraya gider.
+
+`SOURCE_TIMEOUT` boyunca ne paket ne ping gelen kaynak atılır.
+"""
+
+import numpy as np
+from core.drift import DriftCompensator
+from core.feedback import FeedbackReporter
+from core.fec import FecDecoder
+from core.jitter_buffer import JitterBuffer
+from core.mixer import ChannelMixer
+from core.nack import NackTracker
+
+SOURCE_TIMEOUT = 3.0  # Saniye; bu süre sessiz kalan kaynak atılır
+MAX_SOURCES = 8       # Aynı anda karıştırılabilecek en fazla kaynak
+
+class Source:
+    """Bir göndericinin akışı (alıcı tarafı). Alıcının kilidi tutulurken kullanılır."""
+    def __init__(self, stream, prebuffer=1, max_buffer=50, nack=True, drift=True, feedback=True):
+        self.stream = stream          # Akış kimliği (paket başlığından)
+        self.control = None           # Göndericinin kontrol adresi (ping'lerden)
+        self.gain = 1.0               # Karıştırma kazancı
+        self.prebuffer = prebuffer
+        self.max_buffer = max_buffer
+        self.stream_format = None     # (rate, channels, frame_samples)
+        self.jitter = None
+        self.fec = FecDecoder()
+        self.nack = NackTracker() if nack else None
+        self.feedback = FeedbackReporter() if feedback else None
+        self.use_drift = drift
+        self.drift = None             # Saat kayması telafisi (açıksa); hızı da dönüştürür
+        self.resampler = None         # Kayma telafisi kapalıyken hız dönüştürücü
+        self.mixer = None             # Kanal sayıları farklıysa kanal eşleyici
+        self.clock_offset = None      # Yerel saat - gönderici saati (s); SYNC mesajıyla gelir
+        self.path_rtt = -1.0          # Göndericinin ölçtüğü en küçük RTT (s)
+        self.last_seen = 0.0
+        self.packets = 0
+        self._output_key = None       # Dönüştürücülerin kurulduğu (akış biçimi, çıkış biçimi)
+        # Çok kaynaklı karıştırmada çıkış biçimine çevrilmiş, henüz çalınmamış örnekler
+        self.pending = None
+        self.fill = 0
+
+    @property
+    def name(self):
+        host = self.control[0] if self.control else "?"
+        return f"{host} #{self.stream:08x}"
+
+    def set_format(self, fmt):
+        """Yeni akış biçimine geçer ve jitter tamponunu yeniden oluşturur."""
+        rate, channels, frames = self.stream_format = fmt
+        self.jitter = JitterBuffer(rate=rate, frames=frames, channels=channels,
+                                   min_depth=self.prebuffer, max_depth=self.max_buffer)
+        print(f"🎼  Akış biçimi ({self.name}): {rate} Hz, {channels} kanal, {frames} örnek/çerçeve")
+
+    def set_output(self, output_format):
+        """
+        Akıştan çıkış biçimine dönüştürücüleri kurar. Hız farkı saat kayması
+        telafisiyle aynı adımda giderilir; kanal sayısı azalıyorsa eşleme
+        yeniden örneklemeden önce, artıyorsa sonra yapılır, böylece ara
+        değerleme az olan kanal sayısında çalışır. Biçimler aynı kaldıysa
+        (yalnızca aygıt değiştiyse) kayma durumu korunur.
+        """
+        key = (self.stream_format, output_format)
+        if key == self._output_key:
+            return
+        self._output_key = key
+        (rate, channels, frames), (out_rate, out_channels) = key
+        resampler = DriftCompensator(rate=rate, frames=frames, channels=min(channels, out_channels),
+                                     out_rate=out_rate)
+        self.drift = resampler if self.use_drift else None
+        self.resampler = resampler if not self.use_drift and out_rate != rate else None
+        self.mixer = None
+        if channels != out_channels:
+            size = frames if out_channels < channels else len(resampler.out)
+            self.mixer = ChannelMixer(channels, out_channels, size)
+        self.pending = np.zeros((2 * len(resampler.out), out_channels), dtype=np.float32)
+        self.fill = 0
+
+    def convert(self, frame):
+        """Çerçeveyi çıkış biçimine çevirir; dönen dizi sonraki çağrıda yeniden kullanılır."""
+        mixer = self.mixer
+        if mixer and mixer.out_channels < mixer.in_channels:
+            frame = mixer.process(frame)
+        resampler = self.drift or self.resampler
+        if resampler:
+            frame = resampler.process(frame)
+        if mixer and mixer.out_channels > mixer.in_channels:
+            frame = mixer.process(frame)
+        return frame
+
+    def queue(self, block):
+        """Çıkış biçimindeki bloğu karıştırılmayı bekleyen örneklerin sonuna ekler."""
+        n = len(block)
+        self.pending[self.fill:self.fill + n] = block
+        self.fill += n
+
+    def take(self, n, out):
+        """Bekleyen örneklerin ilk `n` tanesini `out`'a kopyalar; kalanlar başa kayar."""
+        pending = self.pending
+        out[...] = pending[:n]
+        rest = self.fill - n
+        pending[:rest] = pending[n:self.fill]
+        self.fill = rest
+
+    def push(self, seq, count, frames, arrival, capture=None):
+        """
+        Bir paketin çerçevelerini ardışık sıra numaralarıyla tampona koyar ve
+        kabul edilen çerçeve sayısını döndürür. `capture` ilk çerçevenin yerel
+        saate çevrilmiş yakalama anıdır (bilinmiyorsa None).
+        """
+        accepted = 0
+        jitter = self.jitter
+        for j in range(count):
+            at = capture + j * jitter.frame_s if capture is not None else None
+            accepted += jitter.push((seq + j) & 0xFFFF, frames[j], arrival, at)
+        return accepted
+
+    def poll_nack(self, now):
+        """Tampondaki boşluklar için gönderilmesi gereken NACK mesajını döndürür."""
+        jitter = self.jitter
+        if not self.nack or not self.control or jitter is None or jitter.next_seq is None:
+            return None
+        return self.nack.poll(jitter.missing(), now, jitter.next_seq, jitter.frame_s)
+
+    def build_report(self):
+        """Son aralığın alıcı raporunu döndürür (bkz. core.feedback); yoksa None."""
+        if not self.feedback or not self.control:
+            return None
+        return self.feedback.build(self.jitter)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""
+Akış istatistikleri: sayaç anlık görüntüleri, gecikme histogramları ve
+isteğe bağlı yerel Prometheus metin uç noktası.
+
+Sıcak thread'ler kilit almaz: her sayaç tek bir thread tarafından düz bir
+tamsayı özniteliği olarak artırılır (ör. `AudioReceiver.packets_received`,
+`JitterBuffer.late`) ve `Stats` bunları yalnızca anlık görüntü alınırken
+okur. Histogramlar da tek yazıcılıdır. Okuma sırasında bir iki sayacın
+birbirinden bir güncelleme kadar farklı olması kabul edilir.
+
+    stats.snapshot()                    -> {"packets_received": 1234, ...}
+    start_metrics_server(9100)          -> http://127.0.0.1:9100/metrics
+"""
+
+import bisect
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300, 500, 1000)
+METRIC_PREFIX = "yakamoz_"
+
+# Metrik adı -> (Prometheus türü, açıklama). Tabloda olmayanlar gauge sayılır.
+METRICS = {
+    # Gönderici
+    "packets_sent": ("counter", "Gönderilen ses paketleri"),
+    "bytes_sent": ("counter", "Gönderilen ses baytları (tüm hedeflere)"),
+    "parity_sent": ("counter", "Gönderilen FEC eşlik paketleri"),
+    "send_errors": ("counter", "Başarısız gönderimler"),
+    "nacks_received": ("counter", "Alınan NACK mesajları"),
+    "retransmits_sent": ("counter", "Yeniden gönderilen paketler"),
+    "destinations": ("gauge", "Hedef sayısı"),
+    "receivers": ("gauge", "Pong veren alıcı sayısı"),
+    "ping_ms": ("gauge", "En kötü taze gidiş-dönüş süresi (ms, -1: yok)"),
+    "one_way_delay_ms": ("gauge", "En kötü tek yön gecikme tahmini, en küçük RTT / 2 (ms, -1: yok)"),
+    "reported_loss": ("gauge", "Alıcı raporlarındaki en kötü kayıp oranı"),
+    "adapt_level": ("gauge", "Uyarlama merdivenindeki basamak (0: en düşük gecikme)"),
+    "adapt_changes": ("counter", "Uyarlama basamağı değişiklikleri"),
+    "capture_overruns": ("counter", "Yakalama kuyruğu dolu olduğu için atılan çerçeveler"),
+    "queue_dropped": ("counter", "Gönderim geciktiği için atılan eski çerçeveler"),
+    "queue_depth": ("gauge", "Yakalama kuyruğunda gönderilmeyi bekleyen çerçeveler"),
+    "queue_depth_max": ("gauge", "Yakalama kuyruğunun ulaştığı en büyük derinlik"),
+    # Alıcı
+    "packets_received": ("counter", "Alınan paketler"),
+    "bytes_received": ("counter", "Alınan baytlar"),
+    "malformed": ("counter", "Çözülemeyen paketler"),
+    "frames_received": ("counter", "Tampona gelen çerçeveler"),
+    "gaps": ("counter", "Gelişte atlanan sıra numaraları"),
+    "reordered": ("counter", "Sırası bozuk gelen çerçeveler"),
+    "duplicates": ("counter", "Tekrar gelen çerçeveler"),
+    "late": ("counter", "Çalma zamanı geçtikten sonra gelen çerçeveler"),
+    "concealed": ("counter", "Gizlenen (kayıp) çerçeveler"),
+    "underruns": ("counter", "Tampon boşalmaları"),
+    "overruns": ("counter", "Tampon taşmaları"),
+    "dropped": ("counter", "Atılan çerçeveler (taşma veya gecikme azaltma)"),
+    "inserted": ("counter", "Tampon büyütmek için eklenen çerçeveler"),
+    "fec_recovered": ("counter", "FEC ile kurtarılan paketler"),
+    "nacks_sent": ("counter", "Gönderilen NACK mesajları"),
+    "retransmits_received": ("counter", "Alınan yeniden gönderimler"),
+    "reports_sent": ("counter", "Göndericiye yollanan alıcı raporları"),
+    "play_errors": ("counter", "Çalma hataları"),
+    "jitter_ms": ("gauge", "Varışlar arası titreşim tahmini (ms)"),
+    "buffer_depth": ("gauge", "Jitter tamponu derinliği (çerçeve)"),
+    "buffer_target": ("gauge", "Jitter tamponu hedef derinliği (çerçeve)"),
+    "drift_ppm": ("gauge", "Saat kayması telafisi (ppm)"),
+    "clock_offset_ms": ("gauge", "Yerel saat ile gönderici saati arasındaki fark (ms)"),
+    "rtt_ms": ("gauge", "Göndericinin ölçtüğü en küçük gidiş-dönüş süresi (ms)"),
+    "sources": ("gauge", "Çalınan kaynak (gönderici akışı) sayısı"),
+    "sources_evicted": ("counter", "Sessiz kaldığı için atılan kaynaklar"),
+    "sources_rejected": ("counter", "Kaynak sınırı dolu olduğu için atılan paketler"),
+    "mix_limited": ("counter", "Karıştırmada sınırlayıcının devreye girdiği bloklar"),
+    # Histogramlar
+    "capture_to_send_ms": ("histogram", "Yakalamadan gönderime süre (ms)"),
+    "receive_to_play_ms": ("histogram", "Varıştan çalmaya süre (ms)"),
+    "network_delay_ms": ("histogram", "Paket başına yakalamadan varışa süre (ms)"),
+    "glass_to_glass_ms": ("histogram", "Yakalamadan çalma aygıtına teslime süre (ms)"),
+}
+
+_registry = weakref.WeakSet()
+
+class Histogram:
+    """
+    Sabit kovalı histogram. Tek bir thread `observe` çağırır; okuyucular kilit
+    almadan `snapshot` alır.
+    """
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Kova sınırlarından kaba bir yüzdelik tahmini (son kova: son sınır)."""
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, n in zip(self.bounds, counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+    def snapshot(self):
+        """Birikimli kovalarla {"count", "sum", "buckets": [(sınır, n), ...], "p50", "p99"} döndürür."""
+        counts = list(self.counts)
+        buckets = []
+        seen = 0
+        for bound, n in zip(self.bounds, counts):
+            seen += n
+            buckets.append((bound, seen))
+        buckets.append((float("inf"), seen + counts[-1]))
+        return {"count": buckets[-1][1], "sum": self.sum, "buckets": buckets,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+class Stats:
+    """
+    Bir akışın (gönderici veya alıcı) istatistikleri. Sayaçlar sahibinin
+    özniteliklerinde durur; `add_source` ile verilen fonksiyonlar anlık
+    görüntüde onları {ad: değer} olarak döndürür.
+    """
+    def __init__(self, role, **labels):
+        self.role = role
+        self.labels = {key: str(value) for key, value in labels.items()}
+        self.histograms = {}
+        self._sources = []
+        _registry.add(self)
+
+    def histogram(self, name, bounds=LATENCY_BUCKETS_MS):
+        """Adlandırılmış bir histogram oluşturur (varsa onu döndürür)."""
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram(bounds)
+        return hist
+
+    def add_source(self, source):
+        """Anlık görüntüde çağrılacak, {ad: değer} döndüren bir fonksiyon ekler."""
+        self._sources.append(source)
+
+    def snapshot(self):
+        """Tüm sayaç ve göstergeleri, histogramları da sözlük olarak döndürür."""
+        values = {}
+        for source in self._sources:
+            try:
+                values.update(source())
+            except Exception as e:
+                # Akış yeniden başlarken nesneler değişiyor olabilir
+                print(f"İstatistik okunamadı: {e}")
+        for name, hist in self.histograms.items():
+            values[name] = hist.snapshot()
+        return values
+
+    def to_prometheus(self):
+        """Anlık görüntüyü Prometheus metin biçimi satırları olarak döndürür (başlıksız)."""
+        label_items = [("role", self.role)] + sorted(self.labels.items())
+        lines = []
+        for name, value in self.snapshot().items():
+            if value is None:
+                continue
+            kind = METRICS.get(name, ("gauge",))[0]
+            metric = METRIC_PREFIX + name
+            if kind == "histogram":
+                for bound, n in value["buckets"]:
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append((metric, kind, f"{metric}_bucket{_labels(label_items + [('le', le)])} {n}"))
+                lines.append((metric, kind, f"{metric}_sum{_labels(label_items)} {value['sum']:g}"))
+                lines.append((metric, kind, f"{metric}_count{_labels(label_items)} {value['count']}"))
+            else:
+                if kind == "counter":
+                    metric += "_total"
+                lines.append((metric, kind, f"{metric}{_labels(label_items)} {value:g}"))
+        return lines
+
+def _labels(items):
+    body = ",".join(f'{key}="{value}"' for key, value in items)
+    return "{" + body + "}"
+
+def collect():
+    """Kayıtlı tüm akışların metriklerini Prometheus metin biçiminde döndürür."""
+    families = {}
+    for stats in list(_registry):
+        for metric, kind, line in stats.to_prometheus():
+            families.setdefault(metric, (kind, []))[1].append(line)
+    out = []
+    for metric, (kind, lines) in sorted(families.items()):
+        base = metric[len(METRIC_PREFIX):]
+        if kind == "counter":
+            base = base[:-len("_total")]
+        help_text = METRICS.get(base, ("gauge", base))[1]
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = collect().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """
+    `/metrics` adresinde Prometheus metin biçimi sunan HTTP sunucusunu arka
+    planda başlatır ve sunucuyu döndürür (`shutdown()` ile durdurulur).
+    Varsayılan olarak yalnızca yerel makineden erişilebilir.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"📈  Metrikler: http://{host}:{port}/metrics")
+    return server
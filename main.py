@@ -4,8 +4,10 @@
 Ana uygulama giriş noktası.
 """
 
-from ui.main_window import App
 if __name__ == "__main__":
+    # Ses motoru süreci (bkz. core.engine) bu modülü yeniden içe aktarır;
+    # arayüz yalnızca ana süreçte yüklenir.
+    from ui.main_window import App
     app = App()
     try:
         app.iconbitmap("favicon.ico")
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Kodeklerin gidiş-dönüş davranışı; kayıpsız kodek bit bit aynı (core.codecs)."""
+
+import numpy as np
+import pytest
+
+from core import codecs
+
+RATE = 48000
+N = 480
+
+def _sine(channels=2, amplitude=20000):
+    t = np.arange(N) / RATE
+    left = amplitude * np.sin(2 * np.pi * 440 * t)
+    right = amplitude * np.sin(2 * np.pi * 660 * t + 1.0)
+    return np.stack([left, right][:channels], axis=1).round().astype(np.int16)
+
+def _noise(channels=2, seed=1):
+    return np.random.default_rng(seed).integers(-32768, 32768, (N, channels), dtype=np.int16)
+
+def _extremes(channels=2):
+    pcm = np.empty((N, channels), dtype=np.int16)
+    pcm[0::2] = 32767
+    pcm[1::2] = -32768
+    return pcm
+
+BLOCKS = {
+    "sine": _sine(),
+    "sine_mono": _sine(channels=1),
+    "noise": _noise(),
+    "noise_mono": _noise(channels=1),
+    "silence": np.zeros((N, 2), dtype=np.int16),
+    "extremes": _extremes(),
+    "dc": np.full((N, 2), -12345, dtype=np.int16),
+    "identical_channels": np.repeat(_sine(channels=1), 2, axis=1),
+}
+
+def _decode(codec, payload, shape):
+    out = np.empty(shape, dtype=np.int16)
+    return codec.decode(payload, out)
+
+@pytest.mark.parametrize("name", sorted(BLOCKS))
+def test_lossless_is_bit_exact(name):
+    codec = codecs.get_codec("lossless")
+    pcm = BLOCKS[name]
+    payload = codec.encode(pcm)
+    assert len(payload) <= pcm.nbytes + codec.overhead
+    np.testing.assert_array_equal(_decode(codec, payload, pcm.shape), pcm)
+
+@pytest.mark.parametrize("name", sorted(BLOCKS))
+def test_pcm16_is_bit_exact(name):
+    codec = codecs.get_codec("pcm16")
+    pcm = BLOCKS[name]
+    payload = codec.encode(pcm)
+    assert len(payload) == pcm.nbytes
+    np.testing.assert_array_equal(_decode(codec, payload, pcm.shape), pcm)
+
+def test_lossless_compresses_tone_and_falls_back_on_noise():
+    codec = codecs.get_codec("lossless")
+    tone = codec.encode(BLOCKS["sine"])
+    assert len(tone) < BLOCKS["sine"].nbytes * 0.8
+    noise = codec.encode(BLOCKS["noise"])
+    assert noise[0] == codecs.VERBATIM
+    assert len(noise) == BLOCKS["noise"].nbytes + 1
+
+def test_mulaw_round_trip_within_quantization():
+    codec = codecs.get_codec("mulaw")
+    pcm = BLOCKS["sine"]
+    payload = codec.encode(pcm)
+    assert len(payload) == pcm.size
+    decoded = _decode(codec, payload, pcm.shape).astype(np.int32)
+    error = np.abs(decoded - pcm.astype(np.int32))
+    # µ-law hatası genliğe orantılı: 8 bitte en fazla ~%3
+    assert np.all(error <= np.abs(pcm.astype(np.int32)) * 0.035 + 8)
+    # Kodlanmış değerin tekrar kodlanması değişmez
+    assert codec.encode(decoded.astype(np.int16)) == payload
+
+@pytest.mark.parametrize("codec", sorted(codecs.CODECS_BY_NAME))
+@pytest.mark.parametrize("name", ["sine", "noise_mono", "silence"])
+def test_encode_into_matches_encode(codec, name):
+    codec = codecs.get_codec(codec)
+    pcm = BLOCKS[name]
+    out = np.full(pcm.nbytes + codec.overhead + 16, 0xAA, dtype=np.uint8)
+    size = codec.encode_into(pcm, out)
+    assert out[:size].tobytes() == codec.encode(pcm)
+    assert np.all(out[size:] == 0xAA)
+
+def test_encode_into_reuses_scratch_across_shapes():
+    codec = codecs.get_codec("lossless")
+    for pcm in (BLOCKS["sine"], BLOCKS["sine_mono"], _sine()[:120], BLOCKS["sine"]):
+        out = np.empty(pcm.nbytes + 1, dtype=np.uint8)
+        size = codec.encode_into(pcm, out)
+        np.testing.assert_array_equal(_decode(codec, out[:size].tobytes(), pcm.shape), pcm)
+
+def test_get_codec():
+    for codec in codecs.CODECS.values():
+        assert codecs.get_codec(codec.id) is codec
+        assert codecs.get_codec(codec.name) is codec
+    with pytest.raises(ValueError):
+        codecs.get_codec("opus")
+    with pytest.raises(ValueError):
+        codecs.get_codec(99)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""Ayar deposunun biriktirmeli kaydı, geçersiz kılmaları ve taşıması (utils.config_manager)."""
+
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from utils.config_manager import CONFIG_ENV, OVERRIDE_PREFIX, SettingsStore
+
+DELAY = 0.05
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for key in list(os.environ):
+        if key.startswith(OVERRIDE_PREFIX) or key == CONFIG_ENV:
+            monkeypatch.delenv(key)
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _wait_for_save(store, saves=1, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while store.saves < saves and time.monotonic() < deadline:
+        time.sleep(DELAY / 5)
+    return store.saves
+
+def test_sets_are_debounced_into_one_save(tmp_path):
+    path = tmp_path / "config.json"
+    store = SettingsStore(str(path), delay=DELAY)
+    for i in range(20):
+        store.set("volume", i)
+    store.set("language", "tr")
+    assert store.saves == 0 and not path.exists()
+    assert _wait_for_save(store) == 1
+    time.sleep(DELAY * 3)
+    assert store.saves == 1
+    assert _read(path) == {"volume": 19, "language": "tr"}
+
+def test_unchanged_value_does_not_save(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"volume": 3}), encoding="utf-8")
+    store = SettingsStore(str(path), delay=DELAY)
+    store.set("volume", 3)
+    assert store.flush() and store.saves == 0
+
+def test_reads_are_served_from_memory(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"volume": 3}), encoding="utf-8")
+    store = SettingsStore(str(path), delay=60)
+    assert store.get("volume") == 3
+    path.write_text(json.dumps({"volume": 7}), encoding="utf-8")
+    assert store.get("volume") == 3
+    assert store.get("missing", "default") == "default"
+
+def test_overrides_win_and_are_not_written(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"multicast_group": "239.1.1.1", "port": 5555}), encoding="utf-8")
+    monkeypatch.setenv(OVERRIDE_PREFIX + "MULTICAST_GROUP", "239.0.0.1")
+    monkeypatch.setenv(OVERRIDE_PREFIX + "BUFFER", "3")
+    store = SettingsStore(str(path), delay=60)
+    store.set_override("port", 6000)
+    assert store.get("multicast_group") == "239.0.0.1"
+    assert store.get("buffer") == 3  # JSON olarak çözülür
+    assert store.get("port") == 6000
+    assert store.all() == {"multicast_group": "239.0.0.1", "port": 6000, "buffer": 3}
+
+    store.set("language", "en")
+    assert store.flush()
+    assert _read(path) == {"multicast_group": "239.1.1.1", "port": 5555, "language": "en"}
+
+def test_config_env_is_not_an_override(tmp_path, monkeypatch):
+    monkeypatch.setenv(CONFIG_ENV, str(tmp_path / "other.json"))
+    store = SettingsStore(str(tmp_path / "config.json"), delay=60)
+    assert "config" not in store.all()
+
+def test_legacy_file_is_copied_and_left_in_place(tmp_path):
+    legacy = tmp_path / "old" / "config.json"
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps({"language": "tr"}), encoding="utf-8")
+    path = tmp_path / "new" / "config.json"
+    store = SettingsStore(str(path), delay=60, legacy_path=str(legacy))
+    assert store.get("language") == "tr"
+    store.set("volume", 4)
+    assert store.flush()
+    assert _read(path) == {"language": "tr", "volume": 4}
+    assert _read(legacy) == {"language": "tr"}
+    assert sorted(os.listdir(legacy.parent)) == ["config.json"]
+    # Yeni dosya varken eski dosya bir daha okunmaz
+    assert SettingsStore(str(path), delay=60, legacy_path=str(legacy)).get("volume") == 4
+
+def test_corrupt_legacy_file_is_not_touched(tmp_path):
+    legacy = tmp_path / "old" / "config.json"
+    legacy.parent.mkdir()
+    legacy.write_text("{bozuk", encoding="utf-8")
+    store = SettingsStore(str(tmp_path / "config.json"), delay=60, legacy_path=str(legacy))
+    assert store.all() == {}
+    assert legacy.read_text(encoding="utf-8") == "{bozuk"
+    assert sorted(os.listdir(legacy.parent)) == ["config.json"]
+
+def test_existing_file_takes_precedence_over_legacy(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"language": "tr"}), encoding="utf-8")
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"language": "en"}), encoding="utf-8")
+    store = SettingsStore(str(path), delay=60, legacy_path=str(legacy))
+    assert store.get("language") == "en"
+    assert store.flush() and store.saves == 0
+    assert legacy.exists()
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX izinleri")
+def test_save_keeps_file_permissions(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o644)
+    store = SettingsStore(str(path), delay=60)
+    store.set("volume", 5)
+    assert store.flush()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert _read(path) == {"volume": 5}
+
+def test_corrupt_file_is_kept_as_backup(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{bozuk", encoding="utf-8")
+    store = SettingsStore(str(path), delay=60)
+    assert store.get("volume", 1) == 1
+    assert (tmp_path / "config.json.bak").read_text(encoding="utf-8") == "{bozuk"
+    store.set("volume", 2)
+    assert store.flush()
+    assert _read(path) == {"volume": 2}
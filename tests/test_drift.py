@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""Saat kayması telafisinin benzetimle sınanması (core.drift)."""
+
+import numpy as np
+import pytest
+
+from core.drift import DriftCompensator
+from core.jitter_buffer import JitterBuffer
+
+RATE = 48000
+FRAMES = 480
+FRAME_S = FRAMES / RATE
+
+def _run(ppm, seconds, jitter_s=0.0, min_depth=2, seed=3):
+    """
+    Gönderici saati `ppm` kadar hızlıyken çalmayı benzetir: paketler kendi
+    temposunda gelir, aygıt yeniden örneklenmiş her çerçeveyi kendi saatiyle
+    tüketir. Telafiyi ve tamponu döndürür.
+    """
+    rng = np.random.default_rng(seed)
+    jb = JitterBuffer(rate=RATE, frames=FRAMES, channels=1, min_depth=min_depth)
+    drift = DriftCompensator(RATE, FRAMES, 1)
+    pcm = np.zeros((FRAMES, 1), dtype=np.int16)
+    period = FRAME_S / (1 + ppm * 1e-6)
+    next_send, seq, t_play = 0.0, 0, 0.0
+    while t_play < seconds:
+        while next_send <= t_play:
+            arrival = next_send + (rng.uniform(0, jitter_s) if jitter_s else 0.0)
+            jb.push(seq & 0xFFFF, pcm, arrival)
+            seq += 1
+            next_send += period
+        if not jb.buffering:
+            drift.update(jb.depth, jb.shifted)
+        frame = jb.pop()
+        if frame is None:
+            t_play += FRAME_S
+            continue
+        t_play += len(drift.process(frame)) / RATE
+    return drift, jb
+
+@pytest.mark.parametrize("jitter_s", [0.0, 0.002])
+def test_same_clock_stays_near_zero(jitter_s):
+    # Aynı saat: düzeltme birkaç on ppm içinde kalmalı, tampon kendi düzeltmesini yapmamalı
+    drift, jb = _run(0, 120, jitter_s)
+    assert drift.reference is not None
+    assert abs(drift.ppm) < 30
+    assert jb.dropped == 0 and jb.underruns == 0
+
+def test_same_clock_with_deeper_buffer():
+    # Hedef derinlik ne olursa olsun sabit bir sapma birikmemeli
+    drift, _ = _run(0, 120, 0.001, min_depth=4)
+    assert abs(drift.ppm) < 30
+
+@pytest.mark.parametrize("ppm", [-500, -100, 100, 500])
+def test_learns_clock_difference(ppm):
+    drift, jb = _run(ppm, 300, 0.002)
+    assert drift.ppm == pytest.approx(ppm, abs=30)
+    assert jb.dropped == 0 and jb.underruns == 0
+
+def test_no_correction_while_settling():
+    drift = DriftCompensator(RATE, FRAMES, 1)
+    for _ in range(10):
+        drift.update(5)
+    assert drift.reference is None
+    assert drift.ratio == 1.0
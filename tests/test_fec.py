@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""XOR eşlik paketleriyle grup başına tek kaybın kurtarılması (core.fec)."""
+
+import pytest
+
+from core.fec import PENDING_AGE, FecDecoder, FecEncoder
+
+COUNT = 2  # Paket başına çerçeve
+
+def _payload(seq):
+    # Uzunlukları farklı yükler: eşlik en uzun yük boyunda olmalı
+    return bytes((seq * 7 + i) & 0xFF for i in range(40 + seq % 5))
+
+def _stream(first, packets, group, interleave=1):
+    """(veri paketleri, eşlik paketleri) döndürür; eşlikler kendi grubunun son paketinden sonra gelir."""
+    encoder = FecEncoder(group, interleave)
+    data = []
+    parities = {}
+    for i in range(packets):
+        seq = (first + i * COUNT) & 0xFFFF
+        data.append((seq, COUNT, _payload(seq)))
+        parity = encoder.add(seq, COUNT, _payload(seq))
+        if parity is not None:
+            parities[i] = parity
+    return data, parities
+
+def _deliver(decoder, data, parities, lost):
+    recovered = {}
+    for i, (seq, count, payload) in enumerate(data):
+        if i not in lost:
+            for r in decoder.add_packet(seq, count, payload):
+                recovered[r[0]] = r
+        if i in parities:
+            _, group, body = parities[i]
+            for r in decoder.add_parity(body, group):
+                recovered[r[0]] = r
+    return recovered
+
+def test_encoder_emits_one_parity_per_group():
+    data, parities = _stream(0, 12, group=4)
+    assert sorted(parities) == [3, 7, 11]
+    first, group, _ = parities[7]
+    assert (first, group) == (data[4][0], 4)
+    with pytest.raises(ValueError):
+        FecEncoder(group=1)
+
+@pytest.mark.parametrize("position", range(4))
+def test_recovers_one_lost_packet_per_group(position):
+    data, parities = _stream(100, 16, group=4)
+    lost = {g * 4 + position for g in range(4)}
+    decoder = FecDecoder()
+    recovered = _deliver(decoder, data, parities, lost)
+    assert sorted(recovered) == sorted(data[i][0] for i in lost)
+    for i in lost:
+        assert recovered[data[i][0]] == data[i]
+    assert decoder.recovered == 4
+    assert decoder.span == 3 * COUNT + COUNT
+
+def test_recovers_when_missing_packet_arrives_after_parity():
+    # İki eksik varken eşlik bekletilir; biri geç gelince diğeri kurtarılır
+    data, parities = _stream(0, 4, group=4)
+    decoder = FecDecoder()
+    assert _deliver(decoder, data, parities, lost={1, 2}) == {}
+    assert decoder.add_packet(*data[2]) == [data[1]]
+    assert decoder.pending == []
+
+def test_two_losses_in_a_group_are_unrecoverable():
+    data, parities = _stream(0, 4, group=4)
+    decoder = FecDecoder()
+    assert _deliver(decoder, data, parities, lost={0, 3}) == {}
+    assert decoder.recovered == 0
+    # Grup yeterince geride kalınca vazgeçilir
+    later = (PENDING_AGE + 10) * COUNT
+    decoder.add_packet(later, COUNT, _payload(later))
+    assert decoder.unrecoverable == 2
+    assert decoder.pending == []
+
+def test_interleave_recovers_a_burst():
+    # D=2 ile ardışık iki kayıp farklı gruplara düşer
+    data, parities = _stream(0, 8, group=4, interleave=2)
+    assert sorted(parities) == [6, 7]
+    recovered = _deliver(FecDecoder(), data, parities, lost={2, 3})
+    assert sorted(recovered) == [data[2][0], data[3][0]]
+    assert recovered[data[3][0]] == data[3]
+
+def test_recovers_across_sequence_wraparound():
+    data, parities = _stream(0xFFFA, 8, group=4)
+    assert data[3][0] < data[2][0]
+    decoder = FecDecoder()
+    recovered = _deliver(decoder, data, parities, lost={2, 5})
+    assert recovered == {data[2][0]: data[2], data[5][0]: data[5]}
+    assert decoder.span == 4 * COUNT
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""Jitter tamponunun sıra, sarma ve gizleme davranışı (core.jitter_buffer)."""
+
+import numpy as np
+
+from core.jitter_buffer import MAX_CONCEAL, PCM_SCALE, JitterBuffer
+
+FRAMES = 8
+
+def _frame(value):
+    return np.full((FRAMES, 1), value, dtype=np.int16)
+
+def _buffer(min_depth=1):
+    return JitterBuffer(rate=800, frames=FRAMES, channels=1, min_depth=min_depth, max_depth=16)
+
+def _value(frame):
+    """Çerçevenin (sabit) değerini int16 ölçeğinde döndürür."""
+    return int(round(float(frame[0, 0]) / PCM_SCALE))
+
+def test_plays_in_order():
+    jb = _buffer()
+    for seq in range(4):
+        assert jb.push(seq, _frame(seq * 100 + 1))
+    assert [_value(jb.pop()) for _ in range(4)] == [1, 101, 201, 301]
+    assert jb.concealed == 0 and jb.late == 0
+
+def test_waits_for_target_depth():
+    jb = _buffer(min_depth=3)
+    jb.push(0, _frame(1))
+    jb.push(1, _frame(2))
+    assert jb.pop() is None
+    jb.push(2, _frame(3))
+    assert _value(jb.pop()) == 1
+
+def test_reorders_out_of_order_packets():
+    jb = _buffer(min_depth=4)
+    for seq in (0, 2, 1, 3):
+        jb.push(seq, _frame(seq + 1))
+    assert jb.reordered == 1
+    assert [_value(jb.pop()) for _ in range(4)] == [1, 2, 3, 4]
+
+def test_sequence_wraparound():
+    jb = _buffer(min_depth=2)
+    seqs = [0xFFFE, 0xFFFF, 0, 1, 2]
+    for i, seq in enumerate(seqs):
+        jb.push(seq, _frame(i + 1))
+    assert jb.highest - jb.next_seq + 1 == len(seqs)
+    assert [_value(jb.pop()) for _ in seqs] == [1, 2, 3, 4, 5]
+    assert jb.gaps == 0 and jb.late == 0
+
+def test_reordered_across_wraparound():
+    jb = _buffer(min_depth=3)
+    for seq, value in ((0xFFFF, 1), (1, 3), (0, 2)):
+        jb.push(seq, _frame(value))
+    assert [_value(jb.pop()) for _ in range(3)] == [1, 2, 3]
+
+def test_conceals_missing_frame_with_decay():
+    jb = _buffer()
+    jb.push(0, _frame(1000))
+    jb.push(2, _frame(3000))
+    assert _value(jb.pop()) == 1000
+    concealed = jb.pop()
+    assert jb.concealed == 1
+    # Son çerçeve sönümlenerek tekrarlanır: 1000'den yarısına iner
+    assert abs(concealed[:, 0] / PCM_SCALE).max() <= 1000.5
+    assert abs(concealed[-1, 0] / PCM_SCALE) < 1000
+    frame = jb.pop()
+    assert _value(frame[-1:]) == 3000
+
+def test_long_loss_fades_to_silence():
+    jb = _buffer()
+    jb.push(0, _frame(1000))
+    jb.push(MAX_CONCEAL + 1, _frame(2000))
+    jb.pop()
+    for _ in range(MAX_CONCEAL):
+        out = jb.pop()
+    assert jb.concealed == MAX_CONCEAL
+    assert out[-1, 0] == 0.0
+
+def test_late_and_duplicate_packets_are_dropped():
+    jb = _buffer()
+    jb.push(0, _frame(1))
+    jb.push(1, _frame(2))
+    jb.pop()
+    assert not jb.push(0, _frame(9))
+    assert jb.late == 1
+    assert not jb.push(1, _frame(2))
+    assert jb.duplicates == 1
+
+def test_late_packet_fills_gap_before_playout():
+    jb = _buffer()
+    jb.push(0, _frame(1))
+    jb.push(2, _frame(3))
+    assert jb.gaps == 1
+    jb.pop()
+    assert jb.push(1, _frame(2))
+    assert _value(jb.pop()) == 2
+    assert jb.concealed == 0
+
+def test_underrun_rebuffers():
+    jb = _buffer(min_depth=2)
+    jb.push(0, _frame(1))
+    jb.push(1, _frame(2))
+    jb.pop()
+    jb.pop()
+    jb.pop()
+    assert jb.underruns == 1
+    assert jb.buffering
+    jb.push(2, _frame(3))
+    assert jb.pop() is None
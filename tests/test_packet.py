@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Paket başlığının ağ biçimi (core.packet)."""
+
+import pytest
+
+from core import packet
+
+FIELDS = dict(seq=0xFFFE, codec=packet.PCM16, channels=2, count=3, rate=48000, samples=480,
+              flags=packet.FLAG_FEC, timestamp=0xDEADBEEF, stream=0x1A2B3C4D)
+
+def _datagram(payload_len=None, **overrides):
+    fields = dict(FIELDS, **overrides)
+    header = packet.pack_header(**fields)
+    if payload_len is None:
+        payload_len = fields["count"] * packet.frame_bytes(fields["samples"], fields["channels"])
+    return header + bytes(payload_len)
+
+def test_round_trip():
+    data = _datagram()
+    hdr = packet.parse_header(data, len(data))
+    assert hdr == (FIELDS["seq"], FIELDS["flags"], FIELDS["codec"], FIELDS["channels"],
+                   FIELDS["count"], FIELDS["rate"], FIELDS["samples"], FIELDS["timestamp"],
+                   FIELDS["stream"])
+
+def test_pack_into_matches_pack():
+    buf = bytearray(packet.HEADER.size)
+    packet.pack_header_into(buf, **FIELDS)
+    assert bytes(buf) == packet.pack_header(**FIELDS)
+
+def test_parse_accepts_memoryview_with_trailing_space():
+    data = _datagram()
+    buf = bytearray(packet.MAX_PACKET)
+    buf[:len(data)] = data
+    assert packet.parse_header(memoryview(buf), len(data))[0] == FIELDS["seq"]
+
+@pytest.mark.parametrize("offset, value", [(0, 0x00), (1, packet.VERSION - 1)])
+def test_rejects_foreign_magic_and_version(offset, value):
+    data = bytearray(_datagram())
+    data[offset] = value
+    assert packet.parse_header(data, len(data)) is None
+
+def test_rejects_short_and_inconsistent_pcm():
+    data = _datagram()
+    assert packet.parse_header(data, packet.HEADER.size) is None
+    assert packet.parse_header(data[:-1], len(data) - 1) is None
+    assert packet.parse_header(_datagram(channels=0), len(_datagram(channels=0))) is None
+
+def test_parity_and_other_codecs_skip_pcm_length_check():
+    parity = _datagram(payload_len=17, flags=packet.FLAG_PARITY)
+    assert packet.parse_header(parity, len(parity)) is not None
+    coded = _datagram(payload_len=100, codec=1)
+    assert packet.parse_header(coded, len(coded)) is not None
+
+def test_with_flags_copies():
+    data = _datagram(flags=0)
+    flagged = packet.with_flags(data, packet.FLAG_RETRANSMIT)
+    assert packet.parse_header(flagged, len(flagged))[1] == packet.FLAG_RETRANSMIT
+    assert packet.parse_header(data, len(data))[1] == 0
+
+def test_frames_per_packet_fits_mtu():
+    frame = packet.frame_bytes(120, 2)  # 2.5 ms stereo at 48 kHz: 480 bytes
+    count = packet.frames_per_packet(120, 2, 10)
+    assert count == (packet.DEFAULT_MTU - packet.HEADER.size) // frame
+    assert packet.HEADER.size + count * frame <= packet.DEFAULT_MTU
+    assert packet.frames_per_packet(120, 2, 1) == 1
+    # Tek çerçeve bile sığmıyorsa yine de bir çerçeve gönderilir
+    assert packet.frames_per_packet(480, 2, 4) == 1
+
+def test_frames_per_packet_counts_codec_overhead():
+    # Tam sığan durumda kodeğin ek baytı bir çerçeveyi dışarıda bırakır
+    samples = 121
+    frame = packet.frame_bytes(samples, 1)
+    mtu = packet.HEADER.size + 5 * frame
+    assert packet.frames_per_packet(samples, 1, 10, mtu) == 5
+    assert packet.frames_per_packet(samples, 1, 10, mtu, overhead=1) == 4
+
+def test_frame_samples():
+    assert packet.frame_samples(48000, 10) == 480
+    assert packet.frame_samples(44100, 2.5) == 110
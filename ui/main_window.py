@@ -2,18 +2,20 @@
 
 """
 Uygulamanın ana arayüz penceresi.
+
+Açılışta yalnızca pencere için gerekenler yüklenir: numpy ve soundcard
+gönderici penceresi aygıtları listelediğinde (ses ise ayrı bir süreçte,
+bkz. core.engine), PIL ve pystray pencere göründükten sonra tepsi
+simgesinin kendi thread'inde yüklenir. Tepsi simgesi bir kez oluşturulur
+ve uygulama kapanana kadar kullanılır.
 """
 
 import customtkinter
-from core.audio_sender import AudioSender
-from core.audio_receiver import AudioReceiver
-from utils.device_manager import get_loopback_devices
-from utils.config_manager import load_setting, save_setting
-from core.network_discovery import Announcer, Listener
+from core.engine import Engine
+from utils.config_manager import flush as flush_settings, load_setting, save_setting
+from core.network_discovery import Listener
 from utils.localization import i18n, set_language
 import threading
-from PIL import Image
-import pystray
 
 customtkinter.set_appearance_mode("dark")
 customtkinter.set_default_color_theme("blue")
@@ -36,39 +38,51 @@ class App(customtkinter.CTk):
 
         self.show_main_menu()
 
-        self.audio_sender = None
-        self.audio_receiver = None
-        self.announcer = None
+        # Gönderici ve alıcı ayrı bir süreçte çalışır (bkz. core.engine);
+        # arayüzdeki çizimler ve zamanlayıcılar ses döngüsünü geciktiremez.
+        # Motor süreci ilk gönderim veya dinlemede başlar.
+        self.engine = Engine()
         self.listener = None
+        self.device_registry = None  # Aygıt önbelleği; pencereler arasında korunur
         self.tray_icon = None
-        self.setup_tray_icon()
+        # Tepsi simgesi pencere çizildikten sonra kurulur
+        self.after_idle(self.setup_tray_icon)
 
     def setup_tray_icon(self):
+        if self.tray_icon is not None:
+            return
+        # pystray'i (ve PIL'i) ayrı bir thread'de yükleyip çalıştır
+        tray_thread = threading.Thread(target=self._run_tray_icon)
+        tray_thread.daemon = True
+        tray_thread.start()
+
+    def _run_tray_icon(self):
         try:
+            import pystray
+            from PIL import Image
             image = Image.open("favicon.ico")
             menu = (pystray.MenuItem('Göster', self.show_window, default=True),
                     pystray.MenuItem('Çıkış', self.quit_app))
             self.tray_icon = pystray.Icon("Yakamoz", image, "Yakamoz", menu)
-            
-            # pystray'i ayrı bir thread'de çalıştır
-            tray_thread = threading.Thread(target=self.tray_icon.run)
-            tray_thread.daemon = True
-            tray_thread.start()
+            self.tray_icon.run()
         except Exception as e:
             print(f"Tray icon oluşturulamadı: {e}")
+            self.tray_icon = None
 
     def show_window(self):
-        self.tray_icon.stop()
+        # Tepsi thread'inden çağrılır
         self.after(0, self.deiconify)
 
     def hide_window(self):
-        self.withdraw()
-        self.setup_tray_icon()
+        # Tepsi simgesi yoksa pencere geri getirilebilsin diye yalnızca küçültülür
+        if self.tray_icon:
+            self.withdraw()
+        else:
+            self.iconify()
 
     def quit_app(self):
-        if self.tray_icon:
-            self.tray_icon.stop()
-        self.on_closing(force_quit=True)
+        # Tepsi thread'inden çağrılır; kapatma Tk thread'inde yapılır
+        self.after(0, self.on_closing, True)
 
     def change_language(self, language):
         set_language(language)
@@ -86,48 +100,40 @@ class App(customtkinter.CTk):
     def show_main_menu(self):
         self.show_frame(MainMenuFrame)
 
+    def sender_status(self):
+        """Motordaki göndericinin son durumu (çalışmıyorsa None)."""
+        return self.engine.sender_status()
+
     def start_sender(self, ip_address, device_name):
-        if not self.audio_sender:
-            self.audio_sender = AudioSender(dest_ip=ip_address, device=device_name)
-            if self.audio_sender.start_streaming():
-                print("Gönderim başladı.")
-                return True
+        # ip_address virgülle ayrılmış birden çok hedef veya bir çoklu yayın grubu olabilir.
+        if self.engine.start_sender(ip_address, device_name):
+            print("Gönderim başladı.")
+            return True
         return False
 
     def stop_sender(self):
-        if self.audio_sender:
-            self.audio_sender.stop_streaming()
-            self.audio_sender = None
+        if self.engine.stop_sender():
             print("Gönderim durduruldu.")
 
     def start_receiver(self):
-        if not self.audio_receiver:
-            self.audio_receiver = AudioReceiver()
-            if self.audio_receiver.start_listening():
-                print("Dinleme başladı.")
-                # Duyuruyu başlat
-                if not self.announcer:
-                    self.announcer = Announcer()
-                    self.announcer.start()
-                return True
+        # Alıcı motorda ağda duyuru da yapar
+        if self.engine.start_receiver(multicast_group=load_setting("multicast_group")):
+            print("Dinleme başladı.")
+            return True
         return False
 
     def stop_receiver(self):
-        if self.audio_receiver:
-            self.audio_receiver.stop_listening()
-            self.audio_receiver = None
+        if self.engine.stop_receiver():
             print("Dinleme durduruldu.")
-        # Duyuruyu durdur
-        if self.announcer:
-            self.announcer.stop()
-            self.announcer = None
 
     def on_closing(self, force_quit=False):
         if not force_quit:
             self.hide_window()
         else:
-            self.stop_sender()
-            self.stop_receiver()
+            if self.tray_icon:
+                self.tray_icon.stop()
+            self.engine.stop()
+            flush_settings()
             if self.listener:
                 self.listener.stop()
             self.destroy()
@@ -184,7 +190,7 @@ class SenderFrame(customtkinter.CTkFrame):
 
         self.ip_label = customtkinter.CTkLabel(self, text=i18n.get("target_ip_label"))
         self.ip_label.grid(row=0, column=0, padx=20, pady=(20, 5), sticky="w")
-        self.ip_entry = customtkinter.CTkEntry(self, placeholder_text="192.168.1.100")
+        self.ip_entry = customtkinter.CTkEntry(self, placeholder_text="192.168.1.100, 192.168.1.101")
         self.ip_entry.grid(row=1, column=0, padx=20, pady=5, sticky="ew")
         last_ip = load_setting("last_ip", "")
         if last_ip:
@@ -192,7 +198,13 @@ class SenderFrame(customtkinter.CTkFrame):
 
         self.device_label = customtkinter.CTkLabel(self, text=i18n.get("audio_device_label"))
         self.device_label.grid(row=2, column=0, padx=20, pady=(10, 5), sticky="w")
-        self.devices = get_loopback_devices()
+        if not self.master.device_registry:
+            # Ses arka ucu (numpy, soundcard) ilk kez burada yüklenir
+            from core.device_registry import get_registry
+            self.master.device_registry = get_registry()
+        self.registry = self.master.device_registry.acquire()
+        self.registry.subscribe(self.on_devices_changed)
+        self.devices = self.registry.loopback_devices()
         self.device_menu = customtkinter.CTkOptionMenu(self, values=self.devices if self.devices else [i18n.get("device_not_found")])
         self.device_menu.grid(row=3, column=0, padx=20, pady=5, sticky="ew")
         if not self.devices:
@@ -219,33 +231,77 @@ class SenderFrame(customtkinter.CTkFrame):
         self.back_button.grid(row=9, column=0, padx=20, pady=(20, 0))
 
         self.ping_update_job = None
+        self.sending = False
         self.start_discovery()
 
         # Eğer zaten bir gönderim işlemi varsa arayüzü güncelle
-        if self.master.audio_sender and self.master.audio_sender.streaming:
+        sender = self.master.sender_status()
+        if sender and sender["streaming"]:
             self.start_button.configure(state="disabled")
             self.stop_button.configure(state="normal")
             self.device_menu.configure(state="disabled")
             self.discovery_menu.configure(state="disabled")
             self.ip_entry.delete(0, "end")
-            self.ip_entry.insert(0, self.master.audio_sender.dest_ip)
+            self.ip_entry.insert(0, sender["dest_ip"])
+            self.sending = True
+            self.update_ping_label()
+
+    def on_devices_changed(self, old, new):
+        # Kayıt defteri thread'inden çağrılır; arayüz güncellemesi Tk thread'inde yapılır.
+        try:
+            self.after(0, self.refresh_devices)
+        except Exception:
+            pass
+
+    def refresh_devices(self):
+        devices = self.registry.loopback_devices()
+        if devices == self.devices:
+            return
+        self.devices = devices
+        selected = self.device_menu.get()
+        self.device_menu.configure(values=devices if devices else [i18n.get("device_not_found")])
+        if selected not in devices:
+            self.device_menu.set(devices[0] if devices else i18n.get("device_not_found"))
+        if self.sending:
+            return
+        state = "normal" if devices else "disabled"
+        self.device_menu.configure(state=state)
+        self.start_button.configure(state=state)
+
+    def destroy(self):
+        self.cancel_ping_update()
+        self.registry.unsubscribe(self.on_devices_changed)
+        self.registry.release()
+        if self.master.listener:
+            self.master.listener.unsubscribe(self.on_hosts_changed)
+        super().destroy()
 
     def start_discovery(self):
         if not self.master.listener:
             self.master.listener = Listener()
             self.master.listener.start()
+        else:
+            self.master.listener.query()
+        # Dizin değiştikçe bildirilir; yanıt gelmezse "bulunamadı" yazısı için bir kez bakılır
+        self.master.listener.subscribe(self.on_hosts_changed)
         self.after(1000, self.update_discovery_list)
 
+    def on_hosts_changed(self, event, host):
+        # Dinleyici thread'inden çağrılır; arayüz güncellemesi Tk thread'inde yapılır.
+        try:
+            self.after(0, self.update_discovery_list)
+        except Exception:
+            pass
+
     def update_discovery_list(self):
         if self.master.listener:
-            active_hosts = self.master.listener.get_active_hosts()
-            if active_hosts:
-                # Format: "hostname (ip)"
-                host_list = [f"{hostname} ({ip})" for ip, hostname in active_hosts.items()]
+            hosts = self.master.listener.index.hosts()
+            if hosts:
+                # Format: "hostname (ip)" veya "hostname (ip:port)"
+                host_list = [f"{host.hostname} ({host.address})" for host in hosts]
                 self.discovery_menu.configure(values=host_list)
             else:
                 self.discovery_menu.configure(values=[i18n.get("receiver_not_found")])
-            self.after(3000, self.update_discovery_list) # 3 saniyede bir güncelle
 
     def select_discovered_host(self, selected_host):
         # "hostname (ip)" formatından IP'yi ayıkla
@@ -265,12 +321,12 @@ class SenderFrame(customtkinter.CTkFrame):
             self.stop_button.configure(state="normal")
             self.device_menu.configure(state="disabled")
             self.discovery_menu.configure(state="disabled")
+            self.sending = True
             self.update_ping_label()
 
     def stop_sending(self):
-        if self.ping_update_job:
-            self.after_cancel(self.ping_update_job)
-            self.ping_update_job = None
+        self.sending = False
+        self.cancel_ping_update()
         self.master.stop_sender()
         self.start_button.configure(state="normal")
         self.stop_button.configure(state="disabled")
@@ -279,17 +335,28 @@ class SenderFrame(customtkinter.CTkFrame):
         self.discovery_menu.configure(state="normal")
         self.ping_label.configure(text=i18n.get("ping_label"))
 
+    def cancel_ping_update(self):
+        if self.ping_update_job:
+            self.after_cancel(self.ping_update_job)
+            self.ping_update_job = None
+
     def update_ping_label(self):
-        if self.master.audio_sender and self.master.audio_sender.streaming:
-            ping = self.master.audio_sender.ping_ms
-            if ping >= 0:
-                self.ping_label.configure(text=f"Ping: {ping:.2f} ms")
-            else:
-                self.ping_label.configure(text=i18n.get("ping_na"))
-            self.ping_update_job = self.after(1000, self.update_ping_label)
+        # Durum bloğu komutun gerisinde kalabilir (bkz. core.engine.Engine): gönderim
+        # sürdükçe döngü her zaman yeniden kurulur, ölçüm yoksa "yok" gösterilir.
+        if not self.sending:
+            self.ping_update_job = None
+            return
+        sender = self.master.sender_status()
+        ping = sender["ping_ms"] if sender and sender["streaming"] else -1
+        if ping >= 0:
+            self.ping_label.configure(text=f"Ping: {ping:.2f} ms")
+        else:
+            self.ping_label.configure(text=i18n.get("ping_na"))
+        self.ping_update_job = self.after(1000, self.update_ping_label)
 
     def go_back(self):
         if self.master.listener:
+            self.master.listener.unsubscribe(self.on_hosts_changed)
             self.master.listener.stop()
             self.master.listener = None
         self.master.show_main_menu()
@@ -3,53 +3,274 @@
 """
 Uygulama ayarlarını yönetmek için yardımcı fonksiyonlar.
 Ayarları bir JSON dosyasında saklar.
+
+Dosya bir kez okunur; okumalar bellekten yapılır. Yazmalar `SAVE_DELAY`
+kadar biriktirilip tek seferde kaydedilir: önce aynı dizindeki geçici bir
+dosyaya yazılır, sonra onun yerine taşınır; yazma yarıda kalsa bile eski
+dosya bozulmaz. Program kapanırken bekleyen yazma hemen yapılır.
+
+Dosya kullanıcıya özeldir ve çalışma dizinine bağlı değildir:
+    Windows   %APPDATA%\\Yakamoz\\config.json
+    macOS     ~/Library/Application Support/Yakamoz/config.json
+    diğer     $XDG_CONFIG_HOME/yakamoz/config.json (~/.config/yakamoz/config.json)
+`YAKAMOZ_CONFIG` ortam değişkeni başka bir dosya gösterebilir. Eski
+sürümlerin çalışma dizinine yazdığı config.json, yeni dosya henüz yoksa
+ilk açılışta oradan kopyalanır. Eski dosya yalnızca okunur: yeri, adı ve
+içeriği değişmez (çoğu zaman uygulamanın kendi dizinindedir).
+
+Ekransız kurulumlar için ayarlar dosyaya dokunmadan geçersiz kılınabilir:
+`YAKAMOZ_<AYAR>` ortam değişkenleri (ör. YAKAMOZ_MULTICAST_GROUP=239.0.0.1)
+ve komut satırındaki `--set ayar=değer` (bkz. `set_override`). Değerler
+JSON olarak çözülebiliyorsa çözülür, değilse metin olarak alınır.
 """
 
+import atexit
 import json
 import os
+import stat
+import sys
+import tempfile
+import threading
+
+CONFIG_FILE = "config.json"   # Eski sürümlerin çalışma dizinindeki dosyası
+CONFIG_ENV = "YAKAMOZ_CONFIG"
+OVERRIDE_PREFIX = "YAKAMOZ_"
+SAVE_DELAY = 1.0              # Değişikliklerin biriktirildiği süre (saniye)
+
+def config_path():
+    """Ayar dosyasının mutlak yolu (bkz. modül açıklaması)."""
+    path = os.environ.get(CONFIG_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    if sys.platform == "win32":
+        base = os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), "Yakamoz")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support/Yakamoz")
+    else:
+        base = os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"),
+                            "yakamoz")
+    return os.path.join(base, CONFIG_FILE)
+
+def parse_value(text):
+    """Geçersiz kılma değerini çözer: JSON ise değeri, değilse metnin kendisi."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+class SettingsStore:
+    """
+    Bellekte tutulan ayarlar. Thread güvenlidir; `set` dosyaya hemen yazmaz,
+    `delay` saniye içindeki değişiklikler tek yazmada kaydedilir.
+    """
+    def __init__(self, path=None, delay=SAVE_DELAY, legacy_path=None):
+        self.path = path or config_path()
+        self.delay = delay
+        self.legacy_path = legacy_path
+        self.overrides = {}
+        self.saves = 0
+        self._data = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # Kayıtlar sırayla: son görüntü en son yazılır
+
+    def _read(self, path, backup=True):
+        """
+        Dosyayı okur; yoksa None döndürür. Bozuksa boş ayarlar döner ve
+        `backup` ise (depo o dosyanın üzerine yazacaksa) yedeği alınır.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        except IOError as e:
+            print(f"Yapılandırma dosyası okunamadı: {e}")
+            return None
+        if not content:
+            return {}
+        try:
+            data = json.loads(content)
+            if not isinstance(data, dict):
+                raise ValueError("nesne değil")
+            return data
+        except ValueError as e:
+            if not backup:
+                print(f"Yapılandırma dosyası okunamadı ({path}): {e}")
+                return {}
+            # Bozuk dosyanın üzerine yazılmadan önce yedeği alınır
+            print(f"Yapılandırma dosyası okunamadı, {path}.bak olarak saklandı: {e}")
+            try:
+                os.replace(path, path + ".bak")
+            except OSError:
+                pass
+            return {}
+
+    def _load(self):
+        """Dosyayı ilk erişimde bir kez okur (kilit tutulurken)."""
+        if self._data is not None:
+            return self._data
+        data = self._read(self.path)
+        if data is None and self.legacy_path and os.path.abspath(self.legacy_path) != self.path:
+            data = self._read(self.legacy_path, backup=False)
+            if data:
+                print(f"Ayarlar {self.legacy_path} dosyasından {self.path} dosyasına kopyalanıyor.")
+                self._dirty = True
+                self._schedule()
+        self._data = data or {}
+        for key, value in os.environ.items():
+            if key.startswith(OVERRIDE_PREFIX) and key != CONFIG_ENV:
+                self.overrides.setdefault(key[len(OVERRIDE_PREFIX):].lower(), parse_value(value))
+        return self._data
+
+    def get(self, key, default=None):
+        """Ayarın değeri: geçersiz kılındıysa o, yoksa kaydedilen, yoksa `default`."""
+        with self._lock:
+            data = self._load()
+            if key in self.overrides:
+                return self.overrides[key]
+            return data.get(key, default)
+
+    def set(self, key, value):
+        """Ayarı değiştirir ve kaydı zamanlar (değer aynıysa bir şey yapmaz)."""
+        with self._lock:
+            data = self._load()
+            if key in data and data[key] == value:
+                return
+            data[key] = value
+            self._dirty = True
+            self._schedule()
 
-CONFIG_FILE = "config.json"
+    def set_override(self, key, value):
+        """Ayarı yalnızca bu çalışma için geçersiz kılar (dosyaya yazılmaz)."""
+        with self._lock:
+            self._load()
+            self.overrides[key] = value
+
+    def all(self):
+        """Geçerli tüm ayarların kopyası (geçersiz kılmalar dahil)."""
+        with self._lock:
+            data = dict(self._load())
+            data.update(self.overrides)
+            return data
+
+    def replace(self, data):
+        """Kaydedilen ayarların tümünü değiştirir."""
+        with self._lock:
+            self._load()
+            self._data = dict(data)
+            self._dirty = True
+            self._schedule()
+
+    def _schedule(self):
+        """Bekleyen bir kayıt yoksa `delay` sonra kaydı zamanlar (kilit tutulurken)."""
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri hemen kaydeder."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                data = json.dumps(self._data, indent=4)
+                self._dirty = False
+            if not self._write(data):
+                with self._lock:
+                    self._dirty = True
+                return False
+            return True
+
+    def _write(self, text):
+        """Geçici dosyaya yazıp yerine taşır: dosya ya eski ya yeni haliyle kalır."""
+        directory = os.path.dirname(self.path)
+        tmp = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp dosyayı 0600 açar; var olan dosyanın izinleri korunur
+            try:
+                os.chmod(tmp, stat.S_IMODE(os.stat(self.path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, self.path)
+            self.saves += 1
+            return True
+        except OSError as e:
+            print(f"Yapılandırma dosyası yazılamadı: {e}")
+            if tmp:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return False
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Uygulamanın paylaşılan ayar deposunu döndürür (gerekirse oluşturur)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore(legacy_path=os.path.abspath(CONFIG_FILE))
+            atexit.register(_store.flush)
+    return _store
+
+def open_store(path=None):
+    """
+    Paylaşılan depoyu verilen dosyayla yeniden açar (ör. komut satırındaki
+    --config). Önceki deponun bekleyen değişiklikleri önce kaydedilir.
+    """
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.flush()
+            atexit.unregister(_store.flush)
+        _store = SettingsStore(os.path.abspath(os.path.expanduser(path)) if path else None)
+        atexit.register(_store.flush)
+    return _store
+
+def set_override(key, value):
+    """Bir ayarı bu çalışma için geçersiz kılar (ör. komut satırından)."""
+    get_store().set_override(key, value)
 
 def save_config(data):
     """
-    Verilen sözlük verisini config.json dosyasına kaydeder.
+    Verilen sözlük verisini ayar dosyasına kaydeder.
     """
-    try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-    except IOError as e:
-        print(f"Yapılandırma dosyası yazılamadı: {e}")
+    get_store().replace(data)
 
 def load_config():
     """
-    config.json dosyasından ayarları yükler.
-    Dosya yoksa veya boşsa, boş bir sözlük döndürür.
+    Tüm ayarları döndürür. Dosya yoksa veya boşsa, boş bir sözlük döndürür.
     """
-    if not os.path.exists(CONFIG_FILE):
-        return {}
-    
-    try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            # Dosyanın boş olup olmadığını kontrol et
-            content = f.read()
-            if not content:
-                return {}
-            return json.loads(content)
-    except (IOError, json.JSONDecodeError) as e:
-        print(f"Yapılandırma dosyası okunamadı: {e}")
-        return {}
+    return get_store().all()
 
 def save_setting(key, value):
     """
     Belirli bir ayarı (anahtar-değer çifti) kaydeder.
     """
-    config = load_config()
-    config[key] = value
-    save_config(config)
+    get_store().set(key, value)
 
 def load_setting(key, default=None):
     """
     Belirli bir ayarı okur. Bulunamazsa varsayılan değeri döndürür.
     """
-    config = load_config()
-    return config.get(key, default)
\ No newline at end of file
+    return get_store().get(key, default)
+
+def flush():
+    """Bekleyen ayar değişikliklerini hemen kaydeder."""
+    if _store is not None:
+        _store.flush()
@@ -4,14 +4,15 @@
 Sistemdeki ses aygıtlarını yönetmek için yardımcı fonksiyonlar.
 """
 
-import soundcard as sc
+from core.audio_backend import get_backend
 
-def get_loopback_devices():
+def get_loopback_devices(backend=None):
     """
-    Sistemdeki tüm geri döngü (loopback) ses aygıtlarının bir listesini döndürür.
+    Sistemdeki (veya verilen arka uçtaki) tüm geri döngü (loopback) ses
+    aygıtlarının bir listesini döndürür.
     """
     try:
-        loopback_mics = sc.all_microphones(include_loopback=True)
+        loopback_mics = get_backend(backend).microphones()
         # Sadece aygıt adlarını içeren bir liste döndür
         return [mic.name for mic in loopback_mics]
     except Exception as e:
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+
+"""
+Arayüzsüz komut satırı giriş noktası.
+
+Gönderici ve alıcıyı customtkinter/PIL/pystray yüklemeden doğrudan çalıştırır;
+ekranı olmayan makinelerde servis olarak kullanılabilir. SIGINT/SIGTERM
+alındığında akış temiz biçimde durdurulur.
+
+Kullanım:
+    python -m yakamoz send 192.168.1.105 [--device "Hoparlör"] [--port 5555]
+    python -m yakamoz send --discover
+    python -m yakamoz recv [--port 5555] [--buffer 3] [--multicast-group 239.0.0.1]
+    python -m yakamoz devices
+    python -m yakamoz send 127.0.0.1 --backend sine:440 --speed 0   # donanımsız deneme
+    python -m yakamoz discover [--seconds 1]
+    python -m yakamoz proxy 127.0.0.1:5555 --listen-port 7000 --ge-p 0.02 --ge-r 0.3 --jitter-ms 5
+"""
+
+import argparse
+import signal
+import sys
+import threading
+import time
+
+def _wait_for_signal(check=None, interval=0):
+    """
+    SIGINT veya SIGTERM gelene kadar bekler. `check` her `interval` saniyede
+    (0 ise 0.5 s) çağrılır; False döndürürse (ör. akış kendiliğinden durduysa)
+    bekleme erken biter. Sinyalle bittiyse True döner.
+    """
+    stop = threading.Event()
+
+    def handler(signum, frame):
+        print(f"\n🛑  Sinyal alındı ({signal.Signals(signum).name}), durduruluyor...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+    while not stop.wait(interval or 0.5):
+        if check and not check():
+            return False
+    return True
+
+def _discover_hosts(seconds):
+    """
+    Ağdaki alıcıları sorgular, yanıtları `seconds` saniye dinler ve bulunan
+    alıcıları (bkz. core.network_discovery.Host) döndürür.
+    """
+    from core.network_discovery import Listener
+    listener = Listener()
+    listener.start()
+    try:
+        listener.bound.wait(1)
+        time.sleep(seconds)
+        return listener.index.hosts()
+    finally:
+        listener.stop()
+
+def _start_metrics(args):
+    """--metrics-port verildiyse Prometheus uç noktasını başlatır."""
+    if not args.metrics_port:
+        return None
+    from core.stats import start_metrics_server
+    try:
+        return start_metrics_server(args.metrics_port, args.metrics_host)
+    except OSError as e:
+        print(f"‼️ Metrik sunucusu açılamadı: {e}")
+        return None
+
+def cmd_devices(args):
+    """Geri döngü (loopback) aygıtlarını listeler."""
+    from utils.device_manager import get_loopback_devices
+    devices = get_loopback_devices(args.backend)
+    for name in devices:
+        print(name)
+    return 0 if devices else 1
+
+def cmd_discover(args):
+    """Ağdaki alıcıları listeler."""
+    hosts = _discover_hosts(args.seconds)
+    for host in hosts:
+        formats = ",".join(host.formats) or "-"
+        rate = f"{host.rate} Hz / {host.channels} kanal" if host.rate else "-"
+        load = f"{host.load}/{host.max_sources}" if host.max_sources else "-"
+        print(f"{host.address}\t{host.hostname}\t{rate}\t{formats}\tyük {load}")
+    return 0 if hosts else 1
+
+def cmd_send(args):
+    """Sistem sesini yakalayıp hedeflere gönderir."""
+    from core.audio_backend import get_backend
+    from core.audio_sender import AudioSender
+    from utils.device_manager import get_loopback_devices
+
+    dest = args.dest
+    if args.discover:
+        hosts = _discover_hosts(args.discover_seconds)
+        if not hosts:
+            print("‼️ Ağda alıcı bulunamadı.")
+            return 1
+        found = ", ".join(host.address for host in hosts)
+        print(f"🔎  Bulunan alıcılar: {found}")
+        dest = f"{dest}, {found}" if dest else found
+    if not dest:
+        print("‼️ Hedef adres verilmedi (veya --discover kullanın).")
+        return 2
+
+    try:
+        backend = get_backend(args.backend, args.speed)
+    except (ValueError, ImportError) as e:
+        print(f"‼️ Ses arka ucu açılamadı: {e}")
+        return 2
+
+    device = args.device
+    if not device:
+        devices = get_loopback_devices(backend)
+        if not devices:
+            print("‼️ Geri döngü aygıtı bulunamadı.")
+            return 1
+        device = devices[0]
+
+    try:
+        sender = AudioSender(dest_ip=dest, dest_port=args.port, rate=args.rate, device=device,
+                             channels=args.channels, frame_ms=args.frame_ms,
+                             frames_per_packet=args.frames_per_packet, codec=args.codec,
+                             fec_group=args.fec_group, fec_interleave=args.fec_interleave,
+                             nack=not args.no_nack, backend=backend, adapt=args.adapt,
+                             queue_ms=args.queue_ms, drop_policy=args.drop,
+                             negotiate=not args.no_negotiate)
+    except ValueError as e:
+        print(f"‼️ {e}")
+        return 2
+    if not sender.start_streaming():
+        return 1
+    metrics = _start_metrics(args)
+
+    def check():
+        if args.stats:
+            ping = f"{sender.ping_ms:.2f} ms" if sender.ping_ms >= 0 else "-"
+            one_way = f"{sender.one_way_ms:.2f} ms" if sender.one_way_ms >= 0 else "-"
+            ring = sender.ring
+            queue = f"{ring.depth}/{ring.max_depth}, atılan {ring.overruns + ring.dropped}" if ring else "-"
+            print(f"📊  ping {ping}, tek yön {one_way}, alıcı {len(sender.receivers)}, "
+                  f"gönderim hatası {sender.send_errors}, kuyruk {queue}")
+        return sender.streaming and sender.thread.is_alive()
+
+    by_signal = _wait_for_signal(check, args.stats)
+    sender.stop_streaming()
+    if metrics:
+        metrics.shutdown()
+    return 0 if by_signal else 1
+
+def cmd_recv(args):
+    """Ağdan gelen sesi çalar ve (isteğe bağlı) ağda duyurur."""
+    from core.audio_backend import get_backend
+    from core.audio_receiver import AudioReceiver
+    from utils.config_manager import load_setting
+
+    try:
+        backend = get_backend(args.backend, args.speed)
+    except (ValueError, ImportError) as e:
+        print(f"‼️ Ses arka ucu açılamadı: {e}")
+        return 2
+    receiver = AudioReceiver(port=args.port, rate=args.rate, prebuffer=args.buffer,
+                             max_buffer=args.max_buffer, nack=not args.no_nack,
+                             drift=not args.no_drift,
+                             multicast_group=args.multicast_group or load_setting("multicast_group"),
+                             device=args.device, backend=backend, feedback=not args.no_feedback,
+                             channels=args.channels, max_sources=args.max_sources)
+    for item in args.gain:
+        source, _, gain = item.rpartition("=")
+        try:
+            gain = float(gain)
+            if source.startswith("#"):
+                source = int(source[1:], 16)
+            elif not source:
+                raise ValueError
+        except ValueError:
+            print(f"‼️ Geçersiz kazanç: '{item}' (ör. 192.168.1.10=0.5 veya #1a2b3c4d=0.5)")
+            return 2
+        receiver.set_gain(source, gain)
+    if not receiver.start_listening():
+        return 1
+    metrics = _start_metrics(args)
+
+    announcer = None
+    if not args.no_announce:
+        from core.network_discovery import Announcer
+        announcer = Announcer(receiver.discovery_info)
+        announcer.start()
+
+    def check():
+        jb = receiver.jitter
+        if args.stats and jb:
+            glass = receiver.glass_latency.quantile(0.5)
+            glass = f"≤{glass:g} ms" if glass is not None else "-"
+            print(f"📊  derinlik {jb.depth}/{jb.target}, titreşim {jb.jitter * 1000:.2f} ms, "
+                  f"gizlenen {jb.concealed}, boşalma {jb.underruns}, geç {jb.late}, uçtan uca {glass}, "
+                  f"kaynak {len(receiver.sources)}")
+        return receiver.listening
+
+    by_signal = _wait_for_signal(check, args.stats)
+    if announcer:
+        announcer.stop()
+    receiver.stop_listening()
+    if metrics:
+        metrics.shutdown()
+    return 0 if by_signal else 1
+
+def cmd_proxy(args):
+    """Gönderici ile alıcı arasında ağ bozulması benzeten aktarıcıyı çalıştırır."""
+    from core.impairment import ImpairmentProxy, LinkProfile
+
+    host, _, port = args.target.rpartition(":")
+    if not host:
+        host, port = args.target, 5555
+    try:
+        profile = LinkProfile(delay_ms=args.delay_ms, jitter_ms=args.jitter_ms,
+                              distribution=args.distribution, loss=args.loss, ge_p=args.ge_p,
+                              ge_r=args.ge_r, ge_loss=args.ge_loss, duplicate=args.duplicate,
+                              reorder=args.reorder, reorder_ms=args.reorder_ms,
+                              rate_kbps=args.rate_kbps, queue_ms=args.queue_ms)
+        port = int(port)
+    except ValueError as e:
+        print(f"‼️ {e}")
+        return 2
+    return_profile = LinkProfile() if args.clean_return else profile
+    proxy = ImpairmentProxy(args.listen_port, host, port, profile, return_profile,
+                            seed=args.seed, log_path=args.log)
+    if not proxy.start():
+        return 1
+
+    def check():
+        if args.stats:
+            print(f"📊  {proxy.summary()}")
+        return proxy.thread.is_alive()
+
+    by_signal = _wait_for_signal(check, args.stats)
+    proxy.stop()
+    print(f"📊  {proxy.summary()}")
+    return 0 if by_signal else 1
+
+def _add_backend_arguments(parser, help_text):
+    parser.add_argument("--backend", default="soundcard", help=help_text)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Donanımsız arka uçlarda hız (1: gerçek zaman, 0: beklemeden)")
+
+def _add_metrics_arguments(parser):
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="Prometheus metin biçimindeki /metrics uç noktasının portu (0: kapalı)")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="Uç noktanın dinleyeceği adres (ağdan toplamak için 0.0.0.0)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="yakamoz", description="Yakamoz arayüzsüz ses aktarımı")
+    parser.add_argument("--config", help="Ayar dosyası (varsayılan: kullanıcıya özel config.json)")
+    parser.add_argument("--set", action="append", default=[], metavar="AYAR=DEĞER",
+                        help="Bir ayarı bu çalışma için geçersiz kıl (tekrarlanabilir)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    send = sub.add_parser("send", help="Sistem sesini gönder")
+    send.add_argument("dest", nargs="?", default="",
+                      help="Hedef adres(ler): '10.0.0.5', '10.0.0.5, 10.0.0.6:6000' veya çoklu yayın grubu")
+    send.add_argument("--discover", action="store_true", help="Ağdaki alıcıları bul ve hepsine gönder")
+    send.add_argument("--discover-seconds", type=float, default=1,
+                      help="Sorgu yanıtlarının bekleneceği süre (saniye)")
+    send.add_argument("--port", type=int, default=5555)
+    send.add_argument("--rate", type=int, default=48000)
+    send.add_argument("--device", help="Geri döngü aygıtının adı (varsayılan: ilk aygıt)")
+    send.add_argument("--channels", type=int, default=2)
+    send.add_argument("--frame-ms", type=float, default=10)
+    send.add_argument("--frames-per-packet", type=int, default=1)
+    send.add_argument("--codec", default="pcm16")
+    send.add_argument("--fec-group", type=int, default=0)
+    send.add_argument("--fec-interleave", type=int, default=1)
+    send.add_argument("--no-nack", action="store_true")
+    send.add_argument("--adapt", action="store_true",
+                      help="Alıcı raporlarına göre FEC, kodek ve paket boyunu uyarla")
+    send.add_argument("--queue-ms", type=float, default=100,
+                      help="Yakalama ile gönderim arasındaki kuyruğun sınırı (ms)")
+    send.add_argument("--drop", default="oldest",
+                      help="Kuyruk dolunca atılacaklar: oldest (canlıya yetiş) veya newest")
+    send.add_argument("--no-negotiate", action="store_true",
+                      help="Alıcıların bildirdiği biçime uyma; --rate/--channels/--codec aynen kullanılır")
+    _add_backend_arguments(send, "Ses kaynağı: soundcard, sine[:Hz], noise, wav:dosya")
+    send.add_argument("--stats", type=float, default=0, help="Durumu bu kadar saniyede bir yazdır")
+    _add_metrics_arguments(send)
+    send.set_defaults(func=cmd_send)
+
+    recv = sub.add_parser("recv", help="Gelen sesi çal")
+    recv.add_argument("--port", type=int, default=5555)
+    recv.add_argument("--rate", type=int, default=48000,
+                      help="Çıkış aygıtının hızı bilinmiyorsa göndericiden istenen hız")
+    recv.add_argument("--channels", type=int, default=2,
+                      help="Çıkış aygıtının kanal sayısı bilinmiyorsa göndericiden istenen sayı")
+    recv.add_argument("--buffer", type=int, default=1, help="En küçük tampon derinliği (çerçeve)")
+    recv.add_argument("--max-buffer", type=int, default=50)
+    recv.add_argument("--device", help="Çıkış aygıtının adı (varsayılan: sistem varsayılanı)")
+    recv.add_argument("--multicast-group")
+    recv.add_argument("--max-sources", type=int, default=8,
+                      help="Aynı anda karıştırılacak en fazla gönderici")
+    recv.add_argument("--gain", action="append", default=[], metavar="KAYNAK=KAZANÇ",
+                      help="Bir göndericinin karıştırma kazancı; kaynak IP adresi veya #akış kimliği "
+                           "(tekrarlanabilir)")
+    recv.add_argument("--no-nack", action="store_true")
+    recv.add_argument("--no-drift", action="store_true")
+    recv.add_argument("--no-feedback", action="store_true", help="Göndericiye alıcı raporu yollama")
+    recv.add_argument("--no-announce", action="store_true", help="Ağda duyuru yapma")
+    _add_backend_arguments(recv, "Ses çıkışı: soundcard, wav:dosya, null")
+    recv.add_argument("--stats", type=float, default=0, help="Durumu bu kadar saniyede bir yazdır")
+    _add_metrics_arguments(recv)
+    recv.set_defaults(func=cmd_recv)
+
+    devices = sub.add_parser("devices", help="Geri döngü aygıtlarını listele")
+    devices.add_argument("--backend", default="soundcard")
+    devices.set_defaults(func=cmd_devices)
+
+    discover = sub.add_parser("discover", help="Ağdaki alıcıları listele")
+    discover.add_argument("--seconds", type=float, default=1,
+                          help="Sorgu yanıtlarının bekleneceği süre (saniye)")
+    discover.set_defaults(func=cmd_discover)
+
+    proxy = sub.add_parser("proxy", help="Kayıp/titreşim/sıra bozma benzeten UDP aktarıcısı")
+    proxy.add_argument("target", help="Alıcının adresi: '127.0.0.1:5555' (kontrol portu +1 de aktarılır)")
+    proxy.add_argument("--listen-port", type=int, default=7000, help="Göndericinin hedefleyeceği port")
+    proxy.add_argument("--delay-ms", type=float, default=0)
+    proxy.add_argument("--jitter-ms", type=float, default=0)
+    proxy.add_argument("--distribution", default="uniform", help="constant, uniform, normal, exponential")
+    proxy.add_argument("--loss", type=float, default=0, help="Kayıp olasılığı (Gilbert-Elliott iyi durum)")
+    proxy.add_argument("--ge-p", type=float, default=0, help="İyi→kötü geçiş olasılığı (0: patlama yok)")
+    proxy.add_argument("--ge-r", type=float, default=1, help="Kötü→iyi geçiş olasılığı")
+    proxy.add_argument("--ge-loss", type=float, default=1, help="Kötü durumdaki kayıp olasılığı")
+    proxy.add_argument("--duplicate", type=float, default=0)
+    proxy.add_argument("--reorder", type=float, default=0)
+    proxy.add_argument("--reorder-ms", type=float, default=20)
+    proxy.add_argument("--rate-kbps", type=float, default=0, help="Bant genişliği sınırı (0: sınırsız)")
+    proxy.add_argument("--queue-ms", type=float, default=200)
+    proxy.add_argument("--clean-return", action="store_true", help="Alıcıdan göndericiye yönü bozma")
+    proxy.add_argument("--seed", type=int, default=0)
+    proxy.add_argument("--log", help="Paket başına kararların yazılacağı JSON satırları dosyası")
+    proxy.add_argument("--stats", type=float, default=0, help="Sayaçları bu kadar saniyede bir yazdır")
+    proxy.set_defaults(func=cmd_proxy)
+    return parser
+
+def _apply_settings(args):
+    """--config ve --set seçeneklerini ayar deposuna uygular (bkz. utils.config_manager)."""
+    from utils import config_manager
+    if args.config:
+        config_manager.open_store(args.config)
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not key or not sep:
+            print(f"‼️ Geçersiz ayar: '{item}' (ör. multicast_group=239.0.0.1)")
+            return False
+        config_manager.set_override(key.strip(), config_manager.parse_value(value))
+    return True
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not _apply_settings(args):
+        return 2
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())